@@ -0,0 +1,83 @@
+"""Compare the wire codecs on payload size and encode/decode time.
+
+Runs against the simulated helper, so the numbers cover the Python side of
+a call plus the (simulated) helper side, without the Apple Event itself.
+
+    PYTHONPATH=. python benchmarks/bench_codec.py [--repeat N]
+"""
+import argparse
+import datetime
+import json
+import time
+
+from pydt3 import DEVONthink3
+from pydt3.codec import CODECS
+from pydt3.helper_bridging import HelperScript
+from pydt3.simulator import SimulatedTransport, SimulatedDEVONthink
+
+
+def make_helper(n_records):
+    dt = SimulatedDEVONthink()
+    db = dt.add_database('bench-db')
+    for i in range(n_records):
+        db.add_record(name=f'record-{i}', plainText=f'text of record {i}', tags=['bench', str(i % 7)])
+    transport = SimulatedTransport([dt])
+    return HelperScript(transport), transport
+
+
+def payloads(helper, transport):
+    app = DEVONthink3.from_script(helper)
+    contents = app.databases[0].contents
+    records = contents[:]
+    translator = transport.helper.json_translator
+    pool = transport.helper.object_pool_manager
+    remote_records = [pool.get_object(r.obj_id) for r in records]
+    now = datetime.datetime.now()
+    return records, {
+        'strings': [f'record-{i}' for i in range(20000)],
+        'references': remote_records[:5000],
+        'mixed': [{'name': f'record-{i}', 'tags': ['a', 'b'], 'size': i, 'date': now} for i in range(5000)],
+    }, translator
+
+
+def timeit(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    helper, transport = make_helper(5000)
+    records, cases, translator = payloads(helper, transport)
+
+    print(f'{"payload":<12}{"codec":>6}{"bytes":>12}{"helper encode":>16}{"python decode":>16}')
+    for name, value in cases.items():
+        for version, codec in sorted(CODECS.items()):
+            if version == 1:
+                encode = lambda: json.dumps(translator.wrap_to_json(value))
+            else:
+                encode = lambda: json.dumps(translator.encode_compact(value))
+            message = encode()
+            encode_seconds = timeit(encode, args.repeat)
+            decode_seconds = timeit(lambda: codec.decode(helper, message), args.repeat)
+            print(f'{name:<12}{"v" + str(version):>6}{len(message.encode("utf-8")):>12}'
+                  f'{encode_seconds * 1000:>14.2f}ms{decode_seconds * 1000:>14.2f}ms')
+
+    print()
+    print(f'{"request":<12}{"codec":>6}{"bytes":>12}{"python encode":>16}')
+    request = {'names': cases['strings'], 'records': records[:5000]}
+    for version, codec in sorted(CODECS.items()):
+        message = codec.encode(helper, request, {})
+        encode_seconds = timeit(lambda: codec.encode(helper, request, {}), args.repeat)
+        print(f'{"mixed":<12}{"v" + str(version):>6}{len(message.encode("utf-8")):>12}{encode_seconds * 1000:>14.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Compare encoding lists of references per element with the homogeneous array path.
+
+The per-element path looks up the class of every reference in a result,
+which costs the helper an Apple Event (`specifier.class()`) per element. The
+homogeneous path resolves it once per array of references sharing their
+class and sends their ids as a compact list. Only lists of leaf classes
+(see `leafClasses` in the helper) qualify: the `databases` workload echoes a
+list of databases, while the `search` workload, search results, is looked up
+per element either way and shows what record arrays still cost. The
+simulated class lookup is delayed by `--lookup-latency` seconds to stand in
+for the Apple Event.
+
+    PYTHONPATH=. python benchmarks/bench_homogeneous.py [--sizes 100,1000,5000] [--lookup-latency 0.0002] [--json]
+"""
+import argparse
+import json
+import time
+
+from pydt3 import DEVONthink3
+from pydt3.helper_bridging import HelperScript
+from pydt3.simulator import SimulatedTransport, SimulatedDEVONthink
+from pydt3.transport import RecordingTransport
+
+
+def make_helper(workload, size):
+    dt = SimulatedDEVONthink()
+    if workload == 'databases':
+        for i in range(size):
+            dt.add_database(f'bench-db-{i}')
+    else:
+        db = dt.add_database('bench-db')
+        for i in range(size):
+            db.add_record(name=f'record-{i}', tags=['bench'])
+    transport = SimulatedTransport([dt])
+    recording = RecordingTransport(transport)
+    return HelperScript(recording), transport.helper.json_translator, recording
+
+
+def measure(workload, size, homogeneous, lookup_latency, repeat):
+    helper, translator, recording = make_helper(workload, size)
+    app = DEVONthink3.from_script(helper)
+    if workload == 'databases':
+        databases = list(app.databases)
+        func_name, run = 'echo', lambda: helper.echo(databases)
+    else:
+        func_name, run = 'callMethod', lambda: app.search('tags:bench')
+    translator.homogeneous_arrays = homogeneous
+    translator.class_lookup_latency = lookup_latency
+    best = float('inf')
+    for _ in range(repeat):
+        lookups = translator.class_lookups
+        with helper.scope():
+            start = time.perf_counter()
+            results = run()
+            best = min(best, time.perf_counter() - start)
+        assert len(results) == size
+    calls = [entry for entry in recording.entries if entry['func'] == func_name]
+    return {
+        'best_seconds': best,
+        'class_lookups': translator.class_lookups - lookups,
+        'response_bytes': len(calls[-1]['result'].encode('utf-8')),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,5000')
+    parser.add_argument('--workloads', default='search,databases')
+    parser.add_argument('--lookup-latency', type=float, default=0.0002)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for workload in args.workloads.split(','):
+        for size in [int(s) for s in args.sizes.split(',')]:
+            for path, homogeneous in (('per-element', False), ('homogeneous', True)):
+                result = {'workload': workload, 'results': size, 'path': path}
+                result.update(measure(workload, size, homogeneous, args.lookup_latency, args.repeat))
+                results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{"workload":<10}{"results":>8}  {"path":<12}{"time":>12}{"lookups":>9}{"bytes":>10}')
+    for result in results:
+        print(f'{result["workload"]:<10}{result["results"]:>8}  {result["path"]:<12}'
+              f'{result["best_seconds"] * 1000:>10.1f}ms{result["class_lookups"]:>9}{result["response_bytes"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Measure the time it takes to import pydt3 in a fresh interpreter.
+
+Every statement runs in its own subprocess, so nothing is cached between
+runs except what the OS caches. The table shows the median wall time and
+whether PyObjC (`Foundation`) and the DEVONthink classes were loaded.
+
+    PYTHONPATH=. python benchmarks/bench_import.py [--repeat N] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+STATEMENTS = {
+    'import pydt3': 'import pydt3',
+    'helper_bridging': 'import pydt3.helper_bridging',
+    'DEVONthink3': 'from pydt3 import DEVONthink3',
+    'default helper': 'from pydt3.helper_bridging import HelperScript; HelperScript.default',
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, 'Foundation' in sys.modules, 'pydt3.apps.devonthink' in sys.modules)
+"""
+
+
+def measure(statement: str, repeat: int) -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement)],
+                                check=True, capture_output=True, text=True, env=env).stdout.split()
+        times.append(float(output[0]))
+    return {
+        'median_ms': statistics.median(times) * 1000,
+        'min_ms': min(times) * 1000,
+        'foundation_loaded': output[1] == 'True',
+        'devonthink_loaded': output[2] == 'True',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = {name: measure(statement, args.repeat) for name, statement in STATEMENTS.items()}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{"statement":<18}{"median":>10}{"min":>10}{"Foundation":>12}{"DEVONthink":>12}')
+    for name, result in results.items():
+        print(f'{name:<18}{result["median_ms"]:>8.1f}ms{result["min_ms"]:>8.1f}ms'
+              f'{str(result["foundation_loaded"]):>12}{str(result["devonthink_loaded"]):>12}')
+
+
+if __name__ == '__main__':
+    main()
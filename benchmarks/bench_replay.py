@@ -0,0 +1,51 @@
+"""Replay a recorded helper session and time the workload that produced it.
+
+Record the session of a script on a Mac with `$PYDT3_RECORD`, then run the
+same script against the recording anywhere, e.g. on Linux CI, with each
+version of pydt3 to compare:
+
+    PYDT3_RECORD=session.jsonl python workload.py
+    PYTHONPATH=. python benchmarks/bench_replay.py session.jsonl workload.py [--latency-scale 1.0] [--json]
+
+The script gets a default helper serving the recorded responses (see
+`ReplayTransport`). Fewer calls than recorded is an improvement, a
+`ReplayError` means the script made a request that wasn't recorded.
+"""
+import argparse
+import json
+import runpy
+import sys
+import time
+
+from pydt3.helper_bridging import HelperScript
+from pydt3.transport import ReplayTransport
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('session', help='the session recorded with $PYDT3_RECORD')
+    parser.add_argument('script', help='the workload script')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='factor applied to the recorded durations')
+    parser.add_argument('--lenient', action='store_true', help='serve unrecorded requests with responses of the same function')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    transport = ReplayTransport.from_path(args.session, latency_scale=args.latency_scale, strict=not args.lenient)
+    HelperScript.default = HelperScript(transport)
+    sys.argv = [args.script]
+    start = time.perf_counter()
+    runpy.run_path(args.script, run_name='__main__')
+    result = transport.summary()
+    result['wall_seconds'] = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f'calls: {result["replayed_calls"]} (recorded {result["recorded_calls"]}, '
+          f'{result["unused_calls"]} unused, {result["mismatches"]} mismatched)')
+    print(f'remote time: {result["replayed_remote_seconds"]:.3f}s (recorded {result["recorded_remote_seconds"]:.3f}s)')
+    print(f'wall time: {result["wall_seconds"]:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""Run the benchmark suite against simulated databases of synthetic records.
+
+Every benchmark runs on databases of each size (see `synthetic.py`) through
+a `SimulatedTransport` delaying every call by `--latency` seconds, which
+stands in for the cost of an Apple Event. Besides the time, the number of
+calls and the bytes exchanged with the helper are recorded; unlike the
+time, they don't depend on the machine, so a change in them is a
+regression (or an improvement) for sure.
+
+    PYTHONPATH=. python benchmarks/bench_suite.py [--sizes 1k,100k,1m] [--latency 0.001]
+        [--only iterate,pluck] [--repeat N] [--json results.json] [--compare baseline.json]
+
+`--json` writes the results as JSON (`-` for stdout). `--compare` prints the
+change against results written earlier and exits with status 1 if a
+benchmark made more calls or got slower by more than `--tolerance`.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import Callable, Dict, List, Tuple
+
+from pydt3 import DEVONthink3, instrumentation
+from pydt3.helper_bridging import HelperScript
+from pydt3.simulator import SimulatedTransport, SimulatedDEVONthink
+
+from synthetic import generate_database, parse_size, size_label
+
+
+# The number of records the benchmarks touching records one by one work on.
+SAMPLE = 1000
+# The number of references the serialization and release benchmarks create.
+REFERENCES = 10000
+# Slowdowns smaller than this are noise to --compare.
+NOISE_SECONDS = 0.005
+
+
+class Context:
+    def __init__(self, n_records: int, latency: float, seed: int):
+        self.sim = SimulatedDEVONthink()
+        self.db = generate_database(self.sim, 'bench-db', n_records, seed)
+        # The latency only applies to the measured runs.
+        self.transport = SimulatedTransport([self.sim])
+        self.latency = latency
+        self.helper = HelperScript(self.transport)
+        self.app = DEVONthink3.from_script(self.helper)
+        self.contents = self.app.databases[0].contents
+        self.sample = self.contents[:SAMPLE]
+        self.n_records = n_records
+        # A name and a tag matching a handful of records, and a tag matching many.
+        self.rare_name = self.db.contents[len(self.db.contents) // 2].properties['name']
+        self.common_tag = 'tag-000'
+        self.rare_tag = 'tag-150'
+
+
+def bench_iterate(ctx: Context) -> int:
+    count = 0
+    with ctx.helper.scope():
+        for _ in ctx.contents:
+            count += 1
+    return count
+
+
+def bench_read_one_by_one(ctx: Context) -> int:
+    with ctx.helper.scope():
+        return len([record.name for record in ctx.sample])
+
+
+def bench_read_snapshot(ctx: Context) -> int:
+    with ctx.helper.snapshot():
+        return len([(record.name, record.name, record.tags) for record in ctx.sample])
+
+
+def bench_pluck(ctx: Context) -> int:
+    columns = ctx.contents.pluck('name', 'modificationDate', 'tags')
+    return len(columns['name'])
+
+
+def bench_search_rare(ctx: Context) -> int:
+    with ctx.helper.scope():
+        return len(ctx.app.search(f'name=={ctx.rare_name}')) + len(ctx.app.search(f'tags:{ctx.rare_tag}'))
+
+
+def bench_search_common(ctx: Context) -> int:
+    with ctx.helper.scope():
+        return len(ctx.app.search(f'tags:{ctx.common_tag}'))
+
+
+def bench_write_one_by_one(ctx: Context) -> int:
+    sample = ctx.sample[:SAMPLE // 10]
+    for record in sample:
+        record.comment = 'benchmarked'
+    return len(sample)
+
+
+def bench_write_batch(ctx: Context) -> int:
+    with ctx.helper.batch() as batch:
+        for record in ctx.sample:
+            batch.set_properties(record, {'comment': 'benchmarked'})
+    return len(ctx.sample)
+
+
+def bench_serialize(ctx: Context) -> int:
+    with ctx.helper.scope():
+        return len(ctx.contents[:REFERENCES])
+
+
+def bench_release(ctx: Context) -> int:
+    records = ctx.contents[:REFERENCES]
+    count = len(records)
+    del records
+    ctx.helper.flush_releases()
+    return count
+
+
+def bench_release_scope(ctx: Context) -> int:
+    with ctx.helper.scope():
+        count = len(ctx.contents[:REFERENCES])
+    return count
+
+
+BENCHMARKS = {
+    'iterate': bench_iterate,
+    'read_one_by_one': bench_read_one_by_one,
+    'read_snapshot': bench_read_snapshot,
+    'pluck': bench_pluck,
+    'search_rare': bench_search_rare,
+    'search_common': bench_search_common,
+    'write_one_by_one': bench_write_one_by_one,
+    'write_batch': bench_write_batch,
+    'serialize': bench_serialize,
+    'release': bench_release,
+    'release_scope': bench_release_scope,
+} # type: Dict[str, Callable[[Context], int]]
+
+
+def run(ctx: Context, fn: Callable[[Context], int], repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        ctx.helper.flush_releases()
+        calls = ctx.transport.call_count
+        ctx.transport.latency = ctx.latency
+        with instrumentation.profile(file=io.StringIO(), helper_timings=False) as recorder:
+            start = time.perf_counter()
+            items = fn(ctx)
+            times.append(time.perf_counter() - start)
+        ctx.transport.latency = 0.0
+        calls = ctx.transport.call_count - calls
+    totals = recorder.snapshot()['totals']
+    return {
+        'items': items,
+        'best_seconds': min(times),
+        'median_seconds': statistics.median(times),
+        'calls': calls,
+        'request_bytes': totals['request_bytes'],
+        'response_bytes': totals['response_bytes'],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[dict], baseline: dict, tolerance: float) -> Tuple[List[str], bool]:
+    previous = {(r['size'], r['benchmark']): r for r in baseline['results']}
+    lines = [f'{"size":<6}{"benchmark":<18}{"calls":>14}{"best":>22}']
+    regressed = False
+    for result in results:
+        before = previous.get((result['size'], result['benchmark']))
+        if before is None:
+            continue
+        ratio = result['best_seconds'] / before['best_seconds'] if before['best_seconds'] else 1.0
+        slower = ratio > 1 + tolerance and result['best_seconds'] - before['best_seconds'] > NOISE_SECONDS
+        worse = result['calls'] > before['calls'] or slower
+        regressed = regressed or worse
+        calls = f'{before["calls"]}->{result["calls"]}'
+        best = f'{before["best_seconds"] * 1000:.1f}->{result["best_seconds"] * 1000:.1f}ms'
+        lines.append(f'{result["size"]:<6}{result["benchmark"]:<18}{calls:>14}{best:>22}'
+                     f'{ratio:>7.2f}x{"  REGRESSION" if worse else ""}')
+    return lines, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,100k', help='database sizes, e.g. 1k,100k,1m')
+    parser.add_argument('--latency', type=float, default=0.001, help='seconds added to every call')
+    parser.add_argument('--only', help='comma separated benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help='write the results as JSON, - for stdout')
+    parser.add_argument('--compare', metavar='PATH', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='slowdown tolerated by --compare')
+    args = parser.parse_args()
+
+    names = list(BENCHMARKS) if args.only is None else args.only.split(',')
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+    report = sys.stderr if args.json == '-' else sys.stdout
+
+    results = []
+    print(f'{"size":<6}{"benchmark":<18}{"items":>9}{"calls":>8}{"best":>11}{"median":>11}{"sent":>11}{"received":>11}',
+          file=report)
+    for size in [parse_size(s) for s in args.sizes.split(',')]:
+        start = time.perf_counter()
+        ctx = Context(size, args.latency, args.seed)
+        print(f'# generated {size} records in {time.perf_counter() - start:.1f}s', file=report)
+        for name in names:
+            result = {'size': size_label(size), 'records': size, 'benchmark': name}
+            result.update(run(ctx, BENCHMARKS[name], args.repeat))
+            results.append(result)
+            print(f'{result["size"]:<6}{name:<18}{result["items"]:>9}{result["calls"]:>8}'
+                  f'{result["best_seconds"] * 1000:>9.1f}ms{result["median_seconds"] * 1000:>9.1f}ms'
+                  f'{result["request_bytes"]:>11}{result["response_bytes"]:>11}', file=report)
+        del ctx
+
+    document = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+    if args.json == '-':
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            lines, regressed = compare(results, json.load(f), args.tolerance)
+        print(file=report)
+        print('\n'.join(lines), file=report)
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
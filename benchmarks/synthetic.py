@@ -0,0 +1,133 @@
+"""Synthetic DEVONthink databases for the benchmarks.
+
+The records follow distributions resembling a real database rather than
+uniform filler: mostly Markdown, PDF and text documents in a group hierarchy
+of a few levels, tags with a Zipf-like popularity, log-normal text lengths
+and file sizes, and dates spread over the past years with a bias towards
+recent ones. Generation is deterministic for a given seed.
+
+Texts are drawn from a shared pool, so a database of 1M records needs about
+2 GB of memory, mostly for the records' property dicts.
+"""
+import datetime
+import math
+import random
+
+from pydt3.simulator import SimulatedDEVONthink, SimulatedDatabase
+
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+
+WORDS = (
+    'analysis archive budget chapter client contract draft evidence figure invoice journal lecture meeting memo '
+    'method minutes model note outline paper planning project proposal protocol receipt recipe reference report '
+    'research review sample schedule scan source summary survey syllabus task thesis timeline transcript travel '
+    'agenda appendix article bibliography brief catalogue checklist correspondence dataset diagram essay estimate'
+).split()
+
+# Record types and their share of a database.
+TYPES = (
+    ('markdown', 0.30), ('PDF document', 0.22), ('txt', 0.10), ('html', 0.08), ('rtf', 0.07),
+    ('bookmark', 0.07), ('picture', 0.06), ('webarchive', 0.05), ('group', 0.05),
+)
+
+TAG_COUNT = 200
+TEXT_POOL_SIZE = 512
+YEARS = 8
+
+
+def parse_size(text: str) -> int:
+    """`1k`, `100k`, `1m` or a plain number of records."""
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    return int(text)
+
+
+def size_label(n: int) -> str:
+    for label, size in SIZES.items():
+        if size == n:
+            return label
+    return str(n)
+
+
+class _Generator:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.now = datetime.datetime(2024, 1, 1)
+        self.type_names = [name for name, _ in TYPES]
+        self.type_weights = [weight for _, weight in TYPES]
+        self.tags = [f'tag-{i:03d}' for i in range(TAG_COUNT)]
+        self.tag_weights = [1 / (i + 1) for i in range(TAG_COUNT)]
+        self.texts = [self._text() for _ in range(TEXT_POOL_SIZE)]
+
+    def _text(self):
+        words = min(int(self.rng.lognormvariate(5.0, 1.2)), 20000)
+        text = ' '.join(self.rng.choice(WORDS) for _ in range(words))
+        return text, len(text.encode()), words, len(text)
+
+    def uuid(self) -> str:
+        h = f'{self.rng.getrandbits(128):032X}'
+        return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+    def name(self) -> str:
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(1, 5))).capitalize()
+
+    def dates(self):
+        # Skewed towards recent records.
+        age = (1 - math.sqrt(self.rng.random())) * YEARS * 365
+        created = self.now - datetime.timedelta(days=age, seconds=self.rng.randrange(86400))
+        modified = created + datetime.timedelta(days=self.rng.random() * age)
+        return created, modified
+
+    def record_tags(self) -> list:
+        if self.rng.random() < 0.3:
+            return []
+        count = min(1 + int(self.rng.expovariate(0.7)), 8)
+        return sorted(set(self.rng.choices(self.tags, self.tag_weights, k=count)))
+
+    def properties(self, record_type: str) -> dict:
+        created, modified = self.dates()
+        properties = {
+            'uuid': self.uuid(),
+            'name': self.name(),
+            'type': record_type,
+            'tags': self.record_tags(),
+            'creationDate': created,
+            'modificationDate': modified,
+            'additionDate': created,
+            'rating': 0 if self.rng.random() < 0.8 else self.rng.randint(1, 5),
+            'label': 0 if self.rng.random() < 0.9 else self.rng.randint(1, 7),
+            'flag': self.rng.random() < 0.05,
+            'unread': self.rng.random() < 0.1,
+        }
+        if record_type in ('group', 'bookmark', 'picture'):
+            properties.update(plainText='', wordCount=0, characterCount=0)
+            properties['size'] = int(self.rng.lognormvariate(13, 1.5)) if record_type == 'picture' else 0
+        else:
+            text, size, words, characters = self.rng.choice(self.texts)
+            properties.update(plainText=text, wordCount=words, characterCount=characters, size=size)
+            if record_type in ('PDF document', 'webarchive'):
+                properties['size'] = int(self.rng.lognormvariate(13.5, 1.3))
+        if record_type == 'bookmark':
+            properties['URL'] = f'https://example.com/{properties["uuid"].lower()}'
+        return properties
+
+
+def generate_database(dt: SimulatedDEVONthink, name: str, n_records: int, seed: int = 0) -> SimulatedDatabase:
+    """Add a database of `n_records` synthetic records to `dt`."""
+    generator = _Generator(seed)
+    db = dt.add_database(name)
+    groups = [db.root]
+    for _ in range(n_records):
+        record_type = generator.rng.choices(generator.type_names, generator.type_weights)[0]
+        # Most records live in the first groups, like the inbox and a few active projects.
+        parent = groups[min(int(generator.rng.expovariate(0.05)), len(groups) - 1)]
+        properties = generator.properties(record_type)
+        depth = parent.properties['location'].count('/')
+        if record_type == 'group':
+            properties['location'] = parent.properties['location'].rstrip('/') + '/' + properties['name']
+        record = db.add_record(parent, **properties)
+        if record_type == 'group' and depth < 4:
+            groups.append(record)
+    return db
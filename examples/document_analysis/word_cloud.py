@@ -4,6 +4,7 @@ import random
 import matplotlib.pyplot as plt
 
 from pydt3 import DEVONthink3
+from pydt3.helper_bridging import HelperScript
 
 ignore_words = """function return var value if else for while break continue switch case default element object key array https component"""\
     .split()
@@ -44,15 +45,17 @@ if __name__ == '__main__':
     sampled_records = random.sample(db.contents, min(40, len(db.contents)))
     names = []
     texts = []
-    for record in sampled_records:
-        if record.type == 'picture':
-            continue
-        if 'newsletter' in record.location:
-            continue
-        name = record.name
-        names.append(name)
-        texts.append(name)
-        texts.append(record.rich_text.splitlines()[0])
+    # Each property of a record is fetched only once while reading.
+    with HelperScript.default.snapshot():
+        for record in sampled_records:
+            if record.type == 'picture':
+                continue
+            if 'newsletter' in record.location:
+                continue
+            name = record.name
+            names.append(name)
+            texts.append(name)
+            texts.append(record.rich_text.splitlines()[0])
 
     samples = texts
     generate_wordcloud(' '.join(samples), 'wordcloud.png')
\ No newline at end of file
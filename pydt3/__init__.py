@@ -1,4 +1,37 @@
-from .apps.devonthink import DEVONthink3
-from .osascript import OSAScript
+import importlib
 
+from typing import TYPE_CHECKING
 
+
+if TYPE_CHECKING:
+    from .apps.devonthink import DEVONthink3
+    from .osascript import OSAScript
+    from .instrumentation import stats, profile
+    from .diagnostics import detect_n_plus_one
+    from .refcount import check_leaks
+
+# The app packages import every class they define, so they are only
+# imported when one of their names is accessed.
+_lazy_attributes = {
+    'DEVONthink3': '.apps.devonthink',
+    'OSAScript': '.osascript',
+    'stats': '.instrumentation',
+    'profile': '.instrumentation',
+    'detect_n_plus_one': '.diagnostics',
+    'check_leaks': '.refcount',
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name: str):
+    module = _lazy_attributes.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
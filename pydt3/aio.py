@@ -0,0 +1,156 @@
+"""An asyncio facade over the proxies.
+
+Every helper script used through this module is owned by a `Dispatcher`,
+and the blocking calls run on its thread while the event loop awaits their
+futures. Calls to independent helper scripts (e.g. one per app, created with
+`HelperScript.from_path(DEFAULT_SCRIPT_PATH)`) run on different threads and
+overlap.
+
+Properties are awaited, methods return coroutines:
+
+    >>> dt3 = await AsyncDEVONthink3.open()
+    >>> records = await dt3.search('name==hello')
+    >>> names = [await record.name for record in records]
+    >>> await records[0].set('comment', 'seen')
+"""
+from __future__ import annotations
+
+import asyncio
+
+from typing import Any, AsyncIterator, Callable, Generic, List, Optional, TypeVar
+
+from .dispatcher import Dispatcher
+from .helper_bridging import HelperScript
+from .objproxy import OSAObjProxy, OSAObjArray
+
+
+T = TypeVar('T', bound=OSAObjProxy)
+
+
+def dispatcher_for(helper_script: HelperScript) -> Dispatcher:
+    """The dispatcher owning `helper_script`, created if there is none."""
+    dispatcher = helper_script.dispatcher
+    if dispatcher is None:
+        dispatcher = Dispatcher(helper_script)
+    return dispatcher
+
+
+def _wrap(value, dispatcher: Dispatcher):
+    if isinstance(value, OSAObjArray):
+        return AsyncArray(value, dispatcher)
+    elif isinstance(value, OSAObjProxy):
+        return AsyncProxy(value, dispatcher)
+    elif isinstance(value, list):
+        return [_wrap(v, dispatcher) for v in value]
+    elif isinstance(value, dict):
+        return {k: _wrap(v, dispatcher) for k, v in value.items()}
+    return value
+
+
+class AsyncProxy(Generic[T]):
+    """Awaitable access to the properties and methods of the proxy `sync`.
+
+    `await proxy.name` reads a property, `await proxy.method(...)` calls a
+    method and `await proxy.set(name, value)` sets a property. Proxies in the
+    results are wrapped in `AsyncProxy` (or `AsyncArray`) as well.
+    """
+
+    def __init__(self, proxy: T, dispatcher: Optional[Dispatcher] = None):
+        self._proxy = proxy
+        self._dispatcher = dispatcher_for(proxy._helper_script) if dispatcher is None else dispatcher
+
+    @property
+    def sync(self) -> T:
+        """The blocking proxy."""
+        return self._proxy
+
+    async def run(self, fn: Callable[..., Any], *args, priority: Optional[int] = None, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the dispatcher thread and wrap its result."""
+        future = self._dispatcher.submit(fn, *args, priority=priority, **kwargs)
+        return _wrap(await asyncio.wrap_future(future), self._dispatcher)
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attr = getattr(type(self._proxy), name, None)
+        if callable(attr) and not isinstance(attr, property):
+            method = getattr(self._proxy, name)
+
+            async def call(*args, **kwargs):
+                return await self.run(method, *args, **kwargs)
+            call.__name__ = name
+            call.__doc__ = attr.__doc__
+            return call
+        return self.run(getattr, self._proxy, name)
+
+    async def set(self, name: str, value: Any):
+        """Set the property `name` (the Python name, e.g. `plain_text`) to `value`."""
+        if isinstance(value, AsyncProxy):
+            value = value.sync
+        await self.run(setattr, self._proxy, name, value)
+
+    def __repr__(self):
+        return f'<{type(self).__name__}: {self._proxy.class_name} {self._proxy.obj_id}>'
+
+
+class AsyncArray(AsyncProxy[OSAObjArray]):
+    """An `OSAObjArray` read without blocking, chunk by chunk when iterated."""
+
+    async def len(self) -> int:
+        return await self.run(len, self._proxy)
+
+    async def at(self, index: int) -> AsyncProxy:
+        return await self.run(self._proxy.__getitem__, index)
+
+    async def slice(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[AsyncProxy]:
+        return await self.run(self._proxy.__getitem__, slice(start, stop))
+
+    async def pluck(self, *names: str, chunk_size: Optional[int] = None):
+        return await self.run(self._proxy.pluck, *names, chunk_size=chunk_size)
+
+    async def list(self) -> List[AsyncProxy]:
+        return [item async for item in self]
+
+    async def __aiter__(self) -> AsyncIterator[AsyncProxy]:
+        chunks = iter(self._proxy.iter_chunks())
+        while True:
+            chunk = await self.run(next, chunks, None)
+            if chunk is None:
+                return
+            for item in chunk:
+                yield item
+
+
+class AsyncApplication(AsyncProxy[T]):
+    @classmethod
+    def app_class(cls) -> type:
+        raise NotImplementedError()
+
+    @classmethod
+    async def open(cls, helper_script: Optional[HelperScript] = None):
+        """Get the application through `helper_script` (the default one if not given)."""
+        if helper_script is None:
+            helper_script = HelperScript.default
+            if helper_script is None:
+                raise RuntimeError('No default helper script is available, pass `helper_script` explicitly')
+        dispatcher = dispatcher_for(helper_script)
+        future = dispatcher.submit(cls.app_class().from_script, helper_script)
+        return cls(await asyncio.wrap_future(future), dispatcher)
+
+
+class AsyncDEVONthink3(AsyncApplication):
+    """`DEVONthink3` with awaitable properties and commands."""
+
+    @classmethod
+    def app_class(cls) -> type:
+        from .apps.devonthink import DEVONthink3
+        return DEVONthink3
+
+
+class AsyncMail(AsyncApplication):
+    """`Mail` with awaitable properties and commands."""
+
+    @classmethod
+    def app_class(cls) -> type:
+        from .apps.mail import Mail
+        return Mail
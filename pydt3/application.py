@@ -16,6 +16,8 @@ class Application(DefaultOSAObjProxy):
             super().__init__(helper_script, obj_id, class_name)
         elif name is not None:
             helper_script = HelperScript.default
+            if helper_script is None:
+                raise RuntimeError('No default helper script is available, pass `helper_script` explicitly')
             app = helper_script.get_application(name)
             super().__init__(helper_script, app.obj_id, app.class_name)
         else:
@@ -38,7 +40,7 @@ class Application(DefaultOSAObjProxy):
 
     def activate(self):
         """Activate the application."""
-        return self._call_method('activate')
+        return self._call_method('activate', [])
 
 HelperScript.set_default_class_map({
     'application': Application
@@ -4,7 +4,7 @@ from ...helper_bridging import HelperScript
 from .devonthink import DEVONthink3
 from .database import Database
 from .item import Item
-from .record import Record
+from .record import Record, RecordRef
 from .reminder import Reminder
 from .smartgroup import SmartGroup
 from .tab import Tab
@@ -2,11 +2,13 @@
 from ...osascript import OSAScript
 from ...helper_bridging import OSAObjProxy, OSAObjArray
 from typing import List
-from .record import Record
+from .record import Record, RecordRef
 from .smartgroup import SmartGroup
 from. taggroup import TagGroup
 
 class Database(OSAObjProxy):
+    __slots__ = ()
+
     # elements
     @property
     def contents(self) -> OSAObjArray['Record']:
@@ -112,5 +114,10 @@ class Database(OSAObjProxy):
         """The unique and persistent identifier of a database for external referencing."""
         return self._call_method('uuid')
     
+    def record_refs(self) -> List[RecordRef]:
+        """`RecordRef`s to all the records of the database, which hold no remote objects."""
+        database_uuid = self.uuid
+        return [RecordRef(database_uuid, uuid, self._helper_script) for uuid in self.contents.pluck('uuid')]
+
     def __repr__(self):
         return f'<Database {self.name}>'
\ No newline at end of file
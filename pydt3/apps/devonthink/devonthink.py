@@ -1077,7 +1077,7 @@ class DEVONthink3(Application):
 
     def hide_progress_indicator(self) -> bool:
         """Hide a visible progress indicator."""
-        return self._call_method('hideProgressIndicator')
+        return self._call_method('hideProgressIndicator', [])
         
     def import_(self, path: str, from_: str = None, name: str = None, placeholders: Record = None, to: Record = None, type: int = None) -> Record:
         """Import a file or folder (including its subfolders).
@@ -1463,7 +1463,7 @@ class DEVONthink3(Application):
         Returns:
             bool: True if successful, False otherwise.
         """
-        return self._call_method('startDownloads')
+        return self._call_method('startDownloads', [])
 
     def step_progress_indicator(self, text: str = None) -> bool:
         """Go to next step of a progress.
@@ -1485,7 +1485,7 @@ class DEVONthink3(Application):
         Returns:
             bool: True if successful, False otherwise.
         """
-        return self._call_method('stopDownloads')
+        return self._call_method('stopDownloads', [])
 
     def summarize_highlights_of(self, records: list, to: str, destination_group: Record = None) -> Record:
         """Summarize highlights & annotations of records. PDF, RTF(D), Markdown and web documents are currently supported.
@@ -1555,6 +1555,7 @@ class DevonthinkExtension():
     
     def db_by_name(self, name: str) -> Optional[Database]:
         dbs = self.app.databases
-        for db in dbs:
-            if db.name == name:
-                return db
\ No newline at end of file
+        names = dbs.pluck('name')
+        if name in names:
+            return dbs[names.index(name)]
+        return None
\ No newline at end of file
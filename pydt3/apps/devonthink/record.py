@@ -1,14 +1,15 @@
 
 import datetime
 
-from typing import Optional, List, Any, TYPE_CHECKING
+from typing import Optional, Iterator, List, Any, Iterable, TYPE_CHECKING
 
 from .devonthink import DEVONthink3
 from ...osascript import OSAScript
-from ...helper_bridging import OSAObjProxy, OSAObjArray
+from ...helper_bridging import HelperScript, OSAObjProxy, OSAObjArray
 
 
 if TYPE_CHECKING:
+    from ...binary import BinaryHandle
     from .database import Database
     from .reminder import Reminder
     from .text import Text
@@ -43,6 +44,8 @@ class CustomMetaData:
         return f'<{type(self).__name__}: {self.get_dict_value()}>'
 
 class Record(OSAObjProxy):
+    __slots__ = ()
+
     # elements
     @property
     def children(self) -> OSAObjArray['Record']:
@@ -637,5 +640,126 @@ class Record(OSAObjProxy):
         """The word count of a record."""
         return self._call_method('wordCount')
     
+    def read_text(self, start: int = 0, length: Optional[int] = None, source: bool = False) -> str:
+        """Read `length` characters of the plain text (or the HTML/XML source) from `start`.
+
+        Only the requested range is transferred. Offsets count UTF-16 code units, as in JavaScript.
+        """
+        return self._helper_script.read_text(self, 'source' if source else 'plainText', start, length)['text']
+
+    def iter_text(self, chunk_chars: int = 65536, source: bool = False) -> Iterator[str]:
+        """Iterate over the plain text (or the HTML/XML source) in chunks of about `chunk_chars` characters.
+
+        Use it instead of `plain_text` to process large documents with bounded memory.
+        """
+        return self._helper_script.iter_text(self, 'source' if source else 'plainText', chunk_chars)
+
+    def open_data(self) -> Optional['BinaryHandle']:
+        """The file data of the record as a `BinaryHandle`, without passing it through the JSON bridge."""
+        return self._open_binary('data')
+
+    def open_thumbnail(self) -> Optional['BinaryHandle']:
+        """The thumbnail of the record as a `BinaryHandle`."""
+        return self._open_binary('thumbnail')
+
+    def open_web_archive(self) -> Optional['BinaryHandle']:
+        """The web archive of the record as a `BinaryHandle`."""
+        return self._open_binary('webArchive', '.webarchive')
+
+    def open_paginated_pdf(self) -> Optional['BinaryHandle']:
+        """A printed/converted PDF of the record as a `BinaryHandle`."""
+        return self._open_binary('paginatedPDF', '.pdf')
+
+    def ref(self) -> 'RecordRef':
+        """A `RecordRef` to the record, which holds no remote object."""
+        return RecordRef(self.database.uuid, self.uuid, self._helper_script)
+
     def __repr__(self):
         return f'<Record: {self.name}>'
+
+
+class RecordRef:
+    """A handle of a record holding only the UUIDs of its database and itself.
+
+    Unlike a `Record`, it references no remote object, so millions of them
+    can be kept around cheaply, and it outlives the helper script (it can be
+    pickled). Reading or setting a property through the handle looks the
+    record up by UUID first, which costs an Apple Event. `resolve` the handle
+    to work with the record itself, or `resolve_all` to look up many handles
+    with a single Apple Event.
+
+    Examples:
+        >>> refs = db.record_refs()
+        >>> refs[0].name
+        'note'
+        >>> records = RecordRef.resolve_all(refs[:1000])
+    """
+    __slots__ = ('database_uuid', 'uuid', '_helper_script')
+
+    def __init__(self, database_uuid: str, uuid: str, helper_script: Optional[HelperScript] = None):
+        self.database_uuid = database_uuid
+        self.uuid = uuid
+        self._helper_script = helper_script
+
+    @property
+    def helper_script(self) -> HelperScript:
+        """The helper script the record is looked up with, `HelperScript.default` if none was given."""
+        return self._helper_script or HelperScript.default
+
+    def resolve(self) -> 'Record':
+        """The record, looked up by its UUID in its database.
+
+        Raises:
+            LookupError: The record, or its database, doesn't exist anymore.
+        """
+        app = DEVONthink3.from_script(self.helper_script)
+        database = app.get_database_with_uuid(self.database_uuid)
+        record = None if database is None else app.get_record_with_uuid(self.uuid, database)
+        if record is None:
+            raise LookupError(f'No record with UUID {self.uuid}')
+        return record
+
+    @staticmethod
+    def resolve_all(refs: Iterable['RecordRef']) -> List[Optional['Record']]:
+        """The records of `refs`, looked up with one Apple Event per helper script.
+
+        The records that don't exist anymore are None.
+        """
+        refs = list(refs)
+        records = [None] * len(refs) # type: List[Optional[Record]]
+        by_helper = {} # type: dict
+        for i, ref in enumerate(refs):
+            by_helper.setdefault(ref.helper_script, []).append(i)
+        for helper_script, indices in by_helper.items():
+            app = DEVONthink3.from_script(helper_script)
+            with helper_script.batch() as batch:
+                lookups = [batch.call_method(app, 'getRecordWithUuid', [refs[i].uuid]) for i in indices]
+            for i, lookup in zip(indices, lookups):
+                records[i] = lookup.result()
+        return records
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value):
+        if name in RecordRef.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.resolve(), name, value)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RecordRef):
+            return NotImplemented
+        return self.uuid == other.uuid and self.database_uuid == other.database_uuid
+
+    def __hash__(self) -> int:
+        return hash((self.database_uuid, self.uuid))
+
+    def __reduce__(self):
+        # The helper script stays behind.
+        return RecordRef, (self.database_uuid, self.uuid)
+
+    def __repr__(self):
+        return f'<RecordRef: {self.uuid}>'
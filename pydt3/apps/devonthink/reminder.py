@@ -4,6 +4,8 @@ from ...osascript import OSAScript
 from ...helper_bridging import OSAObjProxy
 
 class Reminder(OSAObjProxy):
+    __slots__ = ()
+
     # properties
     @property
     def alarm(self) -> str:
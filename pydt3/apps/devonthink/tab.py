@@ -1,11 +1,14 @@
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 from ...helper_bridging import OSAObjProxy
 
 if TYPE_CHECKING:
+    from ...binary import BinaryHandle
     from ..devonthink import Record, Database, Text, ThinkWindow
 
 class Tab(OSAObjProxy):
+    __slots__ = ()
+
     @property
     def content_record(self) -> 'Record':
         """The record of the visible document."""
@@ -144,3 +147,15 @@ class Tab(OSAObjProxy):
     def web_archive(self):
         """Web archive of the current web page."""
         return self._call_method('webArchive')
+
+    def open_paginated_pdf(self) -> Optional['BinaryHandle']:
+        """A printed PDF with pagination of the visible document as a `BinaryHandle`."""
+        return self._open_binary('paginatedPDF', '.pdf')
+
+    def open_pdf(self) -> Optional['BinaryHandle']:
+        """A PDF without pagination of the visible document as a `BinaryHandle`."""
+        return self._open_binary('pdf', '.pdf')
+
+    def open_web_archive(self) -> Optional['BinaryHandle']:
+        """Web archive of the current web page as a `BinaryHandle`."""
+        return self._open_binary('webArchive', '.webarchive')
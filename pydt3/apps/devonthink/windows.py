@@ -1,13 +1,16 @@
 
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 from ...helper_bridging import OSAObjProxy
 
 if TYPE_CHECKING:
+    from ...binary import BinaryHandle
     from ..devonthink import Record, Database, Text, Tab
 
 
 class ThinkWindow(OSAObjProxy):
+    __slots__ = ()
+
     # elements
     @property
     def tabs(self) -> List['Tab']:
@@ -144,13 +147,29 @@ class ThinkWindow(OSAObjProxy):
         """Web archive of the current web page."""
         return self._call_method('webArchive')
 
+    def open_paginated_pdf(self) -> Optional['BinaryHandle']:
+        """A printed PDF with pagination of the visible document as a `BinaryHandle`."""
+        return self._open_binary('paginatedPDF', '.pdf')
+
+    def open_pdf(self) -> Optional['BinaryHandle']:
+        """A PDF without pagination of the visible document as a `BinaryHandle`."""
+        return self._open_binary('pdf', '.pdf')
+
+    def open_web_archive(self) -> Optional['BinaryHandle']:
+        """Web archive of the current web page as a `BinaryHandle`."""
+        return self._open_binary('webArchive', '.webarchive')
+
 class DocumentWindow(ThinkWindow):
+    __slots__ = ()
+
     @property
     def record(self) -> 'Record':
         """The record of the visible document."""
         return self._get_property('record')
 
 class ViewerWindow(ThinkWindow):
+    __slots__ = ()
+
     # elements
     @property
     def selected_records(self) -> List['Record']:
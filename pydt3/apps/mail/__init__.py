@@ -0,0 +1,14 @@
+from ...helper_bridging import HelperScript
+
+
+from .mail import Mail
+from .account import Account
+from .mailbox import Mailbox
+from .message import Message
+
+HelperScript.register_class_map(app_name='Mail', class_map={
+    'application': Mail,
+    'account': Account,
+    'mailbox': Mailbox,
+    'message': Message,
+})
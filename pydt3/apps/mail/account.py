@@ -8,6 +8,7 @@ if TYPE_CHECKING:
 
 class Account(OSAObjProxy):
     """A Mail account for receiving messages (POP/IMAP)."""
+    __slots__ = ()
 
     # ========== Elements ==========
     @property
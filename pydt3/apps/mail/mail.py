@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
-from ...helper_bridging import OSAObjArray, Application
+from ...application import Application
+from ...helper_bridging import HelperScript, OSAObjArray
 
 if TYPE_CHECKING:
     from .account import Account, POPAccount, IMAPAccount, ICloudAccount
@@ -17,6 +18,13 @@ if TYPE_CHECKING:
 class Mail(Application):
     """Mail's top level scripting object."""
 
+    def __init__(self, helper_script: Optional[HelperScript] = None, obj_id: Optional[int] = None, class_name: Optional[str] = None):
+        super().__init__('Mail', helper_script, obj_id, class_name)
+
+    @classmethod
+    def from_script(cls, script: HelperScript) -> Mail:
+        return script.get_application("Mail")
+
     # ========== Elements ==========
     @property
     def accounts(self) -> OSAObjArray[Account]:
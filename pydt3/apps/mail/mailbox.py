@@ -12,6 +12,7 @@ if TYPE_CHECKING:
 
 class Mailbox(OSAObjProxy):
     """A mailbox that holds messages."""
+    __slots__ = ()
 
     # ========== Elements ==========
     @property
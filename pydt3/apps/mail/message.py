@@ -4,6 +4,7 @@ from ...helper_bridging import OSAObjProxy, OSAObjArray
 
 class Message(OSAObjProxy):
     """An email message."""
+    __slots__ = ()
 
     # ========== Elements ==========
     @property
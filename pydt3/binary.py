@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import weakref
+
+from typing import BinaryIO, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.debug('failed to remove %s: %r', path, e)
+
+
+class BinaryHandle:
+    """A binary value (PDF, web archive, image...) the helper wrote to a temporary file.
+
+    Large binaries don't go through the JSON bridge. The helper writes them to
+    `path` and only their size is sent back. The content can be read
+
+    - as a whole with `read`,
+    - as a stream with `open`,
+    - without copying with `memoryview`, which maps the file into memory.
+
+    The file is removed when the handle is closed, when it leaves a `with`
+    block or when it is garbage collected.
+
+    Examples:
+        >>> with record.open_data() as data:
+        ...     header = bytes(data.memoryview()[:4])
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self._mmap: Optional[mmap.mmap] = None
+        self._files: List[BinaryIO] = []
+        self._finalizer = weakref.finalize(self, _remove, path)
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def _check_closed(self):
+        if self.closed:
+            raise ValueError('I/O operation on closed binary handle')
+
+    def open(self) -> BinaryIO:
+        """Open the content as a binary file, to read it in pieces."""
+        self._check_closed()
+        f = open(self.path, 'rb')
+        self._files.append(f)
+        return f
+
+    def memoryview(self) -> memoryview:
+        """A read-only view of the content, backed by a memory map of the file."""
+        self._check_closed()
+        if self.size == 0:
+            # Empty files can't be mapped.
+            return memoryview(b'')
+        if self._mmap is None:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def read(self) -> bytes:
+        """The whole content as bytes."""
+        self._check_closed()
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def close(self):
+        """Close the opened files and the memory map, then remove the file."""
+        for f in self._files:
+            f.close()
+        self._files.clear()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A memoryview of the map is still alive. The map is closed
+                # when it's collected, the file can be removed anyway.
+                pass
+            self._mmap = None
+        self._finalizer()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __enter__(self) -> BinaryHandle:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        state = 'closed' if self.closed else self.path
+        return f'<BinaryHandle: {self.size} bytes, {state}>'
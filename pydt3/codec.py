@@ -0,0 +1,151 @@
+"""Wire formats between `HelperScript` and the JXA helper.
+
+Version 1 (`TaggedJsonCodec`) wraps every value in a `{type, data}` dict.
+Version 2 (`CompactJsonCodec`) sends plain JSON as it is and only marks the
+values JSON can't express:
+
+- `{"$r": objId}` a reference sent to the helper, `{"$r": objId, "$s": specifier}`
+  if the helper has evicted it from its pool, `specifier` being its display
+  string to resolve it again,
+- `{"$r": [objId, className, app]}` a reference returned by the helper,
+  where `className` and `app` index the interned strings of the envelope,
+- `{"$R": [className, app, [objId, ...]]}` an array of references sharing
+  their class and app, as returned for search results or lookup lists,
+- `{"$d": timestamp}` a date.
+
+Keys of dicts starting with `$` are escaped with another `$`. A message is
+an envelope `{"v": 2, "d": value, "x": hasMarkers, "s": strings}`, so a
+value without markers is decoded by `json.loads` alone.
+
+The version is negotiated with the helper's `negotiateCodec` on first use.
+
+With either version, a request with `"timing": 1` in its envelope gets the
+helper's phase timings in milliseconds (unwrap, app, wrap, stringify) in
+the `t` entry of the response. A helper with a bounded pool reports the
+objects it has evicted by id with their display strings in `e`, and the ids
+of those it has resolved again in `h`.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+
+from typing import Any, Dict, List, TYPE_CHECKING
+
+from .objproxy import OSAObjProxy
+
+
+if TYPE_CHECKING:
+    from .helper_bridging import HelperScript
+
+
+class TaggedJsonCodec:
+    """The original `{type, data}` format."""
+    version = 1
+
+    def encode(self, helper_script: HelperScript, params, envelope: dict) -> str:
+        message = helper_script._wrap_to_json(params)
+        message.update(envelope)
+        return json.dumps(message)
+
+    def decode(self, helper_script: HelperScript, message: str):
+        return self.decode_message(helper_script, json.loads(message))
+
+    def decode_message(self, helper_script: HelperScript, message: dict):
+        return helper_script._unwrap_from_json(message)
+
+
+def _json_key(key) -> str:
+    """`key` converted to a string as `json.dumps` converts the keys of a dict."""
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (bool, int, float)):
+        # 'null', 'true', int and float reprs, 'Infinity' and 'NaN'
+        return json.dumps(key)
+    raise TypeError(f'keys must be str, int, float, bool or None, not {type(key).__name__}')
+
+
+class _EncodeState:
+    __slots__ = ('helper_script', 'marked')
+
+    def __init__(self, helper_script: HelperScript):
+        self.helper_script = helper_script
+        self.marked = False
+
+
+class CompactJsonCodec:
+    """Plain JSON with positional markers for references and dates."""
+    version = 2
+
+    def encode(self, helper_script: HelperScript, params, envelope: dict) -> str:
+        state = _EncodeState(helper_script)
+        data = self._encode(params, state)
+        message = {'v': 2, 'd': data}
+        if state.marked:
+            message['x'] = 1
+        message.update(envelope)
+        return json.dumps(message)
+
+    def _encode(self, obj, state: _EncodeState):
+        if obj is None or isinstance(obj, (str, bool, int, float)):
+            return obj
+        elif isinstance(obj, (list, tuple)):
+            return [self._encode(i, state) for i in obj]
+        elif isinstance(obj, dict):
+            data = {}
+            for k, v in obj.items():
+                k = _json_key(k)
+                if k.startswith('$'):
+                    k = '$' + k
+                    state.marked = True
+                data[k] = self._encode(v, state)
+            return data
+        elif isinstance(obj, OSAObjProxy):
+            state.marked = True
+            obj_id = state.helper_script._reference_id(obj)
+            specifier = state.helper_script._evicted.get(obj_id)
+            if specifier is not None:
+                return {'$r': obj_id, '$s': specifier}
+            return {'$r': obj_id}
+        elif isinstance(obj, datetime.datetime):
+            state.marked = True
+            return {'$d': obj.timestamp()}
+        else:
+            raise TypeError(f'Unsupported type: {type(obj)}')
+
+    def decode(self, helper_script: HelperScript, message: str):
+        return self.decode_message(helper_script, json.loads(message))
+
+    def decode_message(self, helper_script: HelperScript, envelope: dict):
+        if not envelope.get('x'):
+            return envelope.get('d')
+        strings = envelope.get('s') or []
+        return self._decode(envelope.get('d'), helper_script, strings)
+
+    def _decode(self, obj, helper_script: HelperScript, strings: List[str]):
+        if isinstance(obj, list):
+            return [self._decode(i, helper_script, strings) for i in obj]
+        elif isinstance(obj, dict):
+            if len(obj) == 1:
+                if '$r' in obj:
+                    obj_id, class_index, app_index = obj['$r']
+                    class_name = None if class_index is None else strings[class_index]
+                    app_name = None if app_index is None else strings[app_index]
+                    return helper_script._make_proxy(obj_id, class_name, app_name)
+                elif '$R' in obj:
+                    class_index, app_index, obj_ids = obj['$R']
+                    class_name = None if class_index is None else strings[class_index]
+                    app_name = None if app_index is None else strings[app_index]
+                    return helper_script._make_proxies(obj_ids, class_name, app_name)
+                elif '$d' in obj:
+                    return datetime.datetime.fromtimestamp(obj['$d'])
+            return {
+                (k[1:] if k.startswith('$') else k): self._decode(v, helper_script, strings) for k, v in obj.items()
+            }
+        return obj
+
+
+CODECS: Dict[int, Any] = {
+    TaggedJsonCodec.version: TaggedJsonCodec(),
+    CompactJsonCodec.version: CompactJsonCodec(),
+}
@@ -0,0 +1,220 @@
+"""Detection of N+1 round trips.
+
+Reading the same property of the elements of an array one by one, e.g.
+
+    >>> names = [record.name for record in db.contents]
+
+costs an Apple Event per element where `db.contents.pluck('name')` costs one
+in total. While a `NPlusOneDetector` is active, the reads made through helper
+scripts are grouped by the array their proxies came from and by property.
+Once `threshold` siblings have been read, a `Finding` is reported with the
+line of code making the reads and the bulk alternative. Elements fetched one
+by one by index (`array[i]` in a loop) are reported the same way.
+
+    >>> with detect_n_plus_one(threshold=20, fail=True):
+    ...     run_the_script()
+
+Setting `$PYDT3_N_PLUS_ONE` to a threshold activates a detector for the whole
+process, which emits a `NPlusOneWarning` per finding. Run the tests with
+`-W error::pydt3.diagnostics.NPlusOneWarning` to make them fail on it.
+"""
+from __future__ import annotations
+
+import linecache
+import logging
+import os
+import sys
+import threading
+import warnings
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from .objproxy import OSAObjProxy, OSAObjArray
+
+logger = logging.getLogger(__name__)
+
+_package_dir = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+class NPlusOneError(AssertionError):
+    """Raised by `detect_n_plus_one(fail=True)` when something was found."""
+
+    def __init__(self, findings: List[Finding]):
+        super().__init__('\n'.join(['N+1 round trips detected:'] + [f'  {finding}' for finding in findings]))
+        self.findings = findings
+
+
+class Finding:
+    """Calls of the same kind made on `count` siblings, from `filename`:`lineno`."""
+
+    def __init__(self, kind: str, class_name: Optional[str], name: str, count: int,
+                 filename: Optional[str], lineno: Optional[int], suggestion: str):
+        self.kind = kind
+        self.class_name = class_name
+        self.name = name
+        self.count = count
+        self.filename = filename
+        self.lineno = lineno
+        self.suggestion = suggestion
+
+    @property
+    def code(self) -> str:
+        if self.filename is None:
+            return ''
+        return linecache.getline(self.filename, self.lineno).strip()
+
+    def __str__(self):
+        where = 'unknown location' if self.filename is None else f'{self.filename}:{self.lineno}'
+        code = self.code
+        if code:
+            where += f' ({code})'
+        return f'{self.kind} `{self.name}` called on {self.count} {self.class_name or "object"}s at {where}: {self.suggestion}'
+
+    def __repr__(self):
+        return f'<Finding {self}>'
+
+
+def _caller() -> Tuple[Optional[str], Optional[int]]:
+    # The innermost frame outside of this package.
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename.startswith(_package_dir):
+        frame = frame.f_back
+    if frame is None:
+        return None, None
+    return frame.f_code.co_filename, frame.f_lineno
+
+
+class NPlusOneDetector:
+    """Watches the calls of the helper scripts while it's active (see `detect_n_plus_one`).
+
+    Args:
+        threshold (int): The number of siblings read one by one reported as a finding.
+        warn (bool): Emit a `NPlusOneWarning` per finding instead of logging it.
+    """
+
+    def __init__(self, threshold: int = 10, warn: bool = False):
+        if threshold < 2:
+            raise ValueError('threshold must be at least 2')
+        self.threshold = threshold
+        self.warn = warn
+        self.findings = [] # type: List[Finding]
+        self._groups = {} # type: Dict[tuple, set]
+        self._lock = threading.Lock()
+
+    def observe_read(self, func_name: str, obj: OSAObjProxy, name: str):
+        origin = getattr(obj, '_origin', None)
+        if origin is None:
+            return
+        key = (id(obj._helper_script), origin, func_name, name)
+        with self._lock:
+            siblings = self._groups.setdefault(key, set())
+            if siblings is None or obj.obj_id in siblings:
+                return
+            siblings.add(obj.obj_id)
+            if len(siblings) < self.threshold:
+                return
+            # Reported once per group.
+            self._groups[key] = None
+        kind = 'property' if func_name == 'getProperty' else 'method'
+        suggestion = f"read it for all the elements at once with `array.pluck('{name}')`"
+        self._report(Finding(kind, obj.class_name, name, self.threshold, *_caller(), suggestion))
+
+    def observe_index(self, array: OSAObjArray):
+        key = (id(array._helper_script), array.obj_id, 'at')
+        with self._lock:
+            count = self._groups.get(key, 0)
+            if count is None:
+                return
+            count += 1
+            self._groups[key] = count if count < self.threshold else None
+            if count < self.threshold:
+                return
+        suggestion = 'iterate over the array, which fetches the elements in chunks, or slice it with `array[start:stop]`'
+        self._report(Finding('element', 'element', 'at', self.threshold, *_caller(), suggestion))
+
+    def _report(self, finding: Finding):
+        with self._lock:
+            self.findings.append(finding)
+        if self.warn:
+            warnings.warn_explicit(str(finding), NPlusOneWarning, finding.filename or '<unknown>', finding.lineno or 0)
+        else:
+            logger.warning('N+1 round trips: %s', finding)
+
+    def reset(self):
+        with self._lock:
+            self.findings.clear()
+            self._groups.clear()
+
+
+_detectors = [] # type: List[NPlusOneDetector]
+_detectors_lock = threading.Lock()
+
+
+def observe_read(func_name: str, obj: OSAObjProxy, name: str):
+    for detector in _detectors:
+        detector.observe_read(func_name, obj, name)
+
+
+def observe_index(array: OSAObjArray):
+    for detector in _detectors:
+        detector.observe_index(array)
+
+
+def install(detector: NPlusOneDetector):
+    global _detectors
+    # The list is replaced rather than changed, as it's iterated without the lock.
+    with _detectors_lock:
+        _detectors = _detectors + [detector]
+
+
+def uninstall(detector: NPlusOneDetector):
+    global _detectors
+    with _detectors_lock:
+        _detectors = [d for d in _detectors if d is not detector]
+
+
+@contextmanager
+def detect_n_plus_one(threshold: int = 10, fail: bool = False, warn: bool = False) -> Iterator[NPlusOneDetector]:
+    """Detect the N+1 round trips made inside the block.
+
+    Args:
+        threshold (int): The number of siblings read one by one reported as a finding.
+        fail (bool): Raise `NPlusOneError` on exit if anything was found, e.g. to fail a test.
+        warn (bool): Emit a `NPlusOneWarning` per finding instead of logging it.
+
+    Examples:
+        >>> with detect_n_plus_one(threshold=5) as detector:
+        ...     names = [record.name for record in db.contents]
+        >>> print(detector.findings[0])
+        property `name` called on 5 records at script.py:12 (names = ...): read it for all the elements at once with `array.pluck('name')`
+    """
+    detector = NPlusOneDetector(threshold, warn)
+    install(detector)
+    try:
+        yield detector
+    finally:
+        uninstall(detector)
+    if fail and detector.findings:
+        raise NPlusOneError(list(detector.findings))
+
+
+def _install_from_environment():
+    value = os.environ.get('PYDT3_N_PLUS_ONE')
+    if not value:
+        return
+    try:
+        threshold = int(value)
+    except ValueError:
+        logger.warning('ignoring $PYDT3_N_PLUS_ONE=%r, expected a threshold', value)
+        return
+    install(NPlusOneDetector(threshold, warn=True))
+
+
+_install_from_environment()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from .helper_bridging import HelperScript
+
+
+class _LaneStats:
+    __slots__ = ('submitted', 'completed', 'depth', 'total_wait', 'max_wait', 'total_run', 'max_run')
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+
+    def asdict(self) -> dict:
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'depth': self.depth,
+            'mean_wait_seconds': self.total_wait / self.completed if self.completed else 0.0,
+            'max_wait_seconds': self.max_wait,
+            'mean_run_seconds': self.total_run / self.completed if self.completed else 0.0,
+            'max_run_seconds': self.max_run,
+        }
+
+
+class Dispatcher:
+    """A thread owning a `HelperScript` and running the work submitted to it one item at a time.
+
+    Once a helper is owned by a dispatcher, every call made through it (and
+    so through its proxies) from another thread is handed to the dispatcher
+    thread and waited for, which makes the proxies safe to share between
+    threads. `submit` runs a whole function on the dispatcher thread instead
+    and returns a future.
+
+    Work is taken by priority lane first (`INTERACTIVE` before `NORMAL`
+    before `BULK`), then in submission order. The lane of the calls a thread
+    makes implicitly is chosen with `priority`.
+
+    Examples:
+        >>> dispatcher = Dispatcher(helper)
+        >>> future = dispatcher.submit(lambda: [r.name for r in db.contents], priority=Dispatcher.BULK)
+        >>> with dispatcher.priority(Dispatcher.INTERACTIVE):
+        ...     name = record.name
+        >>> future.result()
+    """
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+    _LANES = {INTERACTIVE: 'interactive', NORMAL: 'normal', BULK: 'bulk'}
+    _STOP = object()
+
+    def __init__(self, helper_script: Optional[HelperScript] = None, name: str = 'pydt3-dispatcher'):
+        if helper_script is None:
+            from .helper_bridging import HelperScript
+            helper_script = HelperScript.default
+            if helper_script is None:
+                raise RuntimeError('No default helper script is available, pass `helper_script` explicitly')
+        if helper_script._dispatcher is not None:
+            raise ValueError('The helper script is already owned by a dispatcher')
+        self.helper_script = helper_script
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        # Reentrant, as `submit` may be called by a finalizer (see `ReleaseQueue.put`) run while it's held.
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._lanes = {priority: _LaneStats() for priority in self._LANES}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        helper_script._dispatcher = self
+
+    def in_dispatcher_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    @property
+    def current_priority(self) -> int:
+        """The lane of the calls made from the current thread."""
+        return getattr(self._local, 'priority', self.NORMAL)
+
+    @contextmanager
+    def priority(self, priority: int) -> Iterator[None]:
+        """Make the calls from the current thread in the block go through the lane `priority`."""
+        if priority not in self._LANES:
+            raise ValueError(f'Unknown priority: {priority}')
+        previous = self.current_priority
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def submit(self, fn: Callable[..., Any], *args, priority: Optional[int] = None, **kwargs) -> Future:
+        """Run `fn(*args, **kwargs)` on the dispatcher thread."""
+        if priority is None:
+            priority = self.current_priority
+        if priority not in self._LANES:
+            raise ValueError(f'Unknown priority: {priority}')
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('The dispatcher is closed')
+            lane = self._lanes[priority]
+            lane.submitted += 1
+            lane.depth += 1
+        # Run in the scopes of the submitting thread, not of the dispatcher thread.
+        scopes = tuple(self.helper_script._scopes())
+        self._queue.put((priority, next(self._counter), (future, fn, args, kwargs, scopes, time.perf_counter())))
+        return future
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the dispatcher thread and wait for its result."""
+        if self.in_dispatcher_thread():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _run(self):
+        while True:
+            priority, _, item = self._queue.get()
+            if item is self._STOP:
+                self.helper_script._dispatcher = None
+                return
+            future, fn, args, kwargs, scopes, submitted_at = item
+            started_at = time.perf_counter()
+            with self._lock:
+                self._lanes[priority].depth -= 1
+            if future.set_running_or_notify_cancel():
+                try:
+                    with self.helper_script._in_scopes(scopes):
+                        result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finished_at = time.perf_counter()
+            with self._lock:
+                lane = self._lanes[priority]
+                lane.completed += 1
+                lane.total_wait += started_at - submitted_at
+                lane.max_wait = max(lane.max_wait, started_at - submitted_at)
+                lane.total_run += finished_at - started_at
+                lane.max_run = max(lane.max_run, finished_at - started_at)
+
+    @property
+    def depth(self) -> int:
+        """The number of submitted items not started yet."""
+        return sum(lane.depth for lane in self._lanes.values())
+
+    def stats(self) -> dict:
+        """Queue depth and wait/run times, per lane."""
+        with self._lock:
+            return {name: self._lanes[priority].asdict() for priority, name in self._LANES.items()}
+
+    def close(self, wait: bool = True):
+        """Stop the thread once the submitted work is done and give the helper back to its callers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # After every lane, so that the pending work still runs.
+        self._queue.put((max(self._LANES) + 1, next(self._counter), self._STOP))
+        if wait and not self.in_dispatcher_thread():
+            self._thread.join()
+
+    def __enter__(self) -> Dispatcher:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,202 @@
+"""Read records in several processes at once.
+
+Apple Events to an app are answered one at a time per helper script, so a
+single process reading a whole database spends most of its time waiting on
+round trips. `ReadFarm` splits the records (by UUID) into shards and hands
+them to a pool of worker processes. Every worker owns its own helper script
+and returns plain data, which the parent merges back in the original order.
+
+    >>> with ReadFarm(workers=4) as farm:
+    ...     rows = farm.read(uuids, ['name', 'tags', 'plainText'])
+"""
+from __future__ import annotations
+
+import logging
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
+
+from .objproxy import OSAObjProxy
+
+
+if TYPE_CHECKING:
+    from .helper_bridging import HelperScript
+
+logger = logging.getLogger(__name__)
+
+_worker_helper = None # type: Optional[HelperScript]
+
+
+class ReadFarmError(RuntimeError):
+    """Some shards still failed after all the retries.
+
+    `results` holds what could be read, `failed_uuids` the UUIDs of the failed shards.
+    """
+
+    def __init__(self, message: str, results: Dict[str, Union[dict, RuntimeError, None]], failed_uuids: List[str]):
+        super().__init__(message)
+        self.results = results
+        self.failed_uuids = failed_uuids
+
+
+def _default_helper() -> HelperScript:
+    from .helper_bridging import HelperScript, DEFAULT_SCRIPT_PATH
+    return HelperScript.from_path(DEFAULT_SCRIPT_PATH)
+
+
+def _init_worker(helper_factory: Optional[Callable[[], HelperScript]]):
+    global _worker_helper
+    _worker_helper = (helper_factory or _default_helper)()
+
+
+def _plain(value):
+    # References are only meaningful to the process holding them.
+    if isinstance(value, OSAObjProxy):
+        return None
+    elif isinstance(value, list):
+        return [_plain(v) for v in value]
+    elif isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def _read_shard(uuids: List[str], properties: Sequence[str], app_name: str) -> Dict[str, Union[dict, RuntimeError, None]]:
+    helper = _worker_helper
+    app = helper.get_application(app_name)
+    # One event to resolve the records, one to read all their properties. A
+    # record that fails gets its error in its slot, like in `executeBatch`.
+    results = {} # type: Dict[str, Union[dict, RuntimeError, None]]
+    with helper.scope():
+        with helper.batch() as batch:
+            lookups = [(uuid, batch.call_method(app, 'getRecordWithUuid', [uuid])) for uuid in uuids]
+        records = []
+        for uuid, lookup in lookups:
+            error = lookup.exception()
+            if error is not None:
+                results[uuid] = error
+            else:
+                results[uuid] = None
+                if lookup.result() is not None:
+                    records.append((uuid, lookup.result()))
+        with helper.batch() as batch:
+            values = [(uuid, [batch.call_method(record, name) for name in properties]) for uuid, record in records]
+        for uuid, record_values in values:
+            errors = [value.exception() for value in record_values if value.exception() is not None]
+            if errors:
+                results[uuid] = errors[0]
+            else:
+                results[uuid] = {name: _plain(value.result()) for name, value in zip(properties, record_values)}
+    return results
+
+
+class ReadFarm:
+    """A pool of worker processes reading records by UUID.
+
+    Args:
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        helper_factory (Callable[[], HelperScript], optional): Creates the helper script of a worker.
+            It must be picklable (e.g. a module level function). Defaults to loading the bundled script.
+        shard_size (int, optional): The number of records a worker reads per task.
+        retries (int, optional): How many times a failed shard is tried again. A crashed worker pool is restarted.
+        app_name (str, optional): The application the records belong to.
+        mp_context (optional): The multiprocessing context of the pool.
+    """
+
+    def __init__(self, workers: Optional[int] = None, helper_factory: Optional[Callable[[], HelperScript]] = None,
+                 shard_size: int = 200, retries: int = 2, app_name: str = 'DEVONthink 3', mp_context=None):
+        if shard_size <= 0:
+            raise ValueError('shard_size must be positive')
+        self.workers = workers or os.cpu_count() or 1
+        self.helper_factory = helper_factory
+        self.shard_size = shard_size
+        self.retries = retries
+        self.app_name = app_name
+        self.mp_context = mp_context
+        self._executor = None # type: Optional[ProcessPoolExecutor]
+
+        self.shard_count = 0
+        self.retry_count = 0
+        self.restart_count = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=self.mp_context,
+                initializer=_init_worker, initargs=(self.helper_factory,))
+        return self._executor
+
+    def _restart(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.restart_count += 1
+
+    def shards(self, uuids: Sequence[str]) -> List[List[str]]:
+        return [list(uuids[i:i + self.shard_size]) for i in range(0, len(uuids), self.shard_size)]
+
+    def read(self, uuids: Iterable[str], properties: Sequence[str]) -> Dict[str, Union[dict, RuntimeError, None]]:
+        """Read `properties` (JXA names, e.g. `plainText`) of the records with `uuids`.
+
+        Returns a dict mapping every UUID, in the given order, to a dict of
+        the values, to None if there is no such record, or to the
+        `RuntimeError` raised reading the record, which doesn't fail the
+        others. Values referencing remote objects (e.g. `database`) are None.
+
+        Raises:
+            ReadFarmError: Some shards failed after all the retries.
+        """
+        uuids = list(dict.fromkeys(uuids))
+        properties = list(properties)
+        pending = self.shards(uuids)
+        self.shard_count += len(pending)
+        merged = {} # type: Dict[str, Union[dict, RuntimeError, None]]
+        attempts = 0
+        last_error = None # type: Optional[BaseException]
+        while pending:
+            futures = [(shard, self._pool().submit(_read_shard, shard, properties, self.app_name)) for shard in pending]
+            failed = []
+            broken = False
+            for shard, future in futures:
+                try:
+                    merged.update(future.result())
+                except BrokenProcessPool as e:
+                    broken = True
+                    failed.append(shard)
+                    last_error = e
+                except Exception as e:
+                    logger.debug('shard of %d records failed: %r', len(shard), e)
+                    failed.append(shard)
+                    last_error = e
+            if broken:
+                self._restart()
+            pending = failed
+            if pending:
+                if attempts >= self.retries:
+                    failed_uuids = [uuid for shard in pending for uuid in shard]
+                    results = {uuid: merged[uuid] for uuid in uuids if uuid in merged}
+                    raise ReadFarmError(f'{len(failed_uuids)} records failed: {last_error!r}',
+                                        results, failed_uuids) from last_error
+                attempts += 1
+                self.retry_count += len(pending)
+        return {uuid: merged[uuid] for uuid in uuids}
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'shards': self.shard_count,
+            'retries': self.retry_count,
+            'restarts': self.restart_count,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> ReadFarm:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
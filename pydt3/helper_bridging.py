@@ -1,36 +1,334 @@
 from __future__ import annotations
 
 import datetime
+import importlib
+import itertools
 import json
 import os
 import logging
-
-from typing import Optional, TYPE_CHECKING
+import tempfile
+import threading
+import time
+import weakref
+
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, TYPE_CHECKING
 from functools import lru_cache
 
 from .osascript import OSAScript
+from .transport import Transport, RecordingTransport, _plain_error
+from .release import ReleaseQueue
+from .refcount import ReferenceCounts
+from .binary import BinaryHandle
+from .hierarchy import ClassHierarchyCache
+from . import diagnostics, instrumentation
+from .codec import CODECS, TaggedJsonCodec
 from .objproxy import OSAObjProxy, OSAObjArray, DefaultOSAObjProxy
 
 
 if TYPE_CHECKING:
-    from Foundation import NSAppleScript
     from .application import Application
+    from .dispatcher import Dispatcher
 
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), 'jxa_helper.scpt')
 
+# The error of an Apple Event calling a handler the script doesn't define.
+_ERR_EVENT_NOT_HANDLED = -1708
+
+
+class _HelperScriptMeta(type):
+    _default_lock = threading.Lock()
+
+    @property
+    def default(cls) -> Optional[HelperScript]:
+        """The helper script shipped with the package, loaded on first use.
+
+        It's None if the script can't be loaded because PyObjC is not
+        available (e.g. not on macOS). A helper has to be created with an
+        explicit transport, such as the simulated one, in that case.
+        """
+        if '_default' not in cls.__dict__:
+            with cls._default_lock:
+                if '_default' not in cls.__dict__:
+                    cls._default = cls._load_default()
+        return cls._default
+
+    @default.setter
+    def default(cls, value: Optional[HelperScript]):
+        cls._default = value
 
-class HelperScript(OSAScript):
+
+class HelperScript(OSAScript, metaclass=_HelperScriptMeta):
     _class_map = {} # type: dict[str, dict[str, type[OSAObjProxy]]]
     _default_app_class_map = {}
+    # Modules registering the class map of an app, imported when the app is
+    # first seen. `None` stands for the default class map.
+    _lazy_class_maps = {
+        None: 'pydt3.application',
+        'DEVONthink 3': 'pydt3.apps.devonthink',
+        'Mail': 'pydt3.apps.mail',
+    } # type: dict[Optional[str], str]
+    # Held while a lazy class map is imported. The module registers its map
+    # before the entry is removed, so other threads wait for it instead of
+    # resolving classes without it. Reentrant for modules seeing other apps.
+    _class_map_lock = threading.RLock()
+
+    def __init__(self, transport: Transport, osaobj_rc: Optional[dict] = None, codec_version: Optional[int] = None):
+        super().__init__(transport)
+        self._codec = None if codec_version is None else CODECS[codec_version]
+        self._osaobj_rc = osaobj_rc if isinstance(osaobj_rc, ReferenceCounts) else ReferenceCounts(osaobj_rc)
+        # The live proxies by remote id. The helper hands out one id per
+        # remote object, so fetching an object again yields the same proxy.
+        self._proxies = weakref.WeakValueDictionary() # type: weakref.WeakValueDictionary[int, OSAObjProxy]
+        self.reused_proxies = 0
+        # The display strings of referenced objects the helper has evicted
+        # from its pool, sent along with them to resolve them again.
+        self._evicted = {} # type: dict[int, str]
+        self.evictions = 0
+        self.rehydrations = 0
+        self._release_queue = ReleaseQueue(self)
+        self._in_call = False
+        # Guards `_osaobj_rc`, proxies may be collected on any thread.
+        self._rc_lock = self._osaobj_rc.lock
+        self._dispatcher = None # type: Optional[Dispatcher]
+        # Property reads memoized by the active snapshots, see `snapshot`.
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_local = threading.local()
+        self._snapshot_count = 0
+        # The memo of each thread with an active snapshot, see `snapshot`.
+        self._snapshot_memos = [] # type: list[dict[tuple, Any]]
+        self._snapshot_generation = 0
+        self._inflight_reads = {} # type: dict[tuple, Future]
+        self.snapshot_hits = 0
+        self.coalesced_reads = 0
+        # The stack of active scopes of each thread, see `scope`, and the
+        # scopes active in any thread.
+        self._scope_local = threading.local()
+        self._active_scopes = set() # type: set[int]
+        self._used_scopes = set() # type: set[int]
+        self._scope_ids = itertools.count(1)
+        self._text_iterations = itertools.count(1)
+        self.class_hierarchy = ClassHierarchyCache(self)
 
-    default: HelperScript
-
-    def __init__(self, script: NSAppleScript, osaobj_rc: Optional[dict] = None):
-        super().__init__(script)
-        self._osaobj_rc = {} if osaobj_rc is None else osaobj_rc
+    @classmethod
+    def _load_default(cls) -> Optional[HelperScript]:
+        try:
+            helper = cls.from_path(DEFAULT_SCRIPT_PATH)
+        except ImportError:
+            logger.debug('PyObjC is not available, no default helper script is created')
+            return None
+        record_path = os.environ.get('PYDT3_RECORD')
+        if record_path:
+            helper.transport = RecordingTransport(helper.transport, record_path)
+        return helper
+
+    @property
+    def release_queue(self) -> ReleaseQueue:
+        """The ids of remote objects waiting to be released, see `ReleaseQueue`."""
+        return self._release_queue
+
+    def _scopes(self) -> list[int]:
+        # The active scopes of the current thread, innermost last.
+        scopes = getattr(self._scope_local, 'scopes', None)
+        if scopes is None:
+            scopes = self._scope_local.scopes = []
+        return scopes
+
+    @property
+    def current_scope(self) -> Optional[int]:
+        """The id of the innermost `scope` active in the current thread, if any."""
+        scopes = self._scopes()
+        return scopes[-1] if scopes else None
+
+    @contextmanager
+    def _in_scopes(self, scopes: tuple) -> Iterator[None]:
+        # Work handed to the dispatcher thread runs in the scopes of the thread that submitted it.
+        saved = getattr(self._scope_local, 'scopes', None)
+        self._scope_local.scopes = list(scopes)
+        try:
+            yield
+        finally:
+            self._scope_local.scopes = saved
+
+    @contextmanager
+    def scope(self) -> Iterator[int]:
+        """Release every object referenced inside the block at once when leaving it.
+
+        The helper tags the objects it hands out while the scope is active and
+        drops them all with a single call on exit. Proxies created inside the
+        scope skip reference counting and must not be used after it exits.
+
+        Scopes are per thread: only the calls made from the thread that
+        entered the scope (or on its behalf by a `Dispatcher`) are tagged.
+
+        Examples:
+            >>> with helper.scope():
+            ...     for record in db.contents:
+            ...         ingest(record.name, record.plain_text)
+        """
+        scope_id = next(self._scope_ids)
+        scopes = self._scopes()
+        scopes.append(scope_id)
+        self._active_scopes.add(scope_id)
+        try:
+            yield scope_id
+        finally:
+            scopes.remove(scope_id)
+            self._active_scopes.discard(scope_id)
+            if self._evicted:
+                self._forget_evicted_of_scope(scope_id)
+            if scope_id in self._used_scopes:
+                self._used_scopes.discard(scope_id)
+                self._call_func_pyobj_inout('releaseScope', {'scope': scope_id})
+
+    def _forget_evicted_of_scope(self, scope_id: int):
+        for obj_id in list(self._evicted):
+            proxy = self._proxies.get(obj_id)
+            if self._osaobj_rc.get(obj_id, 0) <= 0 and (proxy is None or proxy._scope_id == scope_id):
+                self._evicted.pop(obj_id, None)
+
+    @property
+    def referenced_objects(self) -> int:
+        """The number of remote objects referenced by unscoped proxies."""
+        return len(self._osaobj_rc)
+
+    def live_proxies(self) -> dict[str, int]:
+        """The number of live proxies of the helper by class name, see `pydt3.refcount`."""
+        return self._osaobj_rc.live_by_class()
+
+    def sample_proxy_sites(self, sample_rate: int = 100):
+        """Record where every `sample_rate`-th proxy is created, 0 to stop."""
+        if sample_rate < 0:
+            raise ValueError('sample_rate must not be negative')
+        self._osaobj_rc.sample_rate = sample_rate
+
+    def live_proxies_by_site(self, top: Optional[int] = 20) -> list[dict]:
+        """The creation sites of the live proxies sampled, most frequent first.
+
+        Each entry holds the `class` and `site` (file:line), the number of
+        live proxies `sampled` there and the `estimated` total.
+        """
+        return self._osaobj_rc.live_by_site(top)
+
+    def set_pool_limit(self, limit: Optional[int]) -> dict:
+        """Bound the helper's object pool to `limit` objects, None for no limit.
+
+        Past the limit, the helper evicts the least recently used object
+        specifiers. Their proxies stay usable: the helper resolves them again
+        from their display string on next use, which costs an Apple Event.
+        Returns the `pool_stats`.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError('limit must be at least 1')
+        return self._pool_stats(self._call_func_pyobj_inout('configurePool', {'limit': limit}))
+
+    def pool_stats(self) -> dict:
+        """The size and limit of the helper's object pool, with its eviction and rehydration counts."""
+        return self._pool_stats(self._call_func_pyobj_inout('configurePool', {}))
+
+    def _pool_stats(self, stats: dict) -> dict:
+        stats['evicted_references'] = len(self._evicted)
+        return stats
+
+    def _pool_events(self, evicted: Optional[dict], rehydrated: Optional[list]):
+        # Reported with a response by the helper when its pool is bounded.
+        for obj_id in rehydrated or ():
+            self._evicted.pop(obj_id, None)
+        self.rehydrations += len(rehydrated or ())
+        for obj_id, specifier in (evicted or {}).items():
+            obj_id = int(obj_id)
+            self.evictions += 1
+            # Only objects still referenced need to be resolved again.
+            if self._osaobj_rc.get(obj_id, 0) > 0 or obj_id in self._proxies:
+                self._evicted[obj_id] = specifier
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """Read every property at most once inside the block.
+
+        Property reads (`get_property`, and `call_method` without `args`
+        and `kwargs`) made from the current thread are memoized by the
+        object's id and the property name, until the outermost snapshot of
+        the thread exits. Identical reads running at the
+        same time in other threads with an active snapshot wait for the first
+        one instead of making their own call. Any other call through the
+        helper (setting properties, commands with arguments, batches...)
+        discards the memoized values, as it may have changed them.
+
+        Commands without arguments must pass `args=[]` to `call_method` so
+        that they aren't taken for property reads.
+
+        Examples:
+            >>> with helper.snapshot():
+            ...     if record.type != 'picture':
+            ...         names.append(record.name)
+            ...     print(record.name) # no Apple Event
+        """
+        local = self._snapshot_local
+        depth = getattr(local, 'depth', 0)
+        if depth == 0:
+            local.memo = {}
+            with self._snapshot_lock:
+                self._snapshot_memos.append(local.memo)
+                self._snapshot_count += 1
+        local.depth = depth + 1
+        try:
+            yield
+        finally:
+            local.depth -= 1
+            if local.depth == 0:
+                with self._snapshot_lock:
+                    self._snapshot_memos.remove(local.memo)
+                    self._snapshot_count -= 1
+                local.memo = None
+
+    def invalidate_snapshot(self):
+        """Discard the property values memoized by the active snapshots."""
+        if self._snapshot_count:
+            with self._snapshot_lock:
+                for memo in self._snapshot_memos:
+                    memo.clear()
+                self._snapshot_generation += 1
+
+    def _read(self, key: tuple, func_name: str, params):
+        diagnostics.observe_read(func_name, params['obj'], params['name'])
+        local = self._snapshot_local
+        if not getattr(local, 'depth', 0):
+            return self._call_func_pyobj_inout(func_name, params)
+        memo = local.memo
+        with self._snapshot_lock:
+            if key in memo:
+                self.snapshot_hits += 1
+                return memo[key]
+            generation = self._snapshot_generation
+            # Only the reads in flight are shared between threads.
+            future = self._inflight_reads.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight_reads[key] = Future()
+            else:
+                self.coalesced_reads += 1
+        if owner:
+            try:
+                value = self._call_func_pyobj_inout(func_name, params)
+            except BaseException as e:
+                with self._snapshot_lock:
+                    del self._inflight_reads[key]
+                future.set_exception(e)
+                raise
+            with self._snapshot_lock:
+                del self._inflight_reads[key]
+            future.set_result(value)
+        else:
+            value = future.result()
+        with self._snapshot_lock:
+            if generation == self._snapshot_generation:
+                memo[key] = value
+        return value
 
     def _unwrap_from_json(self, response: dict):
         if response['type'] == 'plain':
@@ -42,11 +340,7 @@ class HelperScript(OSAScript):
             class_name = response.get('className', None)
             app_name = response.get('app', None)
             obj_id = response['objId']
-            reference_cls = self.determine_class(app_name, class_name)
-            logger.debug(f'determined reference_cls: {reference_cls}')
-            assert issubclass(reference_cls, OSAObjProxy)
-            proxy = reference_cls(helper_script=self, obj_id=obj_id, class_name=class_name)
-            return proxy
+            return self._make_proxy(obj_id, class_name, app_name)
 
         elif response['type'] == 'array':
             data = response['data']
@@ -83,27 +377,146 @@ class HelperScript(OSAScript):
                 'data': {k: self._wrap_to_json(v) for k, v in obj.items()}
             }
         elif isinstance(obj, OSAObjProxy):
-            if obj._helper_script is not self:
-                raise ValueError('The proxy object is not created by this script')
+            obj_id = self._reference_id(obj)
+            specifier = self._evicted.get(obj_id)
+            if specifier is not None:
+                return {'type': 'reference', 'objId': obj_id, 'specifier': specifier}
             return {
                 'type': 'reference',
-                'objId': obj.obj_id
+                'objId': obj_id
             }
         else:
             raise TypeError(f'Unsupported type: {type(obj)}')
-    
-    def _call_func_pyobj_inout(self, func_name: str, params):
 
-        params = self._wrap_to_json(params)
-        logger.debug(f'func_name: {func_name}')
-        params = json.dumps(params)
-        logger.debug(f'params: {params}')
-        result = self._call_str(func_name, params)
-        logger.debug(f'result: {result}')
+    def _make_proxy(self, obj_id: int, class_name: Optional[str], app_name: Optional[str]) -> OSAObjProxy:
+        reference_cls = self.determine_class(app_name, class_name)
+        logger.debug('determined reference_cls: %s', reference_cls)
+        assert issubclass(reference_cls, OSAObjProxy)
+        return self._proxy_of(reference_cls, obj_id, class_name)
+
+    def _make_proxies(self, obj_ids: list, class_name: Optional[str], app_name: Optional[str]) -> list:
+        # The class is resolved once for references known to share it.
+        reference_cls = self.determine_class(app_name, class_name)
+        assert issubclass(reference_cls, OSAObjProxy)
+        return [self._proxy_of(reference_cls, obj_id, class_name) for obj_id in obj_ids]
+
+    def _proxy_of(self, reference_cls: type, obj_id: int, class_name: Optional[str]) -> OSAObjProxy:
+        # Under the lock `_forget_proxy` takes, so that a proxy whose `__del__` has started isn't reused.
+        with self._rc_lock:
+            proxy = self._proxies.get(obj_id)
+            # A proxy may have been rebound to another object since, or belong to
+            # a scope that has exited or that the current thread isn't in.
+            if (proxy is not None and type(proxy) is reference_cls and proxy.obj_id == obj_id
+                    and (proxy._scope_id is None or proxy._scope_id in self._scopes())):
+                self.reused_proxies += 1
+                return proxy
+            proxy = reference_cls(helper_script=self, obj_id=obj_id, class_name=class_name)
+            self._proxies[obj_id] = proxy
+            return proxy
 
-        result = json.loads(result)
-        return self._unwrap_from_json(result)
+    def _forget_proxy(self, proxy: OSAObjProxy):
+        # Called from `__del__`, while the weak reference to the proxy still resolves.
+        with self._rc_lock:
+            if self._proxies.get(proxy.obj_id) is proxy:
+                del self._proxies[proxy.obj_id]
+
+    def _reference_id(self, obj: OSAObjProxy) -> int:
+        """The id to send to the helper for `obj`."""
+        if obj._helper_script is not self:
+            raise ValueError('The proxy object is not created by this script')
+        if obj._scope_id is not None and obj._scope_id not in self._active_scopes:
+            raise ValueError('The proxy object belongs to a scope that has exited')
+        return obj.obj_id
+    
+    @property
+    def dispatcher(self) -> Optional[Dispatcher]:
+        """The `Dispatcher` owning the helper, if any."""
+        return self._dispatcher
 
+    def _call_func_pyobj_inout(self, func_name: str, params):
+        dispatcher = self._dispatcher
+        if dispatcher is not None and not dispatcher.in_dispatcher_thread():
+            return dispatcher.submit(self._call_func_pyobj_inout, func_name, params).result()
+        codec = self.codec
+        envelope = {}
+        released = self._release_queue.drain()
+        if released:
+            # Objects the proxies of which have been collected since the last call.
+            envelope['release'] = released
+        scope_id = self.current_scope
+        if scope_id is not None:
+            envelope['scope'] = scope_id
+            self._used_scopes.add(scope_id)
+        if instrumentation.wants_helper_timings():
+            envelope['timing'] = 1
+        name = params.get('name') if isinstance(params, dict) else None
+        logger.debug('func_name: %s', func_name)
+        self._in_call = True
+        start = time.perf_counter()
+        message = None
+        try:
+            message = codec.encode(self, params, envelope)
+            encoded = time.perf_counter()
+            logger.debug('params: %s', message)
+            result = self._call_str(func_name, message)
+        except Exception:
+            if released:
+                self._release_queue.requeue(released)
+            if instrumentation.enabled:
+                instrumentation.record_call(func_name, name, len((message or '').encode('utf-8')), 0, 0.0,
+                                            time.perf_counter() - start, 0.0, error=True)
+            raise
+        finally:
+            self._in_call = False
+        received = time.perf_counter()
+        logger.debug('result: %s', result)
+
+        response = json.loads(result)
+        helper_timings = evicted = rehydrated = None
+        if isinstance(response, dict):
+            helper_timings = response.pop('t', None)
+            evicted = response.pop('e', None)
+            rehydrated = response.pop('h', None)
+        value = codec.decode_message(self, response)
+        if evicted or rehydrated:
+            self._pool_events(evicted, rehydrated)
+        if instrumentation.enabled:
+            instrumentation.record_call(func_name, name, len(message.encode('utf-8')), len(result.encode('utf-8')),
+                                        encoded - start, received - encoded, time.perf_counter() - received, False, helper_timings)
+        return value
+
+    @property
+    def codec(self):
+        """The wire format used with the helper, negotiated on first use. See `pydt3.codec`."""
+        if self._codec is None:
+            self._codec = self._negotiate_codec()
+        return self._codec
+
+    def _negotiate_codec(self):
+        # The negotiation itself is done in the format every helper understands.
+        self._codec = CODECS[TaggedJsonCodec.version]
+        try:
+            version = self._call_func_pyobj_inout('negotiateCodec', {'versions': sorted(CODECS, reverse=True)})
+        except RuntimeError as e:
+            error = _plain_error(e.args[0]) if e.args else None
+            if not isinstance(error, dict) or error.get('NSAppleScriptErrorNumber') != _ERR_EVENT_NOT_HANDLED:
+                # Negotiated again on next use.
+                self._codec = None
+                raise
+            # The helper predates the negotiation.
+            version = TaggedJsonCodec.version
+        logger.debug('negotiated codec version: %s', version)
+        return CODECS.get(version, CODECS[TaggedJsonCodec.version])
+
+    def batch(self) -> Batch:
+        """Queue calls and send them to the helper in a single Apple Event.
+
+        Examples:
+            >>> with helper.batch() as b:
+            ...     names = [b.call_method(record, 'name') for record in records]
+            >>> [name.result() for name in names]
+        """
+        return Batch(self)
 
     def echo(self, params):
         return self._call_func_pyobj_inout('echo', params)
@@ -111,32 +524,115 @@ class HelperScript(OSAScript):
     def release_object_with_id(self, id: int):
         return self._call_func_pyobj_inout('releaseObjectWithId', {'id': id})
 
+    def release_objects_with_ids(self, ids: list):
+        return self._call_func_pyobj_inout('releaseObjectsWithIds', {'ids': ids})
+
+    def defer_release(self, obj_id: int):
+        """Release the object with `obj_id` later, together with others."""
+        self._evicted.pop(obj_id, None)
+        self._release_queue.put(obj_id)
+
+    def flush_releases(self):
+        """Release the objects waiting in the release queue now."""
+        self._release_queue.flush()
+
     def get_application(self, name: str) -> Application:
         return self._call_func_pyobj_inout('getApplication', {'name': name})
     
-    def eval_jxa_code_snippet(self, source: str, locals: Optional[dict] = None):
+    def eval_jxa_code_snippet(self, source: str, locals: Optional[dict] = None, read_only: bool = False):
+        """Evaluate `source` in the helper.
+
+        The active snapshots are discarded, unless `read_only` tells that the
+        snippet doesn't change anything.
+        """
+        if not read_only:
+            self.invalidate_snapshot()
         return self._call_func_pyobj_inout('evalJXACodeSnippet', {'source': source, 'locals': locals})
     
     def eval_applescript_code_snippet(self, source: str, locals: Optional[dict] = None):
+        self.invalidate_snapshot()
         return self._call_func_pyobj_inout('evalAppleScriptCodeSnippet', {'source': source, 'locals': locals})
 
     def get_property(self, obj: OSAObjProxy, name: str):
-        return self._call_func_pyobj_inout('getProperty', {'obj': obj, 'name': name})
+        return self._read(('getProperty', obj.obj_id, name), 'getProperty', {'obj': obj, 'name': name})
 
     def get_properties(self, obj: OSAObjProxy, properties: list):
         return self._call_func_pyobj_inout('getProperties', {'obj': obj, 'properties': properties})
 
+    def get_columns(self, obj: OSAObjArray, properties: list, start: Optional[int] = None, count: Optional[int] = None) -> dict:
+        return self._call_func_pyobj_inout('getColumns', {'obj': obj, 'properties': properties, 'start': start, 'count': count})
+
+    def get_elements(self, obj: OSAObjArray, start: Optional[int] = None, end: Optional[int] = None) -> dict:
+        result = self._call_func_pyobj_inout('getElements', {'obj': obj, 'start': start, 'end': end})
+        for element in result['elements']:
+            if isinstance(element, OSAObjProxy):
+                element._origin = obj.obj_id
+        return result
+
     def set_properties(self, obj: OSAObjProxy, key_values: dict):
+        self.invalidate_snapshot()
         return self._call_func_pyobj_inout('setProperties', {'obj': obj, 'keyValues': key_values})
     
     def call_method(self, obj: OSAObjProxy, name: str, args = None, kwargs: dict = None):
-        return self._call_func_pyobj_inout('callMethod', {'obj': obj, 'name': name, 'args': args, 'kwargs': kwargs})
+        params = {'obj': obj, 'name': name, 'args': args, 'kwargs': kwargs}
+        if args is None and kwargs is None:
+            return self._read(('callMethod', obj.obj_id, name), 'callMethod', params)
+        self.invalidate_snapshot()
+        return self._call_func_pyobj_inout('callMethod', params)
 
     def call_self(self, obj: OSAObjProxy, args = None, kwargs: dict = None):
+        self.invalidate_snapshot()
         return self._call_func_pyobj_inout('callSelf', {'obj': obj, 'args': args, 'kwargs': kwargs})
 
+    def read_text(self, obj: OSAObjProxy, name: str, start: int = 0, length: Optional[int] = None,
+                  iteration: Optional[int] = None) -> dict:
+        """Read `length` characters of a text property from `start`.
+
+        Returns `{'text': ..., 'end': ..., 'total': ...}`, `end` being the
+        offset to continue reading from. The ranges read with the same
+        `iteration` id are sliced from a single read of the text, see `iter_text`.
+        """
+        return self._call_func_pyobj_inout('readText', {'obj': obj, 'name': name, 'start': start, 'length': length,
+                                                       'iteration': iteration})
+
+    def iter_text(self, obj: OSAObjProxy, name: str, chunk_chars: int = 65536) -> Iterator[str]:
+        """Iterate over a text property in chunks of about `chunk_chars` characters.
+
+        The helper reads the text once and keeps it until the last chunk is
+        read (or another text is read), so the chunks come from one version
+        of the text even if it is modified meanwhile.
+        """
+        if chunk_chars <= 0:
+            raise ValueError('chunk_chars must be positive')
+        iteration = next(self._text_iterations)
+        start = 0
+        while True:
+            result = self.read_text(obj, name, start, chunk_chars, iteration)
+            if result['text']:
+                yield result['text']
+            start = result['end']
+            if start >= result['total']:
+                return
+
+    def write_property_to_file(self, obj: OSAObjProxy, name: str, suffix: str = '') -> Optional[BinaryHandle]:
+        """Have the helper write the binary value of a property to a temporary file.
+
+        Returns None if the property has no value.
+        """
+        fd, path = tempfile.mkstemp(prefix='pydt3-', suffix=suffix)
+        os.close(fd)
+        try:
+            result = self._call_func_pyobj_inout('writePropertyToFile', {'obj': obj, 'name': name, 'path': path})
+        except BaseException:
+            os.unlink(path)
+            raise
+        if result is None:
+            os.unlink(path)
+            return None
+        return BinaryHandle(path, result['size'])
+
     def get_parent_of_class(self, application: str, class_name: str):
-        return self.eval_jxa_code_snippet(f'Application("{application}").parentOfClass("{class_name}")')
+        return self.eval_jxa_code_snippet(f'Application("{application}").parentOfClass("{class_name}")', read_only=True)
 
     @lru_cache(maxsize=1024)
     def determine_class(self, app_name: str, class_name: str | None) -> type[OSAObjProxy]:
@@ -148,6 +644,7 @@ class HelperScript(OSAScript):
             return DefaultOSAObjProxy
 
 
+        self._load_class_map(app_name)
         current_class_name = class_name
         reference_cls = None
         while current_class_name is not None:
@@ -158,13 +655,37 @@ class HelperScript(OSAScript):
             elif app_name is None:
                 return DefaultOSAObjProxy
             else:
-                current_class_name = self.get_parent_of_class(app_name, current_class_name)
+                current_class_name = self.class_hierarchy.parent_of_class(app_name, current_class_name)
 
         return DefaultOSAObjProxy
 
+    @classmethod
+    def _load_class_map(cls, app_name: Optional[str]):
+        if app_name not in cls._class_map and app_name in cls._lazy_class_maps:
+            cls._import_class_map(app_name)
+        if not cls._default_app_class_map and None in cls._lazy_class_maps:
+            cls._import_class_map(None)
+
+    @classmethod
+    def _import_class_map(cls, app_name: Optional[str]):
+        with cls._class_map_lock:
+            module = cls._lazy_class_maps.get(app_name)
+            if module is not None:
+                # An import error propagates and leaves the entry in place,
+                # so the import is tried again on the next lookup.
+                importlib.import_module(module)
+                del cls._lazy_class_maps[app_name]
+
     @classmethod
     def register_class_map(cls, app_name: str, class_map: dict[str, type[OSAObjProxy]]):
         cls._class_map[app_name] = class_map
+
+    @classmethod
+    def register_lazy_class_map(cls, app_name: str, module: str):
+        """Import `module`, which registers the class map of `app_name`, when the app is first seen."""
+        with cls._class_map_lock:
+            if app_name not in cls._class_map:
+                cls._lazy_class_maps[app_name] = module
     
     @classmethod
     def set_default_class_map(cls, class_map: dict[str, type[OSAObjProxy]]):
@@ -174,7 +695,100 @@ class HelperScript(OSAScript):
         return id(self)
 
 
-HelperScript.default = HelperScript.from_path(DEFAULT_SCRIPT_PATH)
+class BatchFuture(Future):
+    """The future result of a queued call. Asking for the result before the
+    batch has been executed executes it."""
+
+    def __init__(self, batch: Batch):
+        super().__init__()
+        self._batch = batch
+
+    def result(self, timeout=None):
+        if not self.done():
+            self._batch.execute()
+        return super().result(timeout)
+
+    def exception(self, timeout=None):
+        if not self.done():
+            self._batch.execute()
+        return super().exception(timeout)
+
+
+class Batch:
+    """Calls of a `HelperScript` queued to be executed together by `executeBatch`.
+
+    Every method returns a future which is resolved when the batch is
+    executed, either explicitly with `execute` or when leaving the `with`
+    block. A call that fails only fails its own future.
+    """
+
+    def __init__(self, helper_script: HelperScript):
+        self._helper_script = helper_script
+        self._calls = [] # type: list[tuple[str, dict, BatchFuture]]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _queue(self, func_name: str, params: dict) -> BatchFuture:
+        future = BatchFuture(self)
+        self._calls.append((func_name, params, future))
+        return future
+
+    def execute(self):
+        calls, self._calls = self._calls, []
+        if not calls:
+            return
+        self._helper_script.invalidate_snapshot()
+        try:
+            results = self._helper_script._call_func_pyobj_inout('executeBatch', {
+                'calls': [{'name': func_name, 'params': params} for func_name, params, _ in calls]
+            })
+        except Exception as e:
+            for _, _, future in calls:
+                future.set_exception(e)
+            raise
+
+        for (_, _, future), result in zip(calls, results):
+            if result['ok']:
+                future.set_result(result.get('result'))
+            else:
+                future.set_exception(RuntimeError(result['error']))
+
+    def echo(self, params) -> BatchFuture:
+        return self._queue('echo', params)
+
+    def get_property(self, obj: OSAObjProxy, name: str) -> BatchFuture:
+        return self._queue('getProperty', {'obj': obj, 'name': name})
+
+    def get_properties(self, obj: OSAObjProxy, properties: list) -> BatchFuture:
+        return self._queue('getProperties', {'obj': obj, 'properties': properties})
+
+    def get_columns(self, obj: OSAObjArray, properties: list, start: Optional[int] = None, count: Optional[int] = None) -> BatchFuture:
+        return self._queue('getColumns', {'obj': obj, 'properties': properties, 'start': start, 'count': count})
+
+    def get_elements(self, obj: OSAObjArray, start: Optional[int] = None, end: Optional[int] = None) -> BatchFuture:
+        return self._queue('getElements', {'obj': obj, 'start': start, 'end': end})
+
+    def set_properties(self, obj: OSAObjProxy, key_values: dict) -> BatchFuture:
+        return self._queue('setProperties', {'obj': obj, 'keyValues': key_values})
+
+    def call_method(self, obj: OSAObjProxy, name: str, args = None, kwargs: dict = None) -> BatchFuture:
+        return self._queue('callMethod', {'obj': obj, 'name': name, 'args': args, 'kwargs': kwargs})
+
+    def call_self(self, obj: OSAObjProxy, args = None, kwargs: dict = None) -> BatchFuture:
+        return self._queue('callSelf', {'obj': obj, 'args': args, 'kwargs': kwargs})
+
+    def __enter__(self) -> Batch:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+        else:
+            calls, self._calls = self._calls, []
+            for _, _, future in calls:
+                future.cancel()
+
 
 if __name__ == '__main__':
     script = HelperScript.from_path('/Users/koc/Developer/devonthink/python-api/pydt3/jxa_helper.scpt')
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+
+from typing import Dict, Optional, TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from .helper_bridging import HelperScript
+
+logger = logging.getLogger(__name__)
+
+# Parent classes taken from the scripting dictionaries. They hold for every
+# version of the app, so they are never looked up nor persisted.
+BUILTIN_CLASS_HIERARCHY = {
+    'DEVONthink 3': {
+        'record': 'item',
+        'database': 'item',
+        'reminder': 'item',
+        'tab': 'item',
+        'child': 'record',
+        'content': 'record',
+        'parent': 'record',
+        'smartGroup': 'record',
+        'tagGroup': 'parent',
+        'thinkWindow': 'window',
+        'documentWindow': 'thinkWindow',
+        'viewerWindow': 'thinkWindow',
+    },
+} # type: dict[str, dict[str, Optional[str]]]
+
+
+def default_cache_directory() -> str:
+    """`$PYDT3_CACHE_DIR`, or `pydt3` in the user's cache directory."""
+    directory = os.environ.get('PYDT3_CACHE_DIR')
+    if directory:
+        return directory
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'pydt3')
+
+
+class ClassHierarchyCache:
+    """The parent classes of an app's scripting classes, as used by `HelperScript.determine_class`.
+
+    A parent is looked up in `BUILTIN_CLASS_HIERARCHY` first, then in the
+    table learned for the app's name and version. Only classes missing from
+    both cost a `parentOfClass` call. The answer is added to the table, which
+    is saved as JSON in `directory` and loaded again by later processes. So
+    once a class has been seen, resolving it doesn't involve the app anymore,
+    except for fetching the app's version once per process.
+    """
+
+    def __init__(self, helper_script: HelperScript, directory: Optional[str] = None):
+        self.helper_script = helper_script
+        self.directory = default_cache_directory() if directory is None else directory
+        self._tables = {} # type: dict[str, dict[str, Optional[str]]]
+        self._versions = {} # type: dict[str, Optional[str]]
+        self._lock = threading.Lock()
+
+    def parent_of_class(self, app_name: str, class_name: str) -> Optional[str]:
+        builtin = BUILTIN_CLASS_HIERARCHY.get(app_name, {})
+        if class_name in builtin:
+            return builtin[class_name]
+        table = self._table(app_name)
+        if class_name in table:
+            return table[class_name]
+        parent = self.helper_script.get_parent_of_class(app_name, class_name)
+        with self._lock:
+            table[class_name] = parent
+        self._save(app_name)
+        return parent
+
+    def version(self, app_name: str) -> Optional[str]:
+        if app_name not in self._versions:
+            try:
+                version = self.helper_script.eval_jxa_code_snippet(f'Application("{app_name}").version()', read_only=True)
+            except RuntimeError as e:
+                logger.debug('failed to get the version of %s: %r', app_name, e)
+                version = None
+            self._versions[app_name] = None if version is None else str(version)
+        return self._versions[app_name]
+
+    def path(self, app_name: str) -> Optional[str]:
+        """The file the table of `app_name` is saved in, None if the app's version is unknown."""
+        version = self.version(app_name)
+        if version is None:
+            return None
+        filename = re.sub(r'[^\w.-]+', '_', f'{app_name}-{version}') + '.json'
+        return os.path.join(self.directory, filename)
+
+    def _table(self, app_name: str) -> Dict[str, Optional[str]]:
+        table = self._tables.get(app_name)
+        if table is None:
+            table = {}
+            path = self.path(app_name)
+            if path is not None:
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        table = json.load(f)['parents']
+                except FileNotFoundError:
+                    pass
+                except (OSError, ValueError, KeyError) as e:
+                    logger.debug('ignoring class hierarchy cache %s: %r', path, e)
+            self._tables[app_name] = table
+        return table
+
+    def _save(self, app_name: str):
+        path = self.path(app_name)
+        if path is None:
+            return
+        with self._lock:
+            parents = dict(self._tables[app_name])
+        try:
+            # Keep what other processes learned in the meantime.
+            with open(path, encoding='utf-8') as f:
+                parents = {**json.load(f)['parents'], **parents}
+        except (OSError, ValueError, KeyError):
+            pass
+        data = {'app': app_name, 'version': self.version(app_name), 'parents': parents}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug('failed to save class hierarchy cache %s: %r', path, e)
+
+    def clear(self):
+        """Forget the learned tables, in memory and on disk."""
+        for app_name in list(self._tables):
+            path = self.path(app_name)
+            if path is not None and os.path.exists(path):
+                os.unlink(path)
+        self._tables.clear()
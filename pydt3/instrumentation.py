@@ -0,0 +1,266 @@
+"""Counters and latency histograms of the calls to the helper script.
+
+Every call made through a `HelperScript` is recorded under its helper
+function and the property or method name it targets (e.g. `callMethod
+name`), with the sizes of the JSON request and response in UTF-8 bytes and
+the time spent encoding it, waiting for the helper (the remote time) and
+decoding the result. Set `enabled` to False to turn the recording off.
+
+The remote time can be broken down further by the helper itself: while
+`helper_timings` is True or a `profile` block is active, every request asks
+the helper to time its phases, which are recorded as well:
+
+- unwrap: parsing the request and resolving the references in it,
+- app: running the function, mostly the Apple Events to the target app,
+- wrap: converting the result, including the `class()` lookups of references,
+- stringify: serializing the response.
+
+What's left of the remote time is spent in the Apple Event to the helper
+itself (the bridge). The helper measures in milliseconds, so the phases of
+fast calls are only meaningful summed up.
+
+    >>> pydt3.stats()['calls']['callMethod name']['count']
+    >>> with pydt3.profile():
+    ...     names = [record.name for record in db.contents]
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+
+# The phases timed by the helper, in the order it reports them.
+HELPER_PHASES = ('unwrap', 'app', 'wrap', 'stringify')
+
+# Upper bounds of the latency buckets, in seconds.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float('inf'))
+
+
+class CallStats:
+    """The statistics of the calls sharing one key."""
+
+    __slots__ = ('count', 'errors', 'total_seconds', 'max_seconds', 'encode_seconds', 'remote_seconds',
+                 'decode_seconds', 'request_bytes', 'response_bytes', 'histogram',
+                 'helper_timed', 'helper_remote_seconds', 'helper_seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.remote_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.histogram = [0] * len(BUCKETS)
+        # Calls the helper timed, their remote time and the time of each phase.
+        self.helper_timed = 0
+        self.helper_remote_seconds = 0.0
+        self.helper_seconds = [0.0] * len(HELPER_PHASES)
+
+    def percentile(self, q: float) -> float:
+        """The upper bound of the bucket holding the `q` quantile (0 < q <= 1) of the latencies."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.histogram):
+            seen += n
+            if n and seen >= target:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def asdict(self) -> dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_seconds': self.total_seconds,
+            'mean_seconds': self.total_seconds / self.count if self.count else 0.0,
+            'max_seconds': self.max_seconds,
+            'p50_seconds': self.percentile(0.5),
+            'p90_seconds': self.percentile(0.9),
+            'p99_seconds': self.percentile(0.99),
+            'encode_seconds': self.encode_seconds,
+            'remote_seconds': self.remote_seconds,
+            'decode_seconds': self.decode_seconds,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'histogram': dict(zip(BUCKETS, self.histogram)),
+            'helper': self.helper_asdict(),
+        }
+
+    def helper_asdict(self) -> dict:
+        phases = {f'{phase}_seconds': seconds for phase, seconds in zip(HELPER_PHASES, self.helper_seconds)}
+        return {
+            'timed_calls': self.helper_timed,
+            **phases,
+            'bridge_seconds': max(self.helper_remote_seconds - sum(self.helper_seconds), 0.0),
+        }
+
+
+class Recorder:
+    """Collects `CallStats` by key and keeps the slowest calls."""
+
+    def __init__(self, slowest: int = 10):
+        self.slowest_size = slowest
+        self._calls = {} # type: Dict[str, CallStats]
+        self._slowest = [] # type: List[Tuple[float, int, dict]]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, key: str, request_bytes: int, response_bytes: int,
+               encode_seconds: float, remote_seconds: float, decode_seconds: float, error: bool = False,
+               helper_seconds: Optional[Sequence[float]] = None):
+        total = encode_seconds + remote_seconds + decode_seconds
+        with self._lock:
+            stats = self._calls.get(key)
+            if stats is None:
+                stats = self._calls[key] = CallStats()
+            stats.count += 1
+            stats.errors += error
+            stats.total_seconds += total
+            stats.max_seconds = max(stats.max_seconds, total)
+            stats.encode_seconds += encode_seconds
+            stats.remote_seconds += remote_seconds
+            stats.decode_seconds += decode_seconds
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.histogram[bisect.bisect_left(BUCKETS, total)] += 1
+            if helper_seconds is not None:
+                stats.helper_timed += 1
+                stats.helper_remote_seconds += remote_seconds
+                for i, seconds in enumerate(helper_seconds):
+                    stats.helper_seconds[i] += seconds
+            if self.slowest_size:
+                entry = (total, next(self._counter), {
+                    'key': key, 'seconds': total, 'remote_seconds': remote_seconds,
+                    'request_bytes': request_bytes, 'response_bytes': response_bytes, 'time': time.time(),
+                    'helper': None if helper_seconds is None else dict(zip(HELPER_PHASES, helper_seconds)),
+                })
+                if len(self._slowest) < self.slowest_size:
+                    heapq.heappush(self._slowest, entry)
+                elif total > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, entry)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = {key: stats.asdict() for key, stats in self._calls.items()}
+            slowest = [entry for _, _, entry in sorted(self._slowest, reverse=True)]
+        return {
+            'since': self.started_at,
+            'calls': calls,
+            'totals': {
+                'count': sum(c['count'] for c in calls.values()),
+                'errors': sum(c['errors'] for c in calls.values()),
+                'seconds': sum(c['total_seconds'] for c in calls.values()),
+                'remote_seconds': sum(c['remote_seconds'] for c in calls.values()),
+                'request_bytes': sum(c['request_bytes'] for c in calls.values()),
+                'response_bytes': sum(c['response_bytes'] for c in calls.values()),
+            },
+            'slowest': slowest,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._slowest.clear()
+            self.started_at = time.time()
+
+
+_global_recorder = Recorder()
+_recorders = [_global_recorder] # type: List[Recorder]
+_recorders_lock = threading.Lock()
+# The active profiles asking for the helper's timings.
+_timing_profiles = 0
+
+enabled = True
+helper_timings = False
+
+
+def wants_helper_timings() -> bool:
+    """Whether the helper should time the phases of the calls."""
+    return enabled and (helper_timings or _timing_profiles > 0)
+
+
+def record_call(func_name: str, name: Optional[str], request_bytes: int, response_bytes: int,
+                encode_seconds: float, remote_seconds: float, decode_seconds: float, error: bool = False,
+                helper_milliseconds: Optional[Sequence[float]] = None):
+    key = func_name if name is None else f'{func_name} {name}'
+    helper_seconds = None if helper_milliseconds is None else [ms / 1000 for ms in helper_milliseconds]
+    for recorder in _recorders:
+        recorder.record(key, request_bytes, response_bytes, encode_seconds, remote_seconds, decode_seconds, error,
+                        helper_seconds)
+
+
+def stats() -> dict:
+    """The statistics of all the calls since the process started (or `reset_stats`)."""
+    return _global_recorder.snapshot()
+
+
+def reset_stats():
+    _global_recorder.reset()
+
+
+def format_report(snapshot: dict, top: int = 20) -> str:
+    lines = []
+    totals = snapshot['totals']
+    lines.append(f'{totals["count"]} calls, {totals["errors"]} errors, {totals["seconds"] * 1000:.1f}ms '
+                 f'({totals["remote_seconds"] * 1000:.1f}ms remote), '
+                 f'{totals["request_bytes"]} bytes sent, {totals["response_bytes"]} bytes received')
+    calls = sorted(snapshot['calls'].items(), key=lambda item: item[1]['total_seconds'], reverse=True)
+    if calls:
+        lines.append('')
+        lines.append(f'{"call":<40}{"count":>7}{"total ms":>10}{"mean ms":>9}{"p90 ms":>9}'
+                     f'{"remote %":>10}{"sent":>10}{"received":>10}')
+        for key, c in calls[:top]:
+            remote = c['remote_seconds'] / c['total_seconds'] * 100 if c['total_seconds'] else 0.0
+            lines.append(f'{key[:39]:<40}{c["count"]:>7}{c["total_seconds"] * 1000:>10.1f}'
+                         f'{c["mean_seconds"] * 1000:>9.2f}{c["p90_seconds"] * 1000:>9.2f}{remote:>9.1f}%'
+                         f'{c["request_bytes"]:>10}{c["response_bytes"]:>10}')
+    timed = [(key, c['helper']) for key, c in calls[:top] if c['helper']['timed_calls']]
+    if timed:
+        lines.append('')
+        lines.append(f'{"helper phases (ms)":<40}{"timed":>7}' + ''.join(f'{phase:>10}' for phase in HELPER_PHASES)
+                     + f'{"bridge":>10}')
+        for key, helper in timed:
+            lines.append(f'{key[:39]:<40}{helper["timed_calls"]:>7}'
+                         + ''.join(f'{helper[phase + "_seconds"] * 1000:>10.1f}' for phase in HELPER_PHASES)
+                         + f'{helper["bridge_seconds"] * 1000:>10.1f}')
+    if snapshot['slowest']:
+        lines.append('')
+        lines.append('slowest calls:')
+        for entry in snapshot['slowest']:
+            line = f'  {entry["seconds"] * 1000:9.2f}ms  {entry["key"]}'
+            if entry['helper']:
+                line += ' (' + ', '.join(f'{phase} {seconds * 1000:.1f}ms' for phase, seconds in entry['helper'].items()) + ')'
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+@contextmanager
+def profile(file: Optional[TextIO] = None, top: int = 20, helper_timings: bool = True) -> Iterator[Recorder]:
+    """Record the calls made inside the block and print a report of them on exit.
+
+    The yielded `Recorder` can be inspected with `snapshot()` as well. With
+    `helper_timings` the helper times the phases of the calls in the block.
+    """
+    global _recorders, _timing_profiles
+    recorder = Recorder()
+    # The list is replaced rather than changed, as it's iterated without the lock.
+    with _recorders_lock:
+        _recorders = _recorders + [recorder]
+        _timing_profiles += helper_timings
+    try:
+        yield recorder
+    finally:
+        with _recorders_lock:
+            _recorders = [r for r in _recorders if r is not recorder]
+            _timing_profiles -= helper_timings
+        print(format_report(recorder.snapshot(), top), file=sys.stderr if file is None else file)
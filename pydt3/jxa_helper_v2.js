@@ -1,31 +1,188 @@
 class ObjectPoolManager {
     constructor() {
         this._currentId = 0;
+        // Ids by `keyOf` the object, so that specifiers of the same object
+        // share an id however they were obtained.
         this._objectIdMap = new Map();
+        // The keys of the specifiers already seen, so that each display
+        // string is only computed once however often the specifier is sent.
+        this._specifierKeys = new WeakMap();
+        // In least recently used order while the pool is bounded, see `evictOverflow`.
         this._idObjectMap = new Map();
+        this._idKeyMap = new Map();
+        // The scope the ids handed out are tagged with, see `releaseScope`.
+        this.currentScope = null;
+        // The ids handed out in each scope, the number of scopes each id was
+        // handed out in, and the ids handed out outside any scope, which are
+        // released by reference counting. An id is kept while either holds it.
+        this._scopeIdsMap = new Map();
+        this._idScopeCounts = new Map();
+        this._unscopedIds = new Set();
+        // The number of objects kept, null for no limit.
+        this.limit = null;
+        this.evictions = 0;
+        this.rehydrations = 0;
+        // The display strings of the objects evicted and the ids of those
+        // rehydrated since they were last reported, see `takeEvents`.
+        this._evicted = {};
+        this._rehydrated = [];
     }
 
-    getObject(id) {
-        try {
-            return this._idObjectMap.get(id);
-        } catch (error) {
+    get size() {
+        return this._idObjectMap.size;
+    }
+
+    getObject(id, specifier) {
+        const obj = this._idObjectMap.get(id);
+        if (obj === undefined) {
+            if (specifier !== undefined) {
+                return this.rehydrate(id, specifier);
+            }
             console.log(`Error getting object with id: ${id}`);
+            return obj;
+        }
+        if (this.limit !== null) {
+            // Most recently used last.
+            this._idObjectMap.delete(id);
+            this._idObjectMap.set(id, obj);
         }
-     }
+        return obj;
+    }
+
+    rehydrate(id, specifier) {
+        // Resolve an evicted object again from its display string, under its former id.
+        const obj = eval(specifier);
+        const key = this.keyOf(obj);
+        this._idObjectMap.set(id, obj);
+        this._idKeyMap.set(id, key);
+        if (!this._objectIdMap.has(key)) {
+            this._objectIdMap.set(key, id);
+        }
+        this.rehydrations += 1;
+        this._rehydrated.push(id);
+        return obj;
+    }
+
+    evictOverflow() {
+        // Drop the least recently used specifiers above the limit. Anything
+        // else can't be resolved again and is kept.
+        if (this.limit === null || this._idObjectMap.size <= this.limit) {
+            return;
+        }
+        let excess = this._idObjectMap.size - this.limit;
+        for (const id of this._idObjectMap.keys()) {
+            if (excess <= 0) {
+                break;
+            }
+            const key = this._idKeyMap.get(id);
+            if (typeof key !== 'string') {
+                continue;
+            }
+            this._drop(id);
+            this._evicted[id] = key.slice('specifier:'.length);
+            this.evictions += 1;
+            excess -= 1;
+        }
+    }
+
+    takeEvents() {
+        // The evictions and rehydrations to report with a response, if any.
+        if (this._rehydrated.length === 0 && Object.keys(this._evicted).length === 0) {
+            return null;
+        }
+        const events = {e: this._evicted, h: this._rehydrated};
+        this._evicted = {};
+        this._rehydrated = [];
+        return events;
+    }
+
+    keyOf(obj) {
+        // Object specifiers are identified by their display string, except
+        // applications, which differ in their properties (eg.
+        // `includeStandardAdditions`). Anything else by identity.
+        if (ObjectSpecifier.hasInstance(obj) && ObjectSpecifier.classOf(obj) !== 'application') {
+            let key = this._specifierKeys.get(obj);
+            if (key === undefined) {
+                key = 'specifier:' + Automation.getDisplayString(obj);
+                this._specifierKeys.set(obj, key);
+            }
+            return key;
+        }
+        return obj;
+    }
 
     getId(obj) {
-        if (!this._objectIdMap.has(obj)) {
+        const key = this.keyOf(obj);
+        let id = this._objectIdMap.get(key);
+        if (id === undefined) {
             this._currentId += 1;
-            this._objectIdMap.set(obj, this._currentId);
-            this._idObjectMap.set(this._currentId, obj);
+            id = this._currentId;
+            this._objectIdMap.set(key, id);
+            this._idObjectMap.set(id, obj);
+            this._idKeyMap.set(id, key);
+        } else if (this.limit !== null) {
+            this.getObject(id);
+        }
+        this._tag(id);
+        return id;
+    }
+
+    _tag(id) {
+        if (this.currentScope === null) {
+            this._unscopedIds.add(id);
+            return;
+        }
+        let ids = this._scopeIdsMap.get(this.currentScope);
+        if (ids === undefined) {
+            ids = new Set();
+            this._scopeIdsMap.set(this.currentScope, ids);
+        }
+        if (!ids.has(id)) {
+            ids.add(id);
+            this._idScopeCounts.set(id, (this._idScopeCounts.get(id) || 0) + 1);
         }
-        return this._currentId;
     }
 
     releaseObjectWithId(objectId) {
-        const obj = this.getObject(objectId);
+        // The last proxy outside the scopes is gone.
+        this._unscopedIds.delete(objectId);
+        if (!this._idScopeCounts.has(objectId)) {
+            this._drop(objectId);
+        }
+    }
+
+    _drop(objectId) {
+        const key = this._idKeyMap.get(objectId);
         this._idObjectMap.delete(objectId);
-        this._objectIdMap.delete(obj);
+        this._idKeyMap.delete(objectId);
+        if (key !== undefined && this._objectIdMap.get(key) === objectId) {
+            this._objectIdMap.delete(key);
+        }
+    }
+
+    releaseObjectsWithIds(objectIds) {
+        for (let objectId of objectIds) {
+            this.releaseObjectWithId(objectId);
+        }
+    }
+
+    releaseScope(scope) {
+        const objectIds = this._scopeIdsMap.get(scope);
+        if (objectIds === undefined) {
+            return;
+        }
+        this._scopeIdsMap.delete(scope);
+        for (const id of objectIds) {
+            const count = this._idScopeCounts.get(id) - 1;
+            if (count > 0) {
+                this._idScopeCounts.set(id, count);
+            } else {
+                this._idScopeCounts.delete(id);
+                if (!this._unscopedIds.has(id)) {
+                    this._drop(id);
+                }
+            }
+        }
     }
 }
 
@@ -101,6 +258,41 @@ class Util {
     }
 }
 
+class CompactEncodeState {
+    constructor() {
+        this.marked = false;
+        this.strings = [];
+        this._indices = new Map();
+    }
+
+    intern(str) {
+        if (str === null || str === undefined) {
+            return null;
+        }
+        if (!this._indices.has(str)) {
+            this._indices.set(str, this.strings.length);
+            this.strings.push(str);
+        }
+        return this._indices.get(str);
+    }
+}
+
+// Whether arrays of specifiers of one class are encoded with the class and
+// app resolved once (see `homogeneousReference`), instead of per element.
+let homogeneousArrays = true;
+
+// The classes without subclasses, by app. A specifier only tells the class
+// of the elements of its container (`classOf`), eg. `record` for smart
+// groups and tag groups too, which is the real class of the object for
+// these classes alone. Arrays of records (eg. search results) never
+// qualify: the class of each record takes an Apple Event of its own, as JXA
+// can't ask for the classes of a plain array of specifiers at once. (`text`
+// isn't a leaf class either, paragraphs, words etc. inherit from it.)
+const leafClasses = {
+    'DEVONthink 3': new Set(['database', 'smartGroup', 'tagGroup', 'reminder', 'tab', 'documentWindow', 'viewerWindow']),
+    'Mail': new Set(['message', 'mailbox']),
+};
+
 class JsonTranslator {
     /**
      * @param {ObjectPoolManager} objectPoolManager 
@@ -109,6 +301,37 @@ class JsonTranslator {
         this.objectPoolManager = objectPoolManager;
     }
 
+    homogeneousReference(arr) {
+        // The class name and app shared by the elements of an array of object
+        // specifiers (eg. a list of databases), or null if it isn't one. The
+        // class the app put in each specifier (`classOf`) is compared
+        // locally, so `class()` and the display string are only evaluated
+        // for the first element instead of costing an Apple Event and a
+        // regex per element. Only leaf classes qualify, see `leafClasses`.
+        if (!homogeneousArrays || arr.length < 2 || arr.perElementClasses) {
+            return null;
+        }
+        let classOf = null;
+        for (let i = 0; i < arr.length; i++) {
+            const element = arr[i];
+            if (!ObjectSpecifier.hasInstance(element) || Util.guessIsSpecifierContainer(element)) {
+                return null;
+            }
+            const elementClassOf = ObjectSpecifier.classOf(element);
+            if (classOf === null) {
+                classOf = elementClassOf;
+            } else if (elementClassOf !== classOf) {
+                return null;
+            }
+        }
+        const app = Util.getAssociatedApplicationName(arr[0]);
+        if (leafClasses[app] === undefined || !leafClasses[app].has(classOf)) {
+            return null;
+        }
+        const first = this.referenceOf(arr[0]);
+        return {className: first.className, app: first.app};
+    }
+
     wrapToJson(obj) {
         if (obj === undefined) {
             obj = null;
@@ -202,6 +425,21 @@ class JsonTranslator {
             }
             if (Array.isArray(obj)) {
                 let data = []
+                const shared = this.homogeneousReference(obj);
+                if (shared !== null) {
+                    for (let i = 0; i < obj.length; i++) {
+                        data.push({
+                            type: 'reference',
+                            objId: this.objectPoolManager.getId(obj[i]),
+                            className: shared.className,
+                            app: shared.app,
+                        });
+                    }
+                    return {
+                        type: 'array',
+                        data: data
+                    }
+                }
                 for (let i in obj) {
                     data[i] = this.wrapToJson(obj[i]);
                 }
@@ -236,6 +474,110 @@ class JsonTranslator {
         throw new Error(`Unknown type: ${typeof obj}`);
     }
 
+    referenceOf(obj) {
+        // The reference describing `obj` or null if `obj` is a value.
+        if (ObjectSpecifier.hasInstance(obj)) {
+            let guessClass = Util.guessClassOfSpecifier(obj);
+            return {
+                objId: this.objectPoolManager.getId(obj),
+                className: guessClass === undefined ? 'unknown' : guessClass,
+                app: Util.getAssociatedApplicationName(obj),
+            };
+        }
+        if (typeof obj === 'function') {
+            return {
+                objId: this.objectPoolManager.getId(obj),
+                className: 'function',
+                app: null,
+            };
+        }
+        return null;
+    }
+
+    encodeCompact(obj) {
+        // Version 2 of the wire format, see `pydt3/codec.py`.
+        let state = new CompactEncodeState();
+        let envelope = {v: 2, d: this._encodeCompact(obj, state)};
+        if (state.marked) {
+            envelope.x = 1;
+            envelope.s = state.strings;
+        }
+        return envelope;
+    }
+
+    _encodeCompact(obj, state) {
+        if (obj === undefined) {
+            obj = null;
+        }
+        if (Util.isJsonNode(obj)) {
+            return obj;
+        }
+        let reference = this.referenceOf(obj);
+        if (reference !== null) {
+            state.marked = true;
+            return {$r: [reference.objId, state.intern(reference.className), state.intern(reference.app)]};
+        }
+        if (obj instanceof Date) {
+            state.marked = true;
+            return {$d: obj.getTime() / 1000};
+        }
+        if (Array.isArray(obj)) {
+            const shared = this.homogeneousReference(obj);
+            if (shared !== null) {
+                state.marked = true;
+                let ids = [];
+                for (let i = 0; i < obj.length; i++) {
+                    ids.push(this.objectPoolManager.getId(obj[i]));
+                }
+                return {$R: [state.intern(shared.className), state.intern(shared.app), ids]};
+            }
+            let data = [];
+            for (let i = 0; i < obj.length; i++) {
+                data.push(this._encodeCompact(obj[i], state));
+            }
+            return data;
+        }
+        if (typeof obj === 'object' && obj.constructor.name === 'Object') {
+            let data = {};
+            for (let k in obj) {
+                let key = k;
+                if (k.startsWith('$')) {
+                    key = '$' + k;
+                    state.marked = true;
+                }
+                data[key] = this._encodeCompact(obj[k], state);
+            }
+            return data;
+        }
+        throw new Error(`encodeCompact: Unknown type: ${typeof obj}`);
+    }
+
+    decodeCompact(obj) {
+        if (obj === null || typeof obj !== 'object') {
+            return obj;
+        }
+        if (Array.isArray(obj)) {
+            return obj.map((i) => this.decodeCompact(i));
+        }
+        const keys = Object.keys(obj);
+        if (keys.length === 2 && keys[0] === '$r' && keys[1] === '$s') {
+            // An evicted reference, with its display string to resolve it again.
+            return this.objectPoolManager.getObject(obj.$r, obj.$s);
+        }
+        if (keys.length === 1) {
+            if (keys[0] === '$r') {
+                return this.objectPoolManager.getObject(obj.$r);
+            } else if (keys[0] === '$d') {
+                return new Date(obj.$d * 1000);
+            }
+        }
+        let data = {};
+        for (let k of keys) {
+            data[k.startsWith('$') ? k.slice(1) : k] = this.decodeCompact(obj[k]);
+        }
+        return data;
+    }
+
     unwrapFromJson(obj) {
         if (obj.type === 'plain') {
             return obj.data;
@@ -248,7 +590,7 @@ class JsonTranslator {
             return obj.data;
         } else if (obj.type === 'reference') {
             try {
-                return this.objectPoolManager.getObject(obj.objId);
+                return this.objectPoolManager.getObject(obj.objId, obj.specifier);
             } catch (error) {
                 console.log(`Error unwrapping object with id: ${obj.objId}`);
             }
@@ -257,19 +599,57 @@ class JsonTranslator {
 
     strIOFuncWrapper(func) {
         return  (strParams) => {
+            const started = Date.now();
             let params = JSON.parse(strParams);
-            try {
-                params = this.unwrapFromJson(params);
-            } catch (error) {
-                console.log(`Error unwrapping params: ${error}`);
+            // Whether the caller wants the phases of the call timed, see `pydt3/instrumentation.py`.
+            const timed = params.timing;
+            if (params.release) {
+                // Objects released by the caller since its last call.
+                this.objectPoolManager.releaseObjectsWithIds(params.release);
             }
-            let result = func(params);
+            this.objectPoolManager.currentScope = params.scope === undefined ? null : params.scope;
+            const compact = params.v === 2;
             try {
-                result = this.wrapToJson(result);
-            } catch (error) {
-                console.log(`Error wrapping result: ${error}`);
+                if (compact) {
+                    params = params.x ? this.decodeCompact(params.d) : params.d;
+                } else {
+                    try {
+                        params = this.unwrapFromJson(params);
+                    } catch (error) {
+                        console.log(`Error unwrapping params: ${error}`);
+                    }
+                }
+                const unwrapped = Date.now();
+                let result = func(params);
+                const called = Date.now();
+                if (compact) {
+                    result = this.encodeCompact(result);
+                } else {
+                    try {
+                        result = this.wrapToJson(result);
+                    } catch (error) {
+                        console.log(`Error wrapping result: ${error}`);
+                    }
+                }
+                const wrapped = Date.now();
+                let response = JSON.stringify(result);
+                this.objectPoolManager.evictOverflow();
+                if (response.length > 2 && response.endsWith('}')) {
+                    if (timed) {
+                        // In milliseconds: unwrap, app (the function and its Apple Events), wrap, stringify.
+                        const timings = [unwrapped - started, called - unwrapped, wrapped - called, Date.now() - wrapped];
+                        response = response.slice(0, -1) + `,"t":[${timings.join(',')}]}`;
+                    }
+                    const events = this.objectPoolManager.takeEvents();
+                    if (events !== null) {
+                        // Objects evicted from the pool (`e`, by id) and resolved again (`h`).
+                        response = response.slice(0, -1) + ',' + JSON.stringify(events).slice(1);
+                    }
+                }
+                return response;
+            } finally {
+                this.objectPoolManager.currentScope = null;
             }
-            return JSON.stringify(result);
         }
     }
 }
@@ -290,6 +670,45 @@ function _releaseObjectWithId({id}) {
 }
 releaseObjectWithId = jsonTranslator.strIOFuncWrapper(_releaseObjectWithId);
 
+function _releaseObjectsWithIds({ids}) {
+    objectPoolManager.releaseObjectsWithIds(ids);
+}
+releaseObjectsWithIds = jsonTranslator.strIOFuncWrapper(_releaseObjectsWithIds);
+
+function _releaseScope({scope}) {
+    objectPoolManager.releaseScope(scope);
+}
+releaseScope = jsonTranslator.strIOFuncWrapper(_releaseScope);
+
+function _configurePool({limit}) {
+    // Bound the pool to `limit` objects (null for no limit) if given, and report on it.
+    if (limit !== undefined) {
+        objectPoolManager.limit = limit;
+        // Now rather than after the call, so that the size reported is within the limit.
+        objectPoolManager.evictOverflow();
+    }
+    return {
+        size: objectPoolManager.size,
+        limit: objectPoolManager.limit,
+        evictions: objectPoolManager.evictions,
+        rehydrations: objectPoolManager.rehydrations,
+    };
+}
+configurePool = jsonTranslator.strIOFuncWrapper(_configurePool);
+
+// Wire format versions understood by this script, preferred first.
+const SUPPORTED_CODECS = [2, 1];
+
+function _negotiateCodec({versions}) {
+    for (let version of versions) {
+        if (SUPPORTED_CODECS.includes(version)) {
+            return version;
+        }
+    }
+    return 1;
+}
+negotiateCodec = jsonTranslator.strIOFuncWrapper(_negotiateCodec);
+
 function _getApplication({name}) {
     // throw new Error(`Application name: ${name} not found, typeof name: ${typeof name}`);
     let theApp = Application(name);
@@ -334,6 +753,116 @@ function _getProperties({obj, properties}) {
 }
 getProperties = jsonTranslator.strIOFuncWrapper(_getProperties);
 
+// Columns of the collection being read by `getColumns`, kept between the
+// calls reading it chunk by chunk.
+let columnCache = {obj: null, columns: {}};
+
+function _getColumns({obj, properties, start, count}) {
+    // Calling a property of an array specifier (eg. `records.name()`) returns
+    // the values for all its elements in a single Apple Event.
+    if (columnCache.obj !== obj || !start) {
+        columnCache = {obj: obj, columns: {}};
+    }
+    const chunked = count !== null && count !== undefined;
+    start = start || 0;
+    let columns = {};
+    let length = 0;
+    for (let k of properties) {
+        let column = columnCache.columns[k];
+        if (column === undefined) {
+            column = obj[k]();
+            columnCache.columns[k] = column;
+        }
+        length = column.length;
+        columns[k] = chunked ? column.slice(start, start + count) : column;
+    }
+    if (!chunked || start + count >= length) {
+        columnCache = {obj: null, columns: {}};
+    }
+    return {columns, length};
+}
+getColumns = jsonTranslator.strIOFuncWrapper(_getColumns);
+
+function _getElements({obj, start, end}) {
+    // The elements of an array specifier in the range [start, end), with
+    // Python's slicing semantics, so a collection can be read chunk by chunk.
+    const length = obj.length;
+    const clamp = (i, defaultValue) => {
+        if (i === null || i === undefined) {
+            return defaultValue;
+        }
+        if (i < 0) {
+            i += length;
+        }
+        return Math.min(Math.max(i, 0), length);
+    };
+    start = clamp(start, 0);
+    end = clamp(end, length);
+    let elements = [];
+    for (let i = start; i < end; i++) {
+        elements.push(obj.at(i));
+    }
+    // Specifiers made by `at` carry the class of the container's elements
+    // rather than their own, so their classes are looked up one by one.
+    Object.defineProperty(elements, 'perElementClasses', {value: true});
+    return {elements, length};
+}
+getElements = jsonTranslator.strIOFuncWrapper(_getElements);
+
+// The text of the iteration being read chunk by chunk, until its last chunk
+// (or another text) is read. One text at most, however long.
+let textCache = {iteration: null, text: null};
+
+function _readText({obj, name, start, length, iteration}) {
+    // A range of a (long) text property, so that only the range goes through
+    // the JSON bridge. The chunks of an iteration (see `iter_text` in
+    // Python) are all sliced from the text read for the first one.
+    let text = null;
+    if (iteration !== null && iteration !== undefined && textCache.iteration === iteration) {
+        text = textCache.text;
+    }
+    textCache = {iteration: null, text: null};
+    if (text === null) {
+        text = obj[name]() || '';
+    }
+    start = Math.min(start || 0, text.length);
+    let end = (length === null || length === undefined) ? text.length : Math.min(start + length, text.length);
+    // Don't split a surrogate pair between two chunks.
+    const last = text.charCodeAt(end - 1);
+    if (end > start && end < text.length && last >= 0xD800 && last <= 0xDBFF) {
+        end += 1;
+    }
+    if (end < text.length && iteration !== null && iteration !== undefined) {
+        textCache = {iteration: iteration, text: text};
+    }
+    return {text: text.slice(start, end), end: end, total: text.length};
+}
+readText = jsonTranslator.strIOFuncWrapper(_readText);
+
+function _writePropertyToFile({obj, name, path}) {
+    // Binary values (PDFs, web archives, images) are written to `path` so that
+    // only their size goes through the JSON bridge.
+    ObjC.import('Foundation');
+    const value = obj[name]();
+    if (value === null || value === undefined) {
+        return null;
+    }
+    let data = $(value);
+    if (data.isKindOfClass($.NSString)) {
+        data = data.dataUsingEncoding($.NSUTF8StringEncoding);
+    }
+    if (!data.isKindOfClass($.NSData)) {
+        throw new Error(`${name} is not binary data`);
+    }
+    // Into the file made by `mkstemp`, which an atomic write would replace
+    // with a new one, losing its owner-only permissions.
+    if (!data.writeToFileAtomically(path, false)) {
+        throw new Error(`Can't write ${name} to ${path}`);
+    }
+    return {size: data.length};
+}
+writePropertyToFile = jsonTranslator.strIOFuncWrapper(_writePropertyToFile);
+
 function _setProperties({obj, keyValues}) {
     for (let k in keyValues) {
         obj[k] = keyValues[k];
@@ -365,4 +894,44 @@ callMethod = jsonTranslator.strIOFuncWrapper(_callMethod);
 function _callSelf({obj, args, kwargs}) {
     return obj(...args, kwargs);
 }
-callSelf = jsonTranslator.strIOFuncWrapper(_callSelf);
\ No newline at end of file
+callSelf = jsonTranslator.strIOFuncWrapper(_callSelf);
+
+const helperFunctions = {
+    echo: _echo,
+    releaseObjectWithId: _releaseObjectWithId,
+    releaseObjectsWithIds: _releaseObjectsWithIds,
+    releaseScope: _releaseScope,
+    configurePool: _configurePool,
+    negotiateCodec: _negotiateCodec,
+    getApplication: _getApplication,
+    evalJXACodeSnippet: _evalJXACodeSnippet,
+    evalAppleScriptCodeSnippet: _evalAppleScriptCodeSnippet,
+    getProperty: _getProperty,
+    getProperties: _getProperties,
+    getColumns: _getColumns,
+    getElements: _getElements,
+    readText: _readText,
+    writePropertyToFile: _writePropertyToFile,
+    setProperties: _setProperties,
+    callMethod: _callMethod,
+    callSelf: _callSelf,
+};
+
+function _executeBatch({calls}) {
+    // Run several calls in one Apple Event. A failing call doesn't abort the
+    // batch, its error is reported in its own slot instead.
+    let results = [];
+    for (let {name, params} of calls) {
+        try {
+            const func = helperFunctions[name];
+            if (func === undefined) {
+                throw new Error(`Function not found: ${name}`);
+            }
+            results.push({ok: true, result: func(params)});
+        } catch (error) {
+            results.push({ok: false, error: `${error}`});
+        }
+    }
+    return results;
+}
+executeBatch = jsonTranslator.strIOFuncWrapper(_executeBatch);
\ No newline at end of file
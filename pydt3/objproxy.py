@@ -2,46 +2,63 @@ from __future__ import annotations
 
 import logging
 
-from typing import Any, Optional, TypeVar, Sequence, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, TypeVar, Sequence, Union, TYPE_CHECKING
+
+from . import diagnostics
 
 
 if TYPE_CHECKING:
+    from .binary import BinaryHandle
     from .helper_bridging import HelperScript
 
 logger = logging.getLogger(__name__)
 
 class OSAObjProxy:
+    # Without an instance dict, as scripts may hold millions of proxies.
+    # Subclasses declare empty `__slots__` to keep it that way.
+    __slots__ = ('_helper_script', 'obj_id', 'class_name', '_scope_id', '_origin', '__weakref__')
+
     def __init__(self, helper_script: Optional[HelperScript] = None, obj_id: Optional[int] = None, class_name: Optional[str] = None):
         self._helper_script: Optional[HelperScript] = helper_script
         self.obj_id: Optional[int] = obj_id
         self.class_name: Optional[str] = class_name
-        # reference count plus one
+        # The remote object of a proxy created in a scope is released with the scope.
+        self._scope_id: Optional[int] = None
+        # The id of the array the proxy was fetched from, see `diagnostics`.
+        self._origin: Optional[int] = None
         if self.obj_id is not None:
+            self._scope_id = helper_script.current_scope
+            helper_script._osaobj_rc.proxy_created(self)
+        # reference count plus one
+        if self.obj_id is not None and self._scope_id is None:
             self._increase_reference_count()
 
     def _increase_reference_count(self):
         obj_id = self.obj_id
         if self.obj_id is None:
             raise ValueError('obj_id is None')
-        self._helper_script._osaobj_rc.setdefault(obj_id, 0)
-        self._helper_script._osaobj_rc[obj_id] += 1
+        # An id still waiting to be released by a collected proxy is skipped by the queue.
+        self._helper_script._osaobj_rc.increase(obj_id)
     
     def _decrease_reference_count(self):
         obj_id = self.obj_id
         if self.obj_id is None:
             raise ValueError('obj_id is None')
-        self._helper_script._osaobj_rc.setdefault(obj_id, 0)
-        self._helper_script._osaobj_rc[obj_id] -= 1
-        logger.debug(f'decrease reference count for {obj_id}, current count: {self._helper_script._osaobj_rc[obj_id]}')
-        if self._helper_script._osaobj_rc[obj_id] <= 0:
-            self._helper_script.release_object_with_id(obj_id)
+        count = self._helper_script._osaobj_rc.decrease(obj_id)
+        logger.debug('decrease reference count for %s, current count: %s', obj_id, count)
+        if count <= 0:
+            self._helper_script.defer_release(obj_id)
     
     def bind(self, script: HelperScript, obj_id: int, class_name: str):
         if self.obj_id is not None:
-            self._decrease_reference_count()
+            if self._scope_id is None:
+                self._decrease_reference_count()
+            self._helper_script._osaobj_rc.proxy_deleted(type(self))
         self._helper_script = script
         self.obj_id = obj_id
         self.class_name = class_name
+        self._scope_id = None
+        script._osaobj_rc.proxy_created(self)
         # reference count plus one
         self._increase_reference_count()
 
@@ -58,9 +75,17 @@ class OSAObjProxy:
     def _call_method(self, name: str, args = None, kwargs: dict = None):
         return self._helper_script.call_method(self, name, args, kwargs)
 
+    def _open_binary(self, name: str, suffix: str = '') -> Optional[BinaryHandle]:
+        return self._helper_script.write_property_to_file(self, name, suffix)
+
     def __del__(self):
-        if self.obj_id is not None:
+        if getattr(self, 'obj_id', None) is None:
+            return
+        # Another thread could be handed the proxy being collected otherwise.
+        self._helper_script._forget_proxy(self)
+        if getattr(self, '_scope_id', None) is None:
             self._decrease_reference_count()
+        self._helper_script._osaobj_rc.proxy_deleted(type(self))
 
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         return self._helper_script.call_self(self, args, kwargs)
@@ -70,6 +95,51 @@ T = TypeVar('T')
 class OSAObjArray(OSAObjProxy, Sequence[T]):
     """The proxy of the array container in JXA of type `T`
     """
+    # Arrays keep an instance dict, for `chunk_size` and `pluck_chunk_size`
+    # to be set per array. There are few of them compared to their elements.
+
+    # The number of elements iteration fetches per call.
+    chunk_size = 256
+
+    # The number of elements `pluck` reads per call.
+    pluck_chunk_size = 10000
+
+    def pluck(self, *names: str, chunk_size: Optional[int] = None) -> Union[List[Any], Dict[str, List[Any]]]:
+        """Read properties of all the elements at once, column by column.
+
+        Each property is read for the whole collection with a single Apple
+        Event (eg. `records.name()` in JXA) instead of one per element. Large
+        collections are transferred in chunks of `chunk_size` elements.
+
+        Examples:
+            >>> db.records.pluck('name')
+            ['note', 'todo', ...]
+            >>> db.records.pluck('name', 'uuid', 'modificationDate')
+            {'name': [...], 'uuid': [...], 'modificationDate': [datetime.datetime(...), ...]}
+
+        Args:
+            *names (str): The JXA names of the properties.
+            chunk_size (int, optional): The number of elements transferred per call. Defaults to `pluck_chunk_size`.
+
+        Returns:
+            list: The values of the property if only one name is given.
+            dict: The values keyed by property name otherwise.
+        """
+        if not names:
+            raise ValueError('At least one property name must be provided')
+        names = list(names)
+        chunk_size = self.pluck_chunk_size if chunk_size is None else chunk_size
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be positive')
+
+        result = self._helper_script.get_columns(self, names, 0, chunk_size)
+        columns, length = result['columns'], result['length']
+        for start in range(chunk_size, length, chunk_size):
+            chunk = self._helper_script.get_columns(self, names, start, chunk_size)['columns']
+            for name in names:
+                columns[name].extend(chunk[name])
+
+        return columns[names[0]] if len(names) == 1 else columns
 
     def whose(self, filter) -> 'OSAObjArray[T]':
         return self._call_method('whose', [filter])
@@ -77,14 +147,51 @@ class OSAObjArray(OSAObjProxy, Sequence[T]):
     def __len__(self) -> int:
         return self._get_property('length')
 
-    def __getitem__(self, index: int) -> T:
-        return self._call_method('at', args=[index])
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            if index.step is None or index.step == 1:
+                return self._helper_script.get_elements(self, index.start, index.stop)['elements']
+            indices = range(*index.indices(len(self)))
+            if not indices:
+                return []
+            first, last = min(indices), max(indices)
+            elements = self._helper_script.get_elements(self, first, last + 1)['elements']
+            return [elements[i - first] for i in indices]
+        diagnostics.observe_index(self)
+        element = self._call_method('at', args=[index])
+        if isinstance(element, OSAObjProxy):
+            element._origin = self.obj_id
+        return element
+
+    def iter_chunks(self, size: Optional[int] = None) -> Iterator[List[T]]:
+        """Iterate over the elements in lists of (at most) `size` proxies, one call per list.
+
+        Args:
+            size (int, optional): The number of elements per chunk. Defaults to `chunk_size`.
+        """
+        size = self.chunk_size if size is None else size
+        if size <= 0:
+            raise ValueError('chunk size must be positive')
+        # Checked on the call rather than on the first chunk.
+        return self._iter_chunks(size)
+
+    def _iter_chunks(self, size: int) -> Iterator[List[T]]:
+        start = 0
+        length = None
+        while length is None or start < length:
+            result = self._helper_script.get_elements(self, start, start + size)
+            length = result['length']
+            if result['elements']:
+                yield result['elements']
+            start += size
 
     def __iter__(self):
-        for i in range(len(self)):
-            yield self[i]
+        for chunk in self.iter_chunks():
+            yield from chunk
 
 class DefaultOSAObjProxy(OSAObjProxy):
+    __slots__ = ()
+
     def __getitem__(self, key: str):
         return self._get_property(key)
     
@@ -92,4 +199,7 @@ class DefaultOSAObjProxy(OSAObjProxy):
         return self._set_property(key, value)
     
     def __getattr__(self, name: str):
+        if name.startswith('_'):
+            # Not a JXA name, e.g. an attribute missing from a partially initialized proxy.
+            raise AttributeError(name)
         return self._get_property(name)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import json
-import os
 from logging import getLogger
-from Foundation import NSAppleScript, NSURL, NSAppleEventDescriptor
+
+from .transport import Transport, AppleEventTransport, fourcharcode
 
 
 logger = getLogger(__name__)
@@ -12,41 +11,32 @@ logger = getLogger(__name__)
 
 
 class OSAScript:
-    def __init__(self, script: NSAppleScript):
-        self.script = script
+    def __init__(self, transport: Transport):
+        if not isinstance(transport, Transport):
+            # An `NSAppleScript` instance, as accepted by earlier versions.
+            transport = AppleEventTransport(transport)
+        self.transport = transport
+
+    @property
+    def script(self):
+        """The underlying `NSAppleScript`, if the script is driven by Apple Events."""
+        return getattr(self.transport, 'script', None)
 
     @classmethod
     def from_path(cls, path):
-        url = NSURL.fileURLWithPath_(path)
-        script, error = NSAppleScript.alloc().initWithContentsOfURL_error_(url, None)
-        if error:
-            raise RuntimeError(error)
-        return cls(script)
+        return cls(AppleEventTransport.from_path(path))
 
     def _call_str(self, func_name: str, arg: str):
-        script = self.script
-        event = NSAppleEventDescriptor.appleEventWithEventClass_eventID_targetDescriptor_returnID_transactionID_(
-            self.fourcharcode(b'ascr'), self.fourcharcode(b'psbr'), NSAppleEventDescriptor.nullDescriptor(), 0, 0)
-        descriptor_list = NSAppleEventDescriptor.listDescriptor()
-        descriptor_list.insertDescriptor_atIndex_(NSAppleEventDescriptor.descriptorWithString_(arg), 0)
-        event.setDescriptor_forKeyword_(descriptor_list, self.fourcharcode(b'----'))
-
-        event.setDescriptor_forKeyword_(NSAppleEventDescriptor.descriptorWithString_(func_name), self.fourcharcode(b'snam'))
-
-        result, error = script.executeAppleEvent_error_(event, None)
-        if error:
-            raise RuntimeError(error)
-        else:
-            return result.stringValue()
+        return self.transport.call(func_name, arg)
 
     def fourcharcode(self, chars: bytes):
-        return int.from_bytes(chars, 'big')
-    
+        return fourcharcode(chars)
+
 
     def __eq__(self, o: object) -> bool:
-        return self.script == o.script
+        return isinstance(o, OSAScript) and self.transport == o.transport
 
 
 if __name__ == '__main__':
     script = OSAScript.from_path('/Users/koc/Developer/devonthink/python-api/pydt3/test.scpt')
-    print(script._call('echo', 'hello world'))
\ No newline at end of file
+    print(script._call_str('echo', 'hello world'))
@@ -0,0 +1,210 @@
+"""Reference counts of the remote objects and telemetry of the live proxies.
+
+A `HelperScript` counts the unscoped proxies referencing each remote object
+and releases the object once its count drops to zero. Besides, it counts the
+live proxies (scoped ones included) per class and, when sampling is on,
+remembers where every `sample_rate`-th proxy was created:
+
+    >>> helper.sample_proxy_sites(100)
+    >>> helper.live_proxies()
+    {'Record': 1032, 'OSAObjArray': 3}
+    >>> helper.live_proxies_by_site(top=1)
+    [{'class': 'Record', 'site': 'ingest.py:42', 'sampled': 10, 'estimated': 1000}]
+
+A `LeakCheck` compares the live proxies with a baseline, either around a
+block (`check_leaks`, e.g. in a test) or periodically in a long running
+process:
+
+    >>> leaks = LeakCheck(helper, tolerance=100)
+    >>> while True:
+    ...     serve_one_request()
+    ...     leaks.check(fail=False) # logs the classes that keep growing
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import threading
+import weakref
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from . import diagnostics
+
+
+if TYPE_CHECKING:
+    from .helper_bridging import HelperScript
+    from .objproxy import OSAObjProxy
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceCounts:
+    """The number of unscoped proxies per remote object id, and of live proxies per class.
+
+    An id is dropped as soon as its count reaches zero, so the table only
+    holds the objects currently referenced.
+
+    Args:
+        counts (dict, optional): The dict to keep the counts in, e.g. to share it.
+    """
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self._counts = {} if counts is None else counts # type: Dict[int, int]
+        for obj_id in [obj_id for obj_id, count in self._counts.items() if count <= 0]:
+            del self._counts[obj_id]
+        self._classes = {} # type: Dict[type, int]
+        # Every `sample_rate`-th proxy created has its creation site recorded, 0 for none.
+        self.sample_rate = 0
+        self._created = 0
+        self._sites = {} # type: Dict[Tuple[type, Optional[str], Optional[int]], int]
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, obj_id: int) -> bool:
+        return obj_id in self._counts
+
+    def __getitem__(self, obj_id: int) -> int:
+        return self._counts[obj_id]
+
+    def get(self, obj_id: int, default: int = 0) -> int:
+        return self._counts.get(obj_id, default)
+
+    def increase(self, obj_id: int) -> int:
+        with self.lock:
+            count = self._counts[obj_id] = self._counts.get(obj_id, 0) + 1
+        return count
+
+    def decrease(self, obj_id: int) -> int:
+        with self.lock:
+            count = self._counts.get(obj_id, 0) - 1
+            if count > 0:
+                self._counts[obj_id] = count
+            else:
+                self._counts.pop(obj_id, None)
+        return count
+
+    def proxy_created(self, proxy: OSAObjProxy):
+        cls = type(proxy)
+        with self.lock:
+            self._classes[cls] = self._classes.get(cls, 0) + 1
+            if not self.sample_rate:
+                return
+            self._created += 1
+            if self._created % self.sample_rate:
+                return
+            key = (cls, *diagnostics._caller())
+            self._sites[key] = self._sites.get(key, 0) + 1
+        weakref.finalize(proxy, self._site_released, key)
+
+    def proxy_deleted(self, cls: type):
+        with self.lock:
+            count = self._classes.get(cls, 0) - 1
+            if count > 0:
+                self._classes[cls] = count
+            else:
+                self._classes.pop(cls, None)
+
+    def _site_released(self, key: tuple):
+        with self.lock:
+            count = self._sites.get(key, 0) - 1
+            if count > 0:
+                self._sites[key] = count
+            else:
+                self._sites.pop(key, None)
+
+    def live_by_class(self) -> Dict[str, int]:
+        live = {} # type: Dict[str, int]
+        with self.lock:
+            classes = list(self._classes.items())
+        for cls, count in classes:
+            live[cls.__name__] = live.get(cls.__name__, 0) + count
+        return live
+
+    def live_by_site(self, top: Optional[int] = None) -> List[dict]:
+        with self.lock:
+            sites = sorted(self._sites.items(), key=lambda item: item[1], reverse=True)
+            rate = self.sample_rate or 1
+        return [{
+            'class': cls.__name__,
+            'site': 'unknown' if filename is None else f'{filename}:{lineno}',
+            'sampled': count,
+            'estimated': count * rate,
+        } for (cls, filename, lineno), count in sites[:top]]
+
+
+class LeakError(AssertionError):
+    """Raised by `LeakCheck.check` when live proxies have accumulated."""
+
+    def __init__(self, growth: Dict[str, int], sites: List[dict]):
+        lines = ['Live proxies accumulated:'] + [f'  {name}: +{count}' for name, count in growth.items()]
+        if sites:
+            lines.append('Sampled creation sites:')
+            lines += [f'  {site["site"]}: {site["estimated"]} {site["class"]}' for site in sites]
+        super().__init__('\n'.join(lines))
+        self.growth = growth
+        self.sites = sites
+
+
+class LeakCheck:
+    """Compares the live proxies of a helper script with those at the baseline.
+
+    Args:
+        helper_script (HelperScript): The helper script to watch.
+        tolerance (int): The growth per class tolerated.
+    """
+
+    def __init__(self, helper_script: HelperScript, tolerance: int = 0):
+        self.helper_script = helper_script
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        """Take the live proxies of now as the baseline."""
+        gc.collect()
+        self.baseline = self.helper_script.live_proxies()
+
+    def growth(self) -> Dict[str, int]:
+        """The classes with more live proxies than at the baseline plus `tolerance`, collecting garbage first."""
+        gc.collect()
+        growth = {}
+        for name, count in self.helper_script.live_proxies().items():
+            grown = count - self.baseline.get(name, 0)
+            if grown > self.tolerance:
+                growth[name] = grown
+        return growth
+
+    def check(self, fail: bool = True) -> Dict[str, int]:
+        """Raise `LeakError`, or log a warning if not `fail`, if any class has grown."""
+        growth = self.growth()
+        if not growth:
+            return growth
+        sites = [site for site in self.helper_script.live_proxies_by_site(top=10) if site['class'] in growth]
+        error = LeakError(growth, sites)
+        if fail:
+            raise error
+        logger.warning('%s', error)
+        return growth
+
+
+@contextmanager
+def check_leaks(helper_script: Optional[HelperScript] = None, tolerance: int = 0) -> Iterator[LeakCheck]:
+    """Raise `LeakError` on exit if the block left more live proxies than it found.
+
+    Args:
+        helper_script (HelperScript, optional): Defaults to `HelperScript.default`.
+        tolerance (int): The growth per class tolerated.
+
+    Examples:
+        >>> with check_leaks(helper):
+        ...     names = [record.name for record in db.contents]
+    """
+    if helper_script is None:
+        from .helper_bridging import HelperScript
+        helper_script = HelperScript.default
+    leaks = LeakCheck(helper_script, tolerance)
+    yield leaks
+    leaks.check()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import atexit
+import collections
+import logging
+import time
+import weakref
+
+from typing import List, TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from .helper_bridging import HelperScript
+
+logger = logging.getLogger(__name__)
+
+_release_queues = weakref.WeakSet() # type: weakref.WeakSet[ReleaseQueue]
+
+
+class ReleaseQueue:
+    """Ids of remote objects no Python proxy references anymore.
+
+    Instead of releasing every object with its own Apple Event when its last
+    proxy is garbage collected, the ids are collected here and released
+    together. The queue is flushed:
+
+    - along with the next call to the helper (the ids travel in the same event),
+    - with one `releaseObjectsWithIds` call once `threshold` ids are pending,
+    - at interpreter exit,
+    - or on demand with `flush`.
+
+    Ids are put from finalizers, which may run in the middle of any code,
+    including this queue's own, so `put` takes no lock. An id referenced
+    again by a new proxy stays queued and is skipped when the queue is
+    drained, as its reference count is checked then.
+    """
+
+    def __init__(self, helper_script: HelperScript, threshold: int = 1000):
+        self._helper_script_ref = weakref.ref(helper_script)
+        self.threshold = threshold
+        self._ids = collections.deque() # type: collections.deque[int]
+        # Set while ids are taken, so that a finalizer doesn't flush from inside `_take`.
+        self._taking = False
+
+        self.flush_count = 0
+        self.piggybacked_count = 0
+        self.released_count = 0
+        self.total_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+        _release_queues.add(self)
+
+    @property
+    def depth(self) -> int:
+        """The number of ids waiting to be released."""
+        ids = set(self._ids)
+        helper_script = self._helper_script_ref()
+        if helper_script is None:
+            return len(ids)
+        rc = helper_script._osaobj_rc
+        return sum(1 for obj_id in ids if rc.get(obj_id, 0) <= 0)
+
+    def put(self, obj_id: int):
+        self._ids.append(obj_id)
+        if len(self._ids) >= self.threshold and not self._taking:
+            helper_script = self._helper_script_ref()
+            if helper_script is None:
+                return
+            dispatcher = helper_script._dispatcher
+            if dispatcher is not None and not dispatcher.in_dispatcher_thread():
+                # Collected on another thread, which mustn't wait for the helper.
+                try:
+                    dispatcher.submit(self.flush, priority=dispatcher.BULK)
+                except RuntimeError:
+                    # Closing, the ids are sent with a later call.
+                    pass
+            elif not helper_script._in_call:
+                # A proxy may be collected in the middle of a call. Its id is
+                # sent with the next one in that case.
+                self.flush()
+
+    def _take(self) -> List[int]:
+        if not self._ids:
+            return []
+        self._taking = True
+        try:
+            taken = set()
+            while True:
+                try:
+                    taken.add(self._ids.popleft())
+                except IndexError:
+                    break
+            helper_script = self._helper_script_ref()
+            if helper_script is None:
+                ids = list(taken)
+            else:
+                # An id may have been referenced again since it was queued.
+                # `_rc_lock` is reentrant, a finalizer run here can still take it.
+                with helper_script._rc_lock:
+                    rc = helper_script._osaobj_rc
+                    ids = [obj_id for obj_id in taken if rc.get(obj_id, 0) <= 0]
+        finally:
+            self._taking = False
+        self.released_count += len(ids)
+        return ids
+
+    def drain(self) -> List[int]:
+        """Remove and return all the pending ids, to be sent along with a call."""
+        ids = self._take()
+        if ids:
+            self.piggybacked_count += 1
+        return ids
+
+    def requeue(self, ids: List[int]):
+        """Put back ids whose release may not have reached the helper."""
+        self._ids.extend(ids)
+        self.released_count -= len(ids)
+
+    def flush(self):
+        """Release all the pending ids now, in one call."""
+        helper_script = self._helper_script_ref()
+        if helper_script is None:
+            return
+        ids = self._take()
+        if not ids:
+            return
+        start = time.perf_counter()
+        try:
+            helper_script.release_objects_with_ids(ids)
+        except Exception:
+            self.requeue(ids)
+            raise
+        elapsed = time.perf_counter() - start
+        self.flush_count += 1
+        self.last_flush_seconds = elapsed
+        self.total_flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        logger.debug('flushed release queue in %.6fs', elapsed)
+
+    def stats(self) -> dict:
+        return {
+            'depth': self.depth,
+            'threshold': self.threshold,
+            'flushes': self.flush_count,
+            'piggybacked': self.piggybacked_count,
+            'released': self.released_count,
+            'last_flush_seconds': self.last_flush_seconds,
+            'total_flush_seconds': self.total_flush_seconds,
+            'max_flush_seconds': self.max_flush_seconds,
+        }
+
+
+@atexit.register
+def _flush_release_queues():
+    for queue in list(_release_queues):
+        try:
+            queue.flush()
+        except Exception as e:
+            logger.debug('failed to flush release queue at exit: %r', e)
@@ -0,0 +1,1175 @@
+"""An in-memory stand-in for the JXA helper and the applications it scripts.
+
+`SimulatedTransport` speaks the same protocol as `jxa_helper_v2.js`
+(`getApplication`, `getProperty`, `getProperties`, `setProperties`,
+`callMethod`, `callSelf`, `releaseObjectWithId`, ...) but serves it from a
+synthetic store of databases and records kept in Python. It lets the
+bridging code run, and be measured, on machines without DEVONthink.
+
+Examples:
+    >>> dt = SimulatedDEVONthink()
+    >>> db = dt.add_database('test-db')
+    >>> record = db.add_record(name='hello', type='markdown', plainText='# Hello')
+    >>> helper = HelperScript(SimulatedTransport([dt], latency=0.001))
+    >>> DEVONthink3.from_script(helper).databases[0].name
+    'test-db'
+"""
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+import os
+import re
+import time
+import uuid as uuid_lib
+import weakref
+
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .transport import Transport
+
+
+logger = getLogger(__name__)
+
+
+class SimulatedError(Exception):
+    """An error raised inside the simulated helper, the equivalent of a JS `Error`."""
+    error_number = -2700
+
+
+class SimulatedUndefinedFunction(SimulatedError):
+    """A call to a function the helper doesn't define, which the script doesn't understand."""
+    error_number = -1708
+
+
+# ---------------------------------------------------------------------------
+# The object model of the simulated applications
+# ---------------------------------------------------------------------------
+
+class SimulatedObject:
+    """A scriptable object of a simulated application.
+
+    Members are looked up by their JXA (camelCase) name in the following order:
+    `properties` (plain values), `_relations` (a single object), `_elements`
+    (a list of objects) and `_commands`. The last three map JXA names to the
+    names of the Python attributes or methods implementing them.
+    """
+    class_name = 'item'
+
+    _relations: Dict[str, str] = {}
+    _elements: Dict[str, str] = {}
+    _commands: Dict[str, str] = {}
+
+    def __init__(self, application: Optional[SimulatedApplication] = None, **properties):
+        self.application = application
+        self.properties: Dict[str, Any] = properties
+
+    @property
+    def display_string(self) -> str:
+        raise NotImplementedError()
+
+    @property
+    def specifier_class(self) -> str:
+        # What `classOf` answers for a specifier of the object, the element
+        # class of its container rather than its own class.
+        return self.class_name
+
+    def member(self, name: str):
+        if name in self.properties:
+            return PropertySpecifier(self, name)
+        if name in self._relations:
+            target = getattr(self, self._relations[name])
+            return None if target is None else ObjectSpecifier(target)
+        if name in self._elements:
+            return ElementsSpecifier(self, name, getattr(self, self._elements[name]))
+        if name in self._commands:
+            return Method(getattr(self, self._commands[name]), name)
+        return None
+
+    def set_member(self, name: str, value):
+        if name in self._relations:
+            if value is not None and not isinstance(value, ObjectSpecifier):
+                raise SimulatedError(f"Can't set {name} to {value!r}.")
+            setattr(self, self._relations[name], None if value is None else value.target)
+        elif name in self.properties:
+            self.properties[name] = value
+        else:
+            raise SimulatedError(f"Can't set {name} of {self.display_string}.")
+
+
+class SimulatedApplication(SimulatedObject):
+    class_name = 'application'
+
+    _commands = {
+        'activate': 'activate',
+        'parentOfClass': 'parent_of_class',
+    }
+
+    # Maps a class name to the name of its parent class, see `parentOfClass`.
+    class_hierarchy: Dict[str, str] = {}
+
+    def __init__(self, name: str, **properties):
+        properties.setdefault('name', name)
+        properties.setdefault('id', None)
+        properties.setdefault('version', '1.0')
+        properties.setdefault('frontmost', False)
+        super().__init__(None, **properties)
+        self.application = self
+        self.name = name
+
+    @property
+    def display_string(self) -> str:
+        return f'Application("{self.name}")'
+
+    def activate(self, options=None):
+        self.properties['frontmost'] = True
+        return True
+
+    def parent_of_class(self, class_name: str, options=None) -> Optional[str]:
+        return self.class_hierarchy.get(class_name)
+
+
+class SimulatedRecord(SimulatedObject):
+    specifier_class = 'record'
+
+    _relations = {
+        'database': 'database',
+        'annotation': 'annotation',
+        'locationGroup': 'location_group',
+    }
+    _elements = {
+        'children': 'children',
+        'parents': 'parents',
+        'incomingReferences': 'incoming_references',
+        'outgoingReferences': 'outgoing_references',
+    }
+
+    def __init__(self, database: SimulatedDatabase, **properties):
+        super().__init__(database.application, **properties)
+        self.database = database
+        self.annotation: Optional[SimulatedRecord] = None
+        self.children: List[SimulatedRecord] = []
+        self.parents: List[SimulatedRecord] = []
+        self.incoming_references: List[SimulatedRecord] = []
+        self.outgoing_references: List[SimulatedRecord] = []
+
+    @property
+    def class_name(self) -> str:
+        return 'smartGroup' if self.properties.get('type') == 'smart group' else 'record'
+
+    @property
+    def location_group(self) -> Optional[SimulatedRecord]:
+        return self.parents[0] if self.parents else None
+
+    @property
+    def display_string(self) -> str:
+        return f'{self.database.display_string}.contents.byId({self.properties["id"]})'
+
+
+class SimulatedDatabase(SimulatedObject):
+    class_name = 'database'
+
+    _relations = {
+        'root': 'root',
+        'incomingGroup': 'root',
+        'currentGroup': 'root',
+        'annotationsGroup': 'root',
+        'tagsGroup': 'tags_group',
+        'trashGroup': 'trash_group',
+    }
+    _elements = {
+        'contents': 'contents',
+        'records': 'contents',
+        'parents': 'top_level',
+        'smartGroups': 'smart_groups',
+        'tagGroups': 'smart_groups',
+    }
+
+    _record_ids = itertools.count(1)
+
+    def __init__(self, application: SimulatedDEVONthink, name: str, **properties):
+        properties.setdefault('name', name)
+        properties.setdefault('uuid', str(uuid_lib.uuid4()).upper())
+        properties.setdefault('path', f'/Users/simulated/Databases/{name}.dtBase2')
+        properties.setdefault('comment', '')
+        properties.setdefault('encrypted', False)
+        properties.setdefault('readOnly', False)
+        super().__init__(application, **properties)
+        self.contents: List[SimulatedRecord] = []
+        self.records_by_uuid: Dict[str, SimulatedRecord] = {}
+        self.records_by_id: Dict[int, SimulatedRecord] = {}
+        self.smart_groups: List[SimulatedRecord] = []
+        self.root = self._new_record(name=name, type='group', location='/')
+        self.tags_group = self._new_record(name='Tags', type='group', location='/Tags')
+        self.trash_group = self._new_record(name='Trash', type='group', location='/Trash')
+
+    @property
+    def top_level(self) -> List[SimulatedRecord]:
+        return self.root.children
+
+    @property
+    def display_string(self) -> str:
+        return f'{self.application.display_string}.databases.byId({self.properties["id"]})'
+
+    def _new_record(self, **properties) -> SimulatedRecord:
+        now = datetime.datetime.now()
+        record_id = next(self._record_ids)
+        properties.setdefault('id', record_id)
+        properties.setdefault('uuid', str(uuid_lib.uuid4()).upper())
+        properties.setdefault('name', f'Record {record_id}')
+        properties.setdefault('type', 'markdown')
+        properties.setdefault('plainText', '')
+        properties.setdefault('source', '')
+        properties.setdefault('comment', '')
+        properties.setdefault('tags', [])
+        properties.setdefault('URL', '')
+        properties.setdefault('creationDate', now)
+        properties.setdefault('modificationDate', now)
+        properties.setdefault('additionDate', now)
+        properties.setdefault('location', '/')
+        properties.setdefault('path', '')
+        properties.setdefault('size', len(properties['plainText'].encode()))
+        properties.setdefault('wordCount', len(properties['plainText'].split()))
+        properties.setdefault('characterCount', len(properties['plainText']))
+        properties.setdefault('rating', 0)
+        properties.setdefault('label', 0)
+        properties.setdefault('flag', False)
+        properties.setdefault('unread', False)
+        properties.setdefault('locking', False)
+        record = SimulatedRecord(self, **properties)
+        self.records_by_uuid[properties['uuid']] = record
+        self.records_by_id[properties['id']] = record
+        return record
+
+    def add_record(self, parent: Optional[SimulatedRecord] = None, **properties) -> SimulatedRecord:
+        """Add a record to the database.
+
+        Args:
+            parent (SimulatedRecord, optional): The group to add the record to. Defaults to the root.
+            **properties: The JXA (camelCase) properties of the record.
+
+        Returns:
+            SimulatedRecord: The new record.
+        """
+        parent = self.root if parent is None else parent
+        properties.setdefault('location', parent.properties['location'])
+        record = self._new_record(**properties)
+        record.parents.append(parent)
+        parent.children.append(record)
+        self.contents.append(record)
+        return record
+
+    def remove_record(self, record: SimulatedRecord):
+        for parent in record.parents:
+            parent.children.remove(record)
+        self.contents.remove(record)
+        del self.records_by_uuid[record.properties['uuid']]
+        del self.records_by_id[record.properties['id']]
+
+
+class SimulatedDEVONthink(SimulatedApplication):
+    """A simulated DEVONthink 3 holding databases of synthetic records."""
+
+    _relations = {
+        'currentDatabase': 'current_database',
+        'inbox': 'current_database',
+        'incomingGroup': 'incoming_group',
+        'currentGroup': 'incoming_group',
+        'preferredImportDestination': 'incoming_group',
+        'contentRecord': 'content_record',
+    }
+    _elements = {
+        'databases': 'databases',
+        'selectedRecords': 'selected_records',
+    }
+    _commands = {
+        **SimulatedApplication._commands,
+        'search': 'search',
+        'createRecordWith': 'create_record_with',
+        'getDatabaseWithUuid': 'get_database_with_uuid',
+        'getRecordWithUuid': 'get_record_with_uuid',
+        'getRecordWithId': 'get_record_with_id',
+        'getRecordAt': 'get_record_at',
+        'delete': 'delete',
+        'import': 'import_',
+    }
+
+    class_hierarchy = {
+        'smartGroup': 'record',
+        'tagGroup': 'record',
+        'record': 'item',
+        'database': 'item',
+        'tab': 'item',
+        'thinkWindow': 'window',
+        'documentWindow': 'thinkWindow',
+        'viewerWindow': 'thinkWindow',
+    }
+
+    _database_ids = itertools.count(1)
+
+    def __init__(self, **properties):
+        properties.setdefault('id', 'com.devon-technologies.think3')
+        properties.setdefault('version', '3.9')
+        properties.setdefault('readingList', [])
+        properties.setdefault('workspaces', [])
+        super().__init__('DEVONthink 3', **properties)
+        self.databases: List[SimulatedDatabase] = []
+        self.selected_records: List[SimulatedRecord] = []
+        self.content_record: Optional[SimulatedRecord] = None
+
+    @property
+    def current_database(self) -> Optional[SimulatedDatabase]:
+        return self.databases[0] if self.databases else None
+
+    @property
+    def incoming_group(self) -> Optional[SimulatedRecord]:
+        db = self.current_database
+        return None if db is None else db.root
+
+    def add_database(self, name: str, **properties) -> SimulatedDatabase:
+        properties.setdefault('id', next(self._database_ids))
+        db = SimulatedDatabase(self, name, **properties)
+        self.databases.append(db)
+        return db
+
+    def _target_databases(self, options) -> List[SimulatedDatabase]:
+        target = (options or {}).get('in')
+        if target is None:
+            return self.databases
+        target = target.target
+        if isinstance(target, SimulatedRecord):
+            return [target.database]
+        return [target]
+
+    def search(self, text: str, options=None) -> List[ObjectSpecifier]:
+        options = options or {}
+        group = options.get('in')
+        if group is not None and isinstance(group.target, SimulatedRecord):
+            candidates = _walk(group.target.children, not options.get('excludeSubgroups'))
+        else:
+            candidates = itertools.chain.from_iterable(db.contents for db in self._target_databases(options))
+
+        m = re.match(r'^(\w+)\s*(==|:)\s*(.*)$', text or '')
+        if m:
+            prop, op, value = m.groups()
+            prop = {'name': 'name', 'kind': 'kind', 'type': 'type', 'tags': 'tags', 'comment': 'comment'}.get(prop, prop)
+            if op == '==':
+                match = lambda r: r.properties.get(prop) == value
+            else:
+                match = lambda r: value.lower() in str(r.properties.get(prop, '')).lower()
+        else:
+            needle = (text or '').lower()
+            match = lambda r: needle in r.properties['name'].lower() or needle in r.properties['plainText'].lower()
+        return [ObjectSpecifier(r) for r in candidates if match(r)]
+
+    def create_record_with(self, properties: dict, options=None) -> ObjectSpecifier:
+        group = (options or {}).get('in')
+        group = self.incoming_group if group is None else group.target
+        if group is None:
+            raise SimulatedError('No database is open.')
+        properties = {_camel_case(k): v for k, v in properties.items()}
+        return ObjectSpecifier(group.database.add_record(group, **properties))
+
+    def get_database_with_uuid(self, uuid: str) -> Optional[ObjectSpecifier]:
+        for db in self.databases:
+            if db.properties['uuid'] == uuid:
+                return ObjectSpecifier(db)
+        return None
+
+    def get_record_with_uuid(self, uuid: str, options=None) -> Optional[ObjectSpecifier]:
+        uuid = uuid.replace('x-devonthink-item://', '')
+        for db in self._target_databases(options):
+            record = db.records_by_uuid.get(uuid)
+            if record is not None:
+                return ObjectSpecifier(record)
+        return None
+
+    def get_record_with_id(self, identifier: int, options=None) -> Optional[ObjectSpecifier]:
+        db = self._target_databases(options)[0] if (options or {}).get('in') else self.current_database
+        record = None if db is None else db.records_by_id.get(identifier)
+        return None if record is None else ObjectSpecifier(record)
+
+    def get_record_at(self, location: str, options=None) -> Optional[ObjectSpecifier]:
+        for db in self._target_databases(options):
+            for record in db.contents:
+                if record.properties['location'].rstrip('/') + '/' + record.properties['name'] == location:
+                    return ObjectSpecifier(record)
+        return None
+
+    def delete(self, options=None) -> bool:
+        record = (options or {}).get('record')
+        if record is None:
+            raise SimulatedError('Missing record.')
+        record = record.target
+        record.database.remove_record(record)
+        return True
+
+    def import_(self, path: str, options=None) -> ObjectSpecifier:
+        options = options or {}
+        text = ''
+        if os.path.isfile(path):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        properties = {'name': options.get('name') or os.path.basename(path), 'plainText': text, 'path': path}
+        return self.create_record_with(properties, {'in': options.get('to')})
+
+
+def _walk(records: Iterable[SimulatedRecord], recursive: bool):
+    for record in records:
+        yield record
+        if recursive:
+            yield from _walk(record.children, recursive)
+
+
+def _camel_case(name: str) -> str:
+    if ' ' not in name:
+        return name
+    first, *rest = name.split(' ')
+    return first + ''.join(w.capitalize() for w in rest)
+
+
+# ---------------------------------------------------------------------------
+# JXA values: specifiers and functions
+# ---------------------------------------------------------------------------
+
+class Specifier:
+    """A JXA object specifier, a lazy reference into an application."""
+    class_name: Optional[str] = None
+
+    @property
+    def app_name(self) -> Optional[str]:
+        raise NotImplementedError()
+
+    @property
+    def display_string(self) -> str:
+        raise NotImplementedError()
+
+    def member(self, name: str):
+        return None
+
+    def set_member(self, name: str, value):
+        raise SimulatedError(f"Can't set {name} of {self.display_string}.")
+
+    def evaluate(self, *args):
+        raise NotImplementedError()
+
+
+class ObjectSpecifier(Specifier):
+    def __init__(self, target: SimulatedObject):
+        self.target = target
+
+    @property
+    def class_name(self) -> str:
+        return self.target.class_name
+
+    @property
+    def specifier_class(self) -> str:
+        return self.target.specifier_class
+
+    @property
+    def app_name(self) -> str:
+        return self.target.application.name
+
+    @property
+    def display_string(self) -> str:
+        return self.target.display_string
+
+    def member(self, name: str):
+        return self.target.member(name)
+
+    def set_member(self, name: str, value):
+        self.target.set_member(name, value)
+
+    def evaluate(self, *args):
+        return self
+
+
+class ElementList(list):
+    """Specifiers made by `at`, the classes of which are looked up one by one (see `perElementClasses`)."""
+
+
+class PropertySpecifier(Specifier):
+    def __init__(self, owner: SimulatedObject, name: str):
+        self.owner = owner
+        self.name = name
+
+    @property
+    def app_name(self) -> str:
+        return self.owner.application.name
+
+    @property
+    def display_string(self) -> str:
+        return f'{self.owner.display_string}.{self.name}'
+
+    def evaluate(self, *args):
+        return self.owner.properties[self.name]
+
+
+class ElementsSpecifier(Specifier):
+    def __init__(self, owner: SimulatedObject, name: str, items: List[SimulatedObject]):
+        self.owner = owner
+        self.name = name
+        self.items = items
+
+    @property
+    def class_name(self) -> str:
+        element_class = self.items[0].class_name if self.items else 'item'
+        return 'array::' + element_class
+
+    @property
+    def app_name(self) -> str:
+        return self.owner.application.name
+
+    @property
+    def display_string(self) -> str:
+        return f'{self.owner.display_string}.{self.name}'
+
+    def member(self, name: str):
+        if name == 'length':
+            return len(self.items)
+        if name == 'at':
+            return Method(self.at, name)
+        if name == 'whose':
+            return Method(self.whose, name)
+        if self.items and self.items[0].member(name) is not None:
+            return ColumnSpecifier(self, name)
+        return None
+
+    def at(self, index: int, options=None) -> ObjectSpecifier:
+        try:
+            return ObjectSpecifier(self.items[index])
+        except IndexError:
+            raise SimulatedError(f"Can't get object {index} of {self.display_string}.")
+
+    def whose(self, filter: dict, options=None) -> ElementsSpecifier:
+        def match(item: SimulatedObject) -> bool:
+            for k, v in filter.items():
+                value = item.properties.get(k)
+                if isinstance(v, dict):
+                    ((op, operand),) = v.items()
+                    if op == '_equals' and value != operand:
+                        return False
+                    elif op == '_contains' and operand not in value:
+                        return False
+                    elif op == '_beginsWith' and not str(value).startswith(operand):
+                        return False
+                elif value != v:
+                    return False
+            return True
+        return ElementsSpecifier(self.owner, f'{self.name}.whose({filter!r})', [i for i in self.items if match(i)])
+
+    def evaluate(self, *args):
+        return [ObjectSpecifier(i) for i in self.items]
+
+
+class ColumnSpecifier(Specifier):
+    """A property of every element of a collection, eg. `records.name`."""
+
+    def __init__(self, elements: ElementsSpecifier, name: str):
+        self.elements = elements
+        self.name = name
+
+    @property
+    def app_name(self) -> str:
+        return self.elements.app_name
+
+    @property
+    def display_string(self) -> str:
+        return f'{self.elements.display_string}.{self.name}'
+
+    def evaluate(self, *args):
+        return [_call(item.member(self.name), [], None) for item in self.elements.items]
+
+
+class Method:
+    """A JS function, e.g. a command of an application bound to its target."""
+
+    def __init__(self, func: Callable, name: str):
+        self.func = func
+        self.name = name
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+
+def _member(obj, name: str):
+    if isinstance(obj, Specifier):
+        return obj.member(name)
+    if isinstance(obj, dict):
+        return obj.get(name)
+    if isinstance(obj, (list, str)) and name == 'length':
+        return len(obj)
+    if obj is None:
+        raise SimulatedError(f"undefined is not an object (evaluating 'obj.{name}')")
+    return None
+
+
+def _call(func, args: list, kwargs: Optional[dict]):
+    if kwargs is not None:
+        args = [*args, kwargs]
+    if isinstance(func, Method):
+        return func(*args)
+    if isinstance(func, Specifier):
+        return func.evaluate(*args)
+    raise SimulatedError(f'{func!r} is not a function')
+
+
+# ---------------------------------------------------------------------------
+# The helper script
+# ---------------------------------------------------------------------------
+
+class ObjectPoolManager:
+    """Mirror of `ObjectPoolManager` in `jxa_helper_v2.js`.
+
+    `resolve` stands in for `eval` of a display string when rehydrating.
+    """
+
+    def __init__(self, resolve: Optional[Callable[[str], Any]] = None):
+        self._current_id = 0
+        self._object_id_map: Dict[Any, int] = {}
+        self._specifier_keys: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # The display strings computed for keys, see `keyOf` in the JS helper.
+        self.key_computations = 0
+        # In least recently used order while the pool is bounded.
+        self._id_object_map: Dict[int, Any] = {}
+        self.current_scope: Optional[int] = None
+        self._scope_ids_map: Dict[int, set] = {}
+        self._id_scope_counts: Dict[int, int] = {}
+        self._unscoped_ids: set = set()
+        self.resolve = resolve
+        self.limit: Optional[int] = None
+        self.evictions = 0
+        self.rehydrations = 0
+        self._evicted: Dict[int, str] = {}
+        self._rehydrated: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._id_object_map)
+
+    def get_object(self, obj_id: int, specifier: Optional[str] = None):
+        try:
+            obj = self._id_object_map[obj_id]
+        except KeyError:
+            if specifier is not None:
+                return self.rehydrate(obj_id, specifier)
+            raise SimulatedError(f'No object with id: {obj_id}')
+        if self.limit is not None:
+            self._id_object_map[obj_id] = self._id_object_map.pop(obj_id)
+        return obj
+
+    def rehydrate(self, obj_id: int, specifier: str):
+        if self.resolve is None:
+            raise SimulatedError(f"Can't resolve {specifier}")
+        obj = self.resolve(specifier)
+        self._id_object_map[obj_id] = obj
+        self._object_id_map.setdefault(self.key_of(obj), obj_id)
+        self.rehydrations += 1
+        self._rehydrated.append(obj_id)
+        return obj
+
+    def key_of(self, obj):
+        if isinstance(obj, ObjectSpecifier) and obj.class_name != 'application':
+            key = self._specifier_keys.get(obj)
+            if key is None:
+                key = self._specifier_keys[obj] = 'specifier:' + obj.display_string
+                self.key_computations += 1
+            return key
+        return id(obj)
+
+    def get_id(self, obj) -> int:
+        key = self.key_of(obj)
+        obj_id = self._object_id_map.get(key)
+        if obj_id is None:
+            self._current_id += 1
+            obj_id = self._current_id
+            self._object_id_map[key] = obj_id
+            self._id_object_map[obj_id] = obj
+        elif self.limit is not None:
+            self.get_object(obj_id)
+        self._tag(obj_id)
+        return obj_id
+
+    def _tag(self, obj_id: int):
+        if self.current_scope is None:
+            self._unscoped_ids.add(obj_id)
+            return
+        ids = self._scope_ids_map.setdefault(self.current_scope, set())
+        if obj_id not in ids:
+            ids.add(obj_id)
+            self._id_scope_counts[obj_id] = self._id_scope_counts.get(obj_id, 0) + 1
+
+    def release_object_with_id(self, obj_id: int):
+        self._unscoped_ids.discard(obj_id)
+        if obj_id not in self._id_scope_counts:
+            self._drop(obj_id)
+
+    def _drop(self, obj_id: int):
+        obj = self._id_object_map.pop(obj_id, None)
+        if obj is not None:
+            key = self.key_of(obj)
+            if self._object_id_map.get(key) == obj_id:
+                del self._object_id_map[key]
+
+    def release_scope(self, scope: int):
+        for obj_id in self._scope_ids_map.pop(scope, ()):
+            count = self._id_scope_counts[obj_id] - 1
+            if count > 0:
+                self._id_scope_counts[obj_id] = count
+            else:
+                del self._id_scope_counts[obj_id]
+                if obj_id not in self._unscoped_ids:
+                    self._drop(obj_id)
+
+    def evict_overflow(self):
+        if self.limit is None or len(self._id_object_map) <= self.limit:
+            return
+        excess = len(self._id_object_map) - self.limit
+        for obj_id, obj in list(self._id_object_map.items()):
+            if excess <= 0:
+                break
+            key = self.key_of(obj)
+            if not isinstance(key, str):
+                continue
+            self._drop(obj_id)
+            self._evicted[obj_id] = key[len('specifier:'):]
+            self.evictions += 1
+            excess -= 1
+
+    def take_events(self) -> Optional[dict]:
+        if not self._evicted and not self._rehydrated:
+            return None
+        events = {'e': self._evicted, 'h': self._rehydrated}
+        self._evicted = {}
+        self._rehydrated = []
+        return events
+
+
+# See `leafClasses` in the JS helper.
+LEAF_CLASSES = {
+    'DEVONthink 3': {'database', 'smartGroup', 'tagGroup', 'reminder', 'tab', 'documentWindow', 'viewerWindow'},
+    'Mail': {'message', 'mailbox'},
+}
+
+
+class JsonTranslator:
+    """Mirror of `JsonTranslator` in `jxa_helper_v2.js`."""
+
+    def __init__(self, object_pool_manager: ObjectPoolManager):
+        self.object_pool_manager = object_pool_manager
+        # See `homogeneousArrays` in the JS helper.
+        self.homogeneous_arrays = True
+        # The `specifier.class()` calls the helper would make, and the seconds each one is delayed by.
+        self.class_lookups = 0
+        self.class_lookup_latency = 0.0
+
+    def _class_of(self, obj: Specifier) -> Optional[str]:
+        if isinstance(obj, ObjectSpecifier):
+            self.class_lookups += 1
+            if self.class_lookup_latency:
+                time.sleep(self.class_lookup_latency)
+        return obj.class_name
+
+    def homogeneous_reference(self, obj) -> Optional[tuple]:
+        """The class name and app shared by a list of object specifiers, or None."""
+        if not self.homogeneous_arrays or len(obj) < 2 or isinstance(obj, ElementList):
+            return None
+        class_name = None
+        for element in obj:
+            if not isinstance(element, ObjectSpecifier):
+                return None
+            if class_name is None:
+                class_name = element.specifier_class
+            elif element.specifier_class != class_name:
+                return None
+        if class_name not in LEAF_CLASSES.get(obj[0].app_name, ()):
+            return None
+        return self._class_of(obj[0]), obj[0].app_name
+
+    def wrap_to_json(self, obj) -> dict:
+        if obj is None or isinstance(obj, (bool, int, float, str)):
+            return {'type': 'plain', 'data': obj}
+        if isinstance(obj, Specifier):
+            result = {
+                'type': 'reference',
+                'objId': self.object_pool_manager.get_id(obj),
+                'app': obj.app_name,
+            }
+            class_name = self._class_of(obj)
+            if class_name is not None:
+                result['className'] = class_name
+            return result
+        if isinstance(obj, datetime.datetime):
+            return {'type': 'date', 'data': obj.timestamp()}
+        if isinstance(obj, (list, tuple)):
+            shared = self.homogeneous_reference(obj)
+            if shared is not None:
+                class_name, app_name = shared
+                return {'type': 'array', 'data': [
+                    {'type': 'reference', 'objId': self.object_pool_manager.get_id(i), 'className': class_name, 'app': app_name}
+                    for i in obj
+                ]}
+            return {'type': 'array', 'data': [self.wrap_to_json(i) for i in obj]}
+        if isinstance(obj, dict):
+            return {'type': 'dict', 'data': {k: self.wrap_to_json(v) for k, v in obj.items()}}
+        if isinstance(obj, Method):
+            return {'type': 'reference', 'objId': self.object_pool_manager.get_id(obj), 'className': 'function'}
+        raise SimulatedError(f'wrapObjToJson: Unknown type: {type(obj)}')
+
+    def unwrap_from_json(self, obj: dict):
+        kind = obj['type']
+        if kind == 'plain':
+            return obj.get('data')
+        elif kind == 'date':
+            return datetime.datetime.fromtimestamp(obj['data'])
+        elif kind == 'array':
+            return [self.unwrap_from_json(i) for i in obj['data']]
+        elif kind == 'dict':
+            return {k: self.unwrap_from_json(v) for k, v in obj['data'].items()}
+        elif kind == 'reference':
+            return self.object_pool_manager.get_object(obj['objId'], obj.get('specifier'))
+        raise SimulatedError(f'Unknown type: {kind}')
+
+    def reference_of(self, obj) -> Optional[list]:
+        if isinstance(obj, Specifier):
+            return [self.object_pool_manager.get_id(obj), self._class_of(obj), obj.app_name]
+        if isinstance(obj, Method):
+            return [self.object_pool_manager.get_id(obj), 'function', None]
+        return None
+
+    def encode_compact(self, obj) -> dict:
+        strings: List[str] = []
+        indices: Dict[str, int] = {}
+        marked = False
+
+        def intern(s: Optional[str]) -> Optional[int]:
+            if s is None:
+                return None
+            if s not in indices:
+                indices[s] = len(strings)
+                strings.append(s)
+            return indices[s]
+
+        def encode(obj):
+            nonlocal marked
+            if obj is None or isinstance(obj, (bool, int, float, str)):
+                return obj
+            reference = self.reference_of(obj)
+            if reference is not None:
+                marked = True
+                obj_id, class_name, app_name = reference
+                return {'$r': [obj_id, intern(class_name), intern(app_name)]}
+            if isinstance(obj, datetime.datetime):
+                marked = True
+                return {'$d': obj.timestamp()}
+            if isinstance(obj, (list, tuple)):
+                shared = self.homogeneous_reference(obj)
+                if shared is not None:
+                    marked = True
+                    class_name, app_name = shared
+                    return {'$R': [intern(class_name), intern(app_name), [self.object_pool_manager.get_id(i) for i in obj]]}
+                return [encode(i) for i in obj]
+            if isinstance(obj, dict):
+                data = {}
+                for k, v in obj.items():
+                    if k.startswith('$'):
+                        k = '$' + k
+                        marked = True
+                    data[k] = encode(v)
+                return data
+            raise SimulatedError(f'encodeCompact: Unknown type: {type(obj)}')
+
+        envelope = {'v': 2, 'd': encode(obj)}
+        if marked:
+            envelope['x'] = 1
+            envelope['s'] = strings
+        return envelope
+
+    def decode_compact(self, obj):
+        if isinstance(obj, list):
+            return [self.decode_compact(i) for i in obj]
+        if isinstance(obj, dict):
+            if len(obj) == 2 and list(obj) == ['$r', '$s']:
+                return self.object_pool_manager.get_object(obj['$r'], obj['$s'])
+            if len(obj) == 1:
+                if '$r' in obj:
+                    return self.object_pool_manager.get_object(obj['$r'])
+                if '$d' in obj:
+                    return datetime.datetime.fromtimestamp(obj['$d'])
+            return {(k[1:] if k.startswith('$') else k): self.decode_compact(v) for k, v in obj.items()}
+        return obj
+
+
+# The exceptions a simulated JS function may throw.
+_ERRORS = (SimulatedError, KeyError, TypeError)
+
+
+class SimulatedHelper:
+    """The functions of `jxa_helper_v2.js`, evaluated against simulated applications."""
+
+    def __init__(self, applications: Iterable[SimulatedApplication] = (), codec_versions: Iterable[int] = (2, 1)):
+        self.codec_versions = list(codec_versions)
+        self.applications: Dict[str, SimulatedApplication] = {app.name: app for app in applications}
+        self.object_pool_manager = ObjectPoolManager(self.resolve_specifier)
+        self.json_translator = JsonTranslator(self.object_pool_manager)
+        self._column_cache = (None, {})
+        self._text_cache = (None, None)
+        # The reads of whole texts by `readText`.
+        self.text_reads = 0
+        self.functions: Dict[str, Callable[[Any], Any]] = {
+            'echo': self.echo,
+            'releaseObjectWithId': self.release_object_with_id,
+            'releaseObjectsWithIds': self.release_objects_with_ids,
+            'releaseScope': self.release_scope,
+            'configurePool': self.configure_pool,
+            'getApplication': self.get_application,
+            'evalJXACodeSnippet': self.eval_jxa_code_snippet,
+            'evalAppleScriptCodeSnippet': self.eval_applescript_code_snippet,
+            'getProperty': self.get_property,
+            'getProperties': self.get_properties,
+            'getColumns': self.get_columns,
+            'getElements': self.get_elements,
+            'readText': self.read_text,
+            'writePropertyToFile': self.write_property_to_file,
+            'setProperties': self.set_properties,
+            'callMethod': self.call_method,
+            'callSelf': self.call_self,
+            'executeBatch': self.execute_batch,
+        }
+        if self.codec_versions != [1]:
+            self.functions['negotiateCodec'] = self.negotiate_codec
+
+    def handle(self, func_name: str, arg: str) -> str:
+        """Equivalent of calling a function wrapped by `strIOFuncWrapper`."""
+        func = self.functions.get(func_name)
+        if func is None:
+            raise SimulatedUndefinedFunction(f'{func_name} is not defined')
+        started = time.perf_counter()
+        params = json.loads(arg)
+        timed = params.get('timing')
+        if params.get('release'):
+            self.release_objects_with_ids({'ids': params['release']})
+        self.object_pool_manager.current_scope = params.get('scope')
+        compact = params.get('v') == 2
+        try:
+            if compact:
+                params = self.json_translator.decode_compact(params['d']) if params.get('x') else params['d']
+            else:
+                params = self.json_translator.unwrap_from_json(params)
+            unwrapped = time.perf_counter()
+            result = func(params)
+            called = time.perf_counter()
+            if compact:
+                result = self.json_translator.encode_compact(result)
+            else:
+                result = self.json_translator.wrap_to_json(result)
+            wrapped = time.perf_counter()
+            # Unescaped like `JSON.stringify`
+            response = json.dumps(result, ensure_ascii=False)
+            self.object_pool_manager.evict_overflow()
+            if timed:
+                timings = [unwrapped - started, called - unwrapped, wrapped - called, time.perf_counter() - wrapped]
+                response = response[:-1] + ',"t":' + json.dumps([t * 1000 for t in timings]) + '}'
+            events = self.object_pool_manager.take_events()
+            if events is not None:
+                response = response[:-1] + ',' + json.dumps(events)[1:]
+            return response
+        finally:
+            self.object_pool_manager.current_scope = None
+
+    def echo(self, params):
+        return params
+
+    def release_object_with_id(self, params):
+        self.object_pool_manager.release_object_with_id(params['id'])
+
+    def release_objects_with_ids(self, params):
+        for obj_id in params['ids']:
+            self.object_pool_manager.release_object_with_id(obj_id)
+
+    def negotiate_codec(self, params):
+        for version in params['versions']:
+            if version in self.codec_versions:
+                return version
+        return 1
+
+    def release_scope(self, params):
+        self.object_pool_manager.release_scope(params['scope'])
+
+    def configure_pool(self, params):
+        pool = self.object_pool_manager
+        if 'limit' in params:
+            pool.limit = params['limit']
+            pool.evict_overflow()
+        return {'size': len(pool), 'limit': pool.limit, 'evictions': pool.evictions, 'rehydrations': pool.rehydrations}
+
+    _database_specifier = re.compile(r'^Application\("([^"]+)"\)\.databases\.byId\((\d+)\)(?:\.contents\.byId\((\d+)\))?$')
+
+    def resolve_specifier(self, display_string: str) -> ObjectSpecifier:
+        # Only the display strings of databases and records are understood.
+        m = self._database_specifier.match(display_string)
+        if m is None:
+            raise SimulatedError(f'Unsupported specifier: {display_string}')
+        app_name, database_id, record_id = m.groups()
+        app = self.get_application({'name': app_name}).target
+        for database in getattr(app, 'databases', []):
+            if database.properties['id'] == int(database_id):
+                break
+        else:
+            raise SimulatedError(f"Can't get object {display_string}.")
+        if record_id is None:
+            return ObjectSpecifier(database)
+        record = database.records_by_id.get(int(record_id))
+        if record is None:
+            raise SimulatedError(f"Can't get object {display_string}.")
+        return ObjectSpecifier(record)
+
+    def get_application(self, params):
+        name = params['name']
+        app = self.applications.get(name)
+        if app is None:
+            raise SimulatedError(f"Application can't be found: {name}")
+        return ObjectSpecifier(app)
+
+    _application_call = re.compile(r'''^Application\(["']([^"']+)["']\)\.(\w+)\((?:["']([^"']*)["'])?\)$''')
+
+    def eval_jxa_code_snippet(self, params):
+        # Only calls of an application's commands are understood, e.g.
+        # `Application("DEVONthink 3").parentOfClass("smartGroup")`.
+        m = self._application_call.match(params['source'].strip())
+        if m is None:
+            raise SimulatedError(f'Unsupported snippet: {params["source"]}')
+        app_name, name, arg = m.groups()
+        app = self.get_application({'name': app_name})
+        return _call(_member(app, name), [] if arg is None else [arg], None)
+
+    def eval_applescript_code_snippet(self, params):
+        raise SimulatedError('AppleScript snippets are not supported by the simulator')
+
+    def get_property(self, params):
+        return _member(params['obj'], params['name'])
+
+    def get_properties(self, params):
+        return {k: self.get_property({'obj': params['obj'], 'name': k}) for k in params['properties']}
+
+    def get_columns(self, params):
+        obj, start, count = params['obj'], params.get('start'), params.get('count')
+        cached_obj, cache = self._column_cache
+        if cached_obj is not obj or not start:
+            cache = {}
+            self._column_cache = (obj, cache)
+        start = start or 0
+        columns = {}
+        length = 0
+        for k in params['properties']:
+            column = cache.get(k)
+            if column is None:
+                column = cache[k] = _call(_member(obj, k), [], None)
+            length = len(column)
+            columns[k] = column if count is None else column[start:start + count]
+        if count is None or start + count >= length:
+            self._column_cache = (None, {})
+        return {'columns': columns, 'length': length}
+
+    def get_elements(self, params):
+        obj = params['obj']
+        length = _member(obj, 'length')
+        start, end, _ = slice(params.get('start'), params.get('end')).indices(length)
+        at = _member(obj, 'at')
+        return {'elements': ElementList(at(i) for i in range(start, end)), 'length': length}
+
+    def read_text(self, params):
+        # Offsets count UTF-16 code units, as JS strings do.
+        obj, name, start, length = params['obj'], params['name'], params.get('start'), params.get('length')
+        iteration = params.get('iteration')
+        cached_iteration, units = self._text_cache
+        if iteration is None or cached_iteration != iteration:
+            units = None
+        self._text_cache = (None, None)
+        if units is None:
+            units = (_call(_member(obj, name), [], None) or '').encode('utf-16-le', 'surrogatepass')
+            self.text_reads += 1
+        total = len(units) // 2
+        start = min(start or 0, total)
+        end = total if length is None else min(start + length, total)
+        # Don't split a surrogate pair between two chunks.
+        if start < end < total and 0xD800 <= int.from_bytes(units[2 * end - 2:2 * end], 'little') <= 0xDBFF:
+            end += 1
+        if end < total and iteration is not None:
+            self._text_cache = (iteration, units)
+        text = units[2 * start:2 * end].decode('utf-16-le', 'surrogatepass')
+        return {'text': text, 'end': end, 'total': total}
+
+    def write_property_to_file(self, params):
+        name = params['name']
+        value = _call(_member(params['obj'], name), [], None)
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        if not isinstance(value, bytes):
+            raise SimulatedError(f'{name} is not binary data')
+        with open(params['path'], 'wb') as f:
+            f.write(value)
+        return {'size': len(value)}
+
+    def set_properties(self, params):
+        obj = params['obj']
+        for k, v in params['keyValues'].items():
+            obj.set_member(k, v)
+
+    def call_method(self, params):
+        name = params['name']
+        method = _member(params['obj'], name)
+        if method is None:
+            raise SimulatedError(f'Method not found: {name}')
+        return _call(method, params.get('args') or [], params.get('kwargs'))
+
+    def call_self(self, params):
+        return _call(params['obj'], params.get('args') or [], params.get('kwargs'))
+
+    def execute_batch(self, params):
+        results = []
+        for call in params['calls']:
+            try:
+                func = self.functions.get(call['name'])
+                if func is None or func == self.execute_batch:
+                    raise SimulatedError(f'Function not found: {call["name"]}')
+                results.append({'ok': True, 'result': func(call['params'])})
+            except _ERRORS as e:
+                results.append({'ok': False, 'error': f'Error: {e}'})
+        return results
+
+
+class SimulatedTransport(Transport):
+    """A transport that serves helper calls from `SimulatedHelper`.
+
+    Args:
+        applications (Iterable[SimulatedApplication], optional): The applications to script.
+            Defaults to an empty `SimulatedDEVONthink`.
+        latency (float, optional): Seconds every call is delayed by, to model the cost of an Apple Event.
+        codec_versions (Iterable[int], optional): The wire formats the helper understands.
+            `(1,)` behaves like a helper that predates codec negotiation.
+    """
+
+    def __init__(self, applications: Optional[Iterable[SimulatedApplication]] = None, latency: float = 0.0,
+                 codec_versions: Iterable[int] = (2, 1)):
+        if applications is None:
+            applications = [SimulatedDEVONthink()]
+        self.helper = SimulatedHelper(applications, codec_versions=codec_versions)
+        self.latency = latency
+        self.call_count = 0
+
+    def call(self, func_name: str, arg: str) -> str:
+        self.call_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            return self.helper.handle(func_name, arg)
+        except _ERRORS as e:
+            logger.debug('simulated helper raised %r', e)
+            raise RuntimeError({
+                'NSAppleScriptErrorMessage': f'Error: {e}',
+                'NSAppleScriptErrorNumber': getattr(e, 'error_number', -2700),
+            }) from e
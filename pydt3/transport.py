@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import datetime
+import json
+import threading
+import time
+
+from collections import deque
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+logger = getLogger(__name__)
+
+
+class Transport:
+    """The channel a helper script call travels through.
+
+    A transport takes the name of a function exported by the JXA helper
+    (see `jxa_helper_v2.js`) together with its JSON encoded argument and
+    returns the JSON encoded result. Failures are raised as `RuntimeError`.
+    """
+
+    def call(self, func_name: str, arg: str) -> str:
+        raise NotImplementedError()
+
+    def close(self):
+        """Release the resources held by the transport."""
+        pass
+
+
+def fourcharcode(chars: bytes) -> int:
+    return int.from_bytes(chars, 'big')
+
+
+class AppleEventTransport(Transport):
+    """Runs the helper as an `NSAppleScript` and calls it through Apple Events."""
+
+    def __init__(self, script):
+        self.script = script
+
+    @classmethod
+    def from_path(cls, path: str) -> AppleEventTransport:
+        from Foundation import NSAppleScript, NSURL
+
+        url = NSURL.fileURLWithPath_(path)
+        script, error = NSAppleScript.alloc().initWithContentsOfURL_error_(url, None)
+        if error:
+            raise RuntimeError(error)
+        return cls(script)
+
+    def call(self, func_name: str, arg: str) -> str:
+        from Foundation import NSAppleEventDescriptor
+
+        event = NSAppleEventDescriptor.appleEventWithEventClass_eventID_targetDescriptor_returnID_transactionID_(
+            fourcharcode(b'ascr'), fourcharcode(b'psbr'), NSAppleEventDescriptor.nullDescriptor(), 0, 0)
+        descriptor_list = NSAppleEventDescriptor.listDescriptor()
+        descriptor_list.insertDescriptor_atIndex_(NSAppleEventDescriptor.descriptorWithString_(arg), 0)
+        event.setDescriptor_forKeyword_(descriptor_list, fourcharcode(b'----'))
+
+        event.setDescriptor_forKeyword_(NSAppleEventDescriptor.descriptorWithString_(func_name), fourcharcode(b'snam'))
+
+        result, error = self.script.executeAppleEvent_error_(event, None)
+        if error:
+            raise RuntimeError(error)
+        else:
+            return result.stringValue()
+
+    def __eq__(self, o: object) -> bool:
+        return isinstance(o, AppleEventTransport) and self.script == o.script
+
+    def __hash__(self) -> int:
+        return id(self)
+
+
+class ReplayError(LookupError):
+    """The replayed session has no response to a request."""
+
+
+# Functions whose requests depend on when proxies are collected rather than
+# on the workload, so any recorded response of theirs will do on replay.
+_RELEASE_FUNCTIONS = ('releaseObjectWithId', 'releaseObjectsWithIds', 'releaseScope')
+
+SESSION_FORMAT = 'pydt3-session'
+
+
+def _plain_error(error):
+    # `NSDictionary` errors of Apple Events are turned into plain dicts.
+    if hasattr(error, 'keys'):
+        return {str(k): error[k] if isinstance(error[k], (str, int, float, bool)) else str(error[k])
+                for k in error.keys()}
+    return str(error)
+
+
+class RecordingTransport(Transport):
+    """Passes the calls on to `transport` and records them with their timings.
+
+    The session is written to `path` as JSON lines while it runs: a header,
+    then an entry per call with the function, the request, the response (or
+    the error), the time the call took and when it started, in seconds since
+    the start of the session. A `ReplayTransport` serves the session again.
+
+        >>> helper = HelperScript(RecordingTransport(AppleEventTransport.from_path(path), 'session.jsonl'))
+
+    Setting `$PYDT3_RECORD` to a path records the calls of the default helper.
+
+    Args:
+        transport (Transport): The transport making the calls.
+        path (str, optional): The file to write the session to. If not given the
+            session is only kept in `entries`.
+    """
+
+    def __init__(self, transport: Transport, path: Optional[str] = None):
+        self.transport = transport
+        self.path = path
+        self.entries = [] # type: List[dict]
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            self._file = open(path, 'w', encoding='utf-8')
+            self._write({
+                'format': SESSION_FORMAT,
+                'version': 1,
+                'started': datetime.datetime.now().isoformat(timespec='seconds'),
+                'transport': type(transport).__name__,
+            })
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry, default=str) + '\n')
+        self._file.flush()
+
+    def call(self, func_name: str, arg: str) -> str:
+        start = time.perf_counter()
+        result = error = None
+        try:
+            result = self.transport.call(func_name, arg)
+            return result
+        except RuntimeError as e:
+            error = _plain_error(e.args[0] if e.args else e)
+            raise
+        except Exception as e:
+            # Not an error of the helper, e.g. of the transport itself. Replayed as a `RuntimeError`.
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            end = time.perf_counter()
+            entry = {'func': func_name, 'arg': arg, 'result': result, 'error': error,
+                     'start': start - self._started, 'seconds': end - start}
+            with self._lock:
+                self.entries.append(entry)
+                if self._file is not None:
+                    self._write(entry)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.transport.close()
+
+
+def _request_key(func_name: str, arg: str) -> Tuple[str, str]:
+    # Releases piggybacked on a request depend on the garbage collector, the
+    # timing flag on the instrumentation.
+    try:
+        message = json.loads(arg)
+    except ValueError:
+        return func_name, arg
+    if isinstance(message, dict):
+        message.pop('release', None)
+        message.pop('timing', None)
+    return func_name, json.dumps(message, sort_keys=True)
+
+
+class ReplayTransport(Transport):
+    """Serves the responses of a recorded session, e.g. to replay a production workload on CI.
+
+    A request gets the response recorded for the same request (releases of
+    objects riding along set aside), in recording order for repeated
+    requests. The call is delayed by the time it took when recorded times
+    `latency_scale`, or by `latency` seconds if given.
+
+        >>> helper = HelperScript(ReplayTransport.from_path('session.jsonl', latency_scale=0))
+        >>> run_workload(helper)
+        >>> helper.transport.summary()
+
+    Args:
+        entries (Iterable[dict]): The calls of the session, as recorded by `RecordingTransport`.
+        latency_scale (float, optional): The factor applied to the recorded durations. 0 disables the delays.
+        latency (float, optional): Seconds every call is delayed by instead of the recorded durations.
+        strict (bool, optional): Raise `ReplayError` for a request that wasn't recorded. Otherwise the next
+            unused response of the same function is served and counted in `mismatches`.
+    """
+
+    def __init__(self, entries: Iterable[dict], latency_scale: float = 1.0, latency: Optional[float] = None,
+                 strict: bool = True):
+        self.entries = list(entries)
+        self.latency_scale = latency_scale
+        self.latency = latency
+        self.strict = strict
+        self._by_request = {} # type: Dict[Tuple[str, str], deque]
+        self._by_func = {} # type: Dict[str, deque]
+        for entry in self.entries:
+            self._by_request.setdefault(_request_key(entry['func'], entry['arg']), deque()).append(entry)
+            self._by_func.setdefault(entry['func'], deque()).append(entry)
+        self._used = set() # type: set[int]
+        self._lock = threading.Lock()
+        self.call_count = 0
+        self.mismatches = 0
+        self.remote_seconds = 0.0
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> ReplayTransport:
+        with open(path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get('format') != SESSION_FORMAT:
+            raise ValueError(f'{path} is not a recorded pydt3 session')
+        return cls(lines[1:], **kwargs)
+
+    def _take(self, queue: Optional[deque]) -> Optional[dict]:
+        while queue:
+            entry = queue.popleft()
+            if id(entry) not in self._used:
+                self._used.add(id(entry))
+                return entry
+        return None
+
+    def _find(self, func_name: str, arg: str) -> dict:
+        entry = self._take(self._by_request.get(_request_key(func_name, arg)))
+        if entry is not None:
+            return entry
+        if func_name in _RELEASE_FUNCTIONS:
+            for entry in self.entries:
+                if entry['func'] == func_name and entry['error'] is None:
+                    return entry
+        if not self.strict:
+            entry = self._take(self._by_func.get(func_name))
+            if entry is not None:
+                self.mismatches += 1
+                return entry
+        raise ReplayError(f'No recorded response to {func_name}({arg[:200]})')
+
+    def call(self, func_name: str, arg: str) -> str:
+        with self._lock:
+            self.call_count += 1
+            entry = self._find(func_name, arg)
+        delay = entry['seconds'] * self.latency_scale if self.latency is None else self.latency
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.remote_seconds += delay
+        if entry['error'] is not None:
+            raise RuntimeError(entry['error'])
+        return entry['result']
+
+    def summary(self) -> dict:
+        """The calls made compared to the recorded ones."""
+        with self._lock:
+            return {
+                'recorded_calls': len(self.entries),
+                'replayed_calls': self.call_count,
+                'unused_calls': len(self.entries) - len(self._used),
+                'mismatches': self.mismatches,
+                'recorded_remote_seconds': sum(entry['seconds'] for entry in self.entries),
+                'replayed_remote_seconds': self.remote_seconds,
+            }
@@ -0,0 +1,66 @@
+"""The simulated DEVONthink the tests run against when the app isn't there."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+from pydt3 import DEVONthink3
+from pydt3.helper_bridging import HelperScript
+from pydt3.simulator import SimulatedTransport, SimulatedDEVONthink
+
+
+def make_helper(n_records: int = 10, latency: float = 0.0, codec_versions=(2, 1)):
+    dt = SimulatedDEVONthink()
+    db = dt.add_database('test-db')
+    for i in range(n_records):
+        db.add_record(name=f'record-{i}', plainText=f'text of record {i}', tags=['sim', str(i % 3)])
+    transport = SimulatedTransport([dt], latency=latency, codec_versions=codec_versions)
+    return HelperScript(transport), transport, dt
+
+
+def make_farm_helper(n_records: int = 30):
+    # Every worker builds the same database, so the UUIDs agree.
+    dt = SimulatedDEVONthink()
+    db = dt.add_database('farm-db')
+    for i in range(n_records):
+        db.add_record(name=f'record-{i}', uuid=f'UUID-{i}', plainText=f'text {i}', tags=[str(i % 2)])
+    return HelperScript(SimulatedTransport([dt]))
+
+
+def make_partly_failing_farm_helper():
+    helper = make_farm_helper()
+    # Reading the comment of this record fails.
+    del helper.transport.helper.applications['DEVONthink 3'].databases[0].records_by_uuid['UUID-3'].properties['comment']
+    return helper
+
+
+def make_failing_farm_helper():
+    helper = make_farm_helper()
+    helper.transport.helper.functions.pop('executeBatch')
+    return helper
+
+
+class SimulatedTestCase(unittest.TestCase):
+    """Runs every test against a new simulated DEVONthink.
+
+    The helper made by `make_helper` with `n_records` and `latency` is set
+    up as `self.helper`, with `self.transport`, the simulated app `self.sim`,
+    its proxy `self.app` and the helper's object pool `self.pool`. Tests
+    making their own helpers set `n_records` to None.
+    """
+    n_records = 10 # type: int | None
+    latency = 0.0
+
+    def setUp(self) -> None:
+        # Keep the class hierarchies learned by the tests out of the user's cache.
+        directory = tempfile.mkdtemp(prefix='pydt3-test-cache-')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        environ = mock.patch.dict(os.environ, {'PYDT3_CACHE_DIR': directory})
+        environ.start()
+        self.addCleanup(environ.stop)
+        if self.n_records is not None:
+            self.helper, self.transport, self.sim = make_helper(n_records=self.n_records, latency=self.latency)
+            self.app = DEVONthink3.from_script(self.helper)
+            self.pool = self.transport.helper.object_pool_manager
@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+
+from pydt3.helper_bridging import HelperScript
+from pydt3.aio import AsyncDEVONthink3, AsyncMail, AsyncProxy, AsyncArray
+from pydt3.apps.mail import Mail
+from pydt3.apps.devonthink.record import Record
+from pydt3.simulator import SimulatedTransport, SimulatedApplication
+
+from simulated import SimulatedTestCase, make_helper
+
+
+class TestAsync(SimulatedTestCase):
+    n_records = 12
+
+    def tearDown(self) -> None:
+        if self.helper.dispatcher is not None:
+            self.helper.dispatcher.close()
+
+    def test_properties_and_commands(self):
+        async def main():
+            dt3 = await AsyncDEVONthink3.open(self.helper)
+            self.assertEqual(await dt3.name, 'DEVONthink 3')
+            databases = await dt3.databases
+            self.assertIsInstance(databases, AsyncArray)
+            db = await databases.at(0)
+            self.assertEqual(await db.name, 'test-db')
+            record = await dt3.create_record_with({'name': 'new', 'type': 'markdown', 'plain text': 'hi'})
+            self.assertIsInstance(record, AsyncProxy)
+            self.assertIsInstance(record.sync, Record)
+            await record.set('comment', 'async')
+            self.assertEqual(await record.comment, 'async')
+            found = await dt3.search('name==new')
+            self.assertEqual([await r.uuid for r in found], [await record.uuid])
+            contents = await db.contents
+            self.assertEqual([await r.name async for r in contents][:2], ['record-0', 'record-1'])
+            self.assertEqual(len(await contents.pluck('name')), 13)
+        asyncio.run(main())
+
+    def test_overlapping_helpers(self):
+        other, transport, _ = make_helper(n_records=3, latency=0.05)
+        self.transport.latency = 0.05
+
+        async def main():
+            dt3 = await AsyncDEVONthink3.open(self.helper)
+            other_dt3 = await AsyncDEVONthink3.open(other)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            names = await asyncio.gather(dt3.name, other_dt3.name)
+            return names, loop.time() - start
+
+        try:
+            names, elapsed = asyncio.run(main())
+        finally:
+            other.dispatcher.close()
+        self.assertEqual(names, ['DEVONthink 3', 'DEVONthink 3'])
+        self.assertLess(elapsed, 0.095)
+
+    def test_mail(self):
+        transport = SimulatedTransport([SimulatedApplication('Mail', version='16.0')])
+        helper = HelperScript(transport)
+
+        async def main():
+            mail = await AsyncMail.open(helper)
+            self.assertIsInstance(mail.sync, Mail)
+            return await mail.name
+        try:
+            self.assertEqual(asyncio.run(main()), 'Mail')
+        finally:
+            helper.dispatcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import datetime
+import unittest
+
+from pydt3.apps.devonthink.database import Database
+from pydt3.apps.devonthink.record import Record
+
+from simulated import SimulatedTestCase
+
+
+class TestPluck(SimulatedTestCase):
+    n_records = 25
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.contents = self.app.databases[0].contents
+
+    def test_single_column(self):
+        calls = self.transport.call_count
+        names = self.contents.pluck('name')
+        self.assertEqual(self.transport.call_count, calls + 1)
+        self.assertEqual(names, [f'record-{i}' for i in range(25)])
+
+    def test_columns(self):
+        columns = self.contents.pluck('name', 'uuid', 'modificationDate', 'database')
+        self.assertEqual(set(columns), {'name', 'uuid', 'modificationDate', 'database'})
+        self.assertEqual(columns['uuid'][2], self.contents[2].uuid)
+        self.assertTrue(all(isinstance(d, datetime.datetime) for d in columns['modificationDate']))
+        self.assertTrue(all(isinstance(db, Database) for db in columns['database']))
+
+    def test_chunks(self):
+        calls = self.transport.call_count
+        columns = self.contents.pluck('name', 'tags', chunk_size=10)
+        self.assertEqual(self.transport.call_count, calls + 3)
+        self.assertEqual(columns['name'], [f'record-{i}' for i in range(25)])
+        self.assertEqual(len(columns['tags']), 25)
+
+    def test_invalid_chunk_size(self):
+        for chunk_size in [0, -1]:
+            with self.assertRaises(ValueError):
+                self.contents.pluck('name', chunk_size=chunk_size)
+        self.contents.pluck_chunk_size = 0
+        with self.assertRaises(ValueError):
+            self.contents.pluck('name')
+
+
+class TestChunkedIteration(SimulatedTestCase):
+    n_records = 25
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.contents = self.app.databases[0].contents
+
+    def test_iter(self):
+        self.contents.chunk_size = 10
+        calls = self.transport.call_count
+        records = [record for record in self.contents]
+        self.assertEqual(self.transport.call_count, calls + 3)
+        self.assertEqual([record.name for record in records], [f'record-{i}' for i in range(25)])
+
+    def test_iter_chunks(self):
+        chunks = list(self.contents.iter_chunks(10))
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+        self.assertTrue(all(isinstance(r, Record) for c in chunks for r in c))
+
+    def test_invalid_chunk_size(self):
+        for size in [0, -1]:
+            with self.assertRaises(ValueError):
+                self.contents.iter_chunks(size)
+        self.contents.chunk_size = 0
+        with self.assertRaises(ValueError):
+            list(self.contents)
+
+    def test_empty(self):
+        self.assertEqual(list(self.app.databases[0].smart_groups), [])
+
+    def test_slices(self):
+        names = self.contents.pluck('name')
+        for s in [slice(2, 5), slice(None, 3), slice(-3, None), slice(20, 100), slice(5, 2),
+                  slice(None, None, 4), slice(None, None, -3), slice(-2, 3, -5)]:
+            self.assertEqual([r.name for r in self.contents[s]], names[s], s)
+
+
+if __name__ == '__main__':
+    unittest.main()
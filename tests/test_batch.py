@@ -0,0 +1,44 @@
+import unittest
+
+from pydt3.apps.devonthink.database import Database
+
+from simulated import SimulatedTestCase
+
+
+class TestBatch(SimulatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.records = list(self.app.databases[0].contents)
+
+    def test_one_event(self):
+        calls = self.transport.call_count
+        with self.helper.batch() as b:
+            names = [b.call_method(record, 'name') for record in self.records]
+            uuids = [b.call_method(record, 'uuid') for record in self.records]
+        self.assertEqual(self.transport.call_count, calls + 1)
+        self.assertEqual([f.result() for f in names], [r.name for r in self.records])
+        self.assertEqual([f.result() for f in uuids], [r.uuid for r in self.records])
+
+    def test_references(self):
+        with self.helper.batch() as b:
+            db = b.get_property(self.records[0], 'database')
+        self.assertIsInstance(db.result(), Database)
+
+    def test_per_operation_error(self):
+        with self.helper.batch() as b:
+            ok = b.call_method(self.records[0], 'name')
+            failed = b.call_method(self.records[0], 'noSuchMethod')
+        self.assertEqual(ok.result(), 'record-0')
+        self.assertIsInstance(failed.exception(), RuntimeError)
+        with self.assertRaises(RuntimeError):
+            failed.result()
+
+    def test_result_executes_batch(self):
+        b = self.helper.batch()
+        name = b.call_method(self.records[1], 'name')
+        self.assertEqual(name.result(), 'record-1')
+        self.assertEqual(len(b), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import gc
+import os
+import unittest
+
+from simulated import SimulatedTestCase
+
+
+class TestBinaryHandle(SimulatedTestCase):
+    n_records = 2
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.payload = b'%PDF-1.4' + bytes(range(256)) * 1000
+        self.sim.databases[0].contents[0].properties.update(data=self.payload, thumbnail=None)
+        self.record = self.app.databases[0].contents[0]
+
+    def test_read(self):
+        with self.record.open_data() as data:
+            self.assertEqual(len(data), len(self.payload))
+            self.assertEqual(data.read(), self.payload)
+            with data.open() as f:
+                self.assertEqual(f.read(8), b'%PDF-1.4')
+            view = data.memoryview()
+            self.assertEqual(bytes(view[:8]), b'%PDF-1.4')
+            self.assertTrue(view.readonly)
+            path = data.path
+        self.assertTrue(data.closed)
+        self.assertFalse(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            data.read()
+
+    def test_private_file(self):
+        with self.record.open_data() as data:
+            self.assertEqual(os.stat(data.path).st_mode & 0o777, 0o600)
+
+    def test_cleanup_on_collect(self):
+        data = self.record.open_data()
+        path = data.path
+        self.assertTrue(os.path.exists(path))
+        del data
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_missing_value(self):
+        self.assertIsNone(self.record.open_thumbnail())
+
+    def test_not_binary(self):
+        with self.assertRaises(RuntimeError):
+            self.app.databases[0]._open_binary('encrypted')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import datetime
+import json
+import unittest
+
+from pydt3 import DEVONthink3
+from pydt3.apps.devonthink.database import Database
+from pydt3.apps.devonthink.record import Record
+from pydt3.apps.devonthink.smartgroup import SmartGroup
+from pydt3.transport import RecordingTransport
+
+from simulated import SimulatedTestCase, make_helper
+
+
+class TestCodec(SimulatedTestCase):
+    n_records = None
+
+    def make(self, codec_versions=(2, 1)):
+        helper, transport, sim = make_helper(codec_versions=codec_versions)
+        return helper, DEVONthink3.from_script(helper)
+
+    def test_negotiated(self):
+        helper, app = self.make()
+        self.assertEqual(helper.codec.version, 2)
+        self.assertEqual(app.databases[0].contents[1].name, 'record-1')
+
+    def test_fallback(self):
+        helper, app = self.make(codec_versions=(1,))
+        self.assertEqual(helper.codec.version, 1)
+        self.assertEqual(app.databases[0].contents[1].name, 'record-1')
+
+    def test_negotiation_error(self):
+        helper, transport, sim = make_helper()
+        negotiate = transport.helper.functions['negotiateCodec']
+        transport.helper.functions['negotiateCodec'] = lambda params: params['missing']
+        with self.assertRaises(RuntimeError):
+            helper.codec
+        transport.helper.functions['negotiateCodec'] = negotiate
+        self.assertEqual(helper.codec.version, 2)
+
+    def test_round_trip(self):
+        now = datetime.datetime.now().replace(microsecond=0)
+        for versions in [(2, 1), (1,)]:
+            helper, app = self.make(codec_versions=versions)
+            db = app.databases[0]
+            value = {'a': [1, 2.5, None, True], '$type': 'x', '$$b': {'$r': 1}, 'd': now, 'db': db, 's': 'text'}
+            echoed = helper.echo(value)
+            self.assertEqual(echoed['db'].obj_id, db.obj_id)
+            self.assertIsInstance(echoed['db'], Database)
+            del echoed['db'], value['db']
+            self.assertEqual(echoed, value)
+
+    def test_non_str_keys(self):
+        for versions in [(2, 1), (1,)]:
+            helper, app = self.make(codec_versions=versions)
+            self.assertEqual(helper.echo({1: 2, '$a': {2.5: 'x'}}), {'1': 2, '$a': {'2.5': 'x'}})
+
+    def test_keys_as_json(self):
+        value = {True: 1, False: 2, None: 3, 10: 4, 1.5: 5, 1e20: 6, float('inf'): 7, float('nan'): 8}
+        echoed = [self.make(codec_versions=versions)[0].echo(value) for versions in [(2, 1), (1,)]]
+        self.assertEqual(echoed[0], echoed[1])
+        self.assertEqual(list(echoed[0]), list(json.loads(json.dumps(value))))
+        helper, app = self.make()
+        with self.assertRaises(TypeError):
+            helper.echo({(1, 2): 'x'})
+
+    def test_plain_payload(self):
+        helper, app = self.make()
+        names = app.databases[0].contents.pluck('name')
+        message = helper.codec.encode(helper, {'names': names}, {})
+        self.assertNotIn('"x"', message)
+        self.assertEqual(helper.codec.decode(helper, message.replace('"v": 2, ', '')), {'names': names})
+
+
+class TestHomogeneousArrays(SimulatedTestCase):
+    n_records = None
+
+    def make(self, codec_versions=(2, 1)):
+        helper, transport, sim = make_helper(n_records=20, codec_versions=codec_versions)
+        for i in range(3):
+            sim.add_database(f'extra-{i}')
+        recording = RecordingTransport(transport)
+        helper.transport = recording
+        return helper, DEVONthink3.from_script(helper), transport.helper.json_translator, recording
+
+    def last_result(self, recording, func_name):
+        return [entry for entry in recording.entries if entry['func'] == func_name][-1]['result']
+
+    def test_leaf_class_lists(self):
+        for versions in [(2, 1), (1,)]:
+            helper, app, translator, recording = self.make(versions)
+            databases = list(app.databases)
+            lookups = translator.class_lookups
+            echoed = helper.echo(databases)
+            self.assertEqual(translator.class_lookups, lookups + 1)
+            self.assertTrue(all(type(db) is Database for db in echoed))
+            self.assertEqual([db.name for db in echoed], ['test-db', 'extra-0', 'extra-1', 'extra-2'])
+            if versions == (2, 1):
+                self.assertIn('"$R"', self.last_result(recording, 'echo'))
+
+    def test_search_results(self):
+        # Records share the specifier class `record` whatever their own class.
+        helper, app, translator, recording = self.make()
+        lookups = translator.class_lookups
+        records = app.search('tags:sim')
+        self.assertEqual(translator.class_lookups, lookups + 20)
+        self.assertEqual(len(records), 20)
+        self.assertTrue(all(type(r) is Record for r in records))
+        self.assertNotIn('"$R"', self.last_result(recording, 'callMethod'))
+
+    def test_specifier_class_differs(self):
+        helper, transport, sim = make_helper(n_records=3)
+        sim.databases[0].add_record(name='smart', type='smart group', tags=['sim'])
+        app = DEVONthink3.from_script(helper)
+        records = app.search('tags:sim')
+        self.assertEqual([type(r) for r in records], [Record, Record, Record, SmartGroup])
+
+    def test_same_as_per_element(self):
+        helper, app, translator, _ = self.make()
+        databases = list(app.databases)
+        fast = [(db.name, db.class_name, type(db)) for db in helper.echo(databases)]
+        translator.homogeneous_arrays = False
+        lookups = translator.class_lookups
+        slow = [(db.name, db.class_name, type(db)) for db in helper.echo(databases)]
+        self.assertEqual(translator.class_lookups, lookups + 4)
+        self.assertEqual(fast, slow)
+
+    def test_mixed_arrays(self):
+        helper, app, translator, _ = self.make()
+        db = app.databases[0]
+        record = db.contents[0]
+        echoed = helper.echo([db, record, record])
+        self.assertEqual([type(v) for v in echoed], [Database, Record, Record])
+        self.assertEqual([r.obj_id for r in helper.echo([record])], [record.obj_id])
+
+    def test_elements_looked_up_one_by_one(self):
+        helper, app, translator, _ = self.make()
+        contents = app.databases[0].contents
+        lookups = translator.class_lookups
+        self.assertEqual(len(contents[:5]), 5)
+        self.assertEqual(translator.class_lookups, lookups + 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
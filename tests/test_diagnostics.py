@@ -0,0 +1,67 @@
+import unittest
+import warnings
+
+import pydt3
+from pydt3 import diagnostics
+
+from simulated import SimulatedTestCase
+
+
+class TestNPlusOneDetector(SimulatedTestCase):
+    n_records = 12
+
+    def test_sibling_reads(self):
+        records = self.app.databases[0].contents
+        with pydt3.detect_n_plus_one(threshold=5) as detector:
+            names = [record.name for record in records]
+        self.assertEqual(len(names), 12)
+        self.assertEqual(len(detector.findings), 1)
+        finding = detector.findings[0]
+        self.assertEqual(finding.name, 'name')
+        self.assertEqual(finding.filename, __file__)
+        self.assertIn('record.name for record in records', finding.code)
+        self.assertIn("pluck('name')", str(finding))
+
+    def test_below_threshold_and_same_object(self):
+        records = self.app.databases[0].contents
+        record = records[0]
+        with pydt3.detect_n_plus_one(threshold=5) as detector:
+            names = [record.name for record in records[:4]]
+            for _ in range(10):
+                self.helper.get_property(record, 'name')
+        self.assertEqual(len(names), 4)
+        self.assertEqual(detector.findings, [])
+
+    def test_indexing_loop(self):
+        records = self.app.databases[0].contents
+        with pydt3.detect_n_plus_one(threshold=5) as detector:
+            for i in range(6):
+                records[i]
+        self.assertEqual([finding.kind for finding in detector.findings], ['element'])
+
+    def test_fail(self):
+        records = self.app.databases[0].contents
+        with self.assertRaises(diagnostics.NPlusOneError) as cm:
+            with pydt3.detect_n_plus_one(threshold=3, fail=True):
+                [record.uuid for record in records]
+        self.assertEqual(len(cm.exception.findings), 1)
+
+    def test_warn(self):
+        records = self.app.databases[0].contents
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            with pydt3.detect_n_plus_one(threshold=3, warn=True):
+                [record.name for record in records]
+        self.assertEqual([w.category for w in caught], [diagnostics.NPlusOneWarning])
+        self.assertEqual(caught[0].filename, __file__)
+
+    def test_db_by_name_uses_bulk_read(self):
+        self.sim.add_database('other-db')
+        with pydt3.detect_n_plus_one(threshold=2, fail=True):
+            db = self.app.ext.db_by_name('other-db')
+        self.assertEqual(db.name, 'other-db')
+        self.assertIsNone(self.app.ext.db_by_name('missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import threading
+import unittest
+
+from pydt3.dispatcher import Dispatcher
+
+from simulated import SimulatedTestCase
+
+
+class TestDispatcher(SimulatedTestCase):
+    n_records = 20
+    latency = 0.001
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.dispatcher = Dispatcher(self.helper)
+
+    def tearDown(self) -> None:
+        self.dispatcher.close()
+
+    def test_calls_from_threads(self):
+        contents = self.app.databases[0].contents
+        results = {}
+
+        def work(i):
+            results[i] = contents[i].name
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {i: f'record-{i}' for i in range(20)})
+        self.assertEqual(self.dispatcher.stats()['normal']['completed'], self.transport.call_count - 2)
+
+    def test_scopes_per_thread(self):
+        contents = self.app.databases[0].contents
+        entered, fetched = threading.Event(), threading.Event()
+        scoped = []
+
+        def work():
+            with self.helper.scope():
+                scoped.append(contents[1])
+                entered.set()
+                fetched.wait()
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        entered.wait()
+        # Made while the other thread is in its scope.
+        record = contents[0]
+        other = contents[1]
+        fetched.set()
+        thread.join()
+        self.assertIsNone(record._scope_id)
+        self.assertIsNone(other._scope_id)
+        self.assertIsNotNone(scoped[0]._scope_id)
+        self.assertEqual(record.name, 'record-0')
+        self.assertEqual(other.name, 'record-1')
+        with self.helper.scope() as scope_id:
+            self.assertEqual(self.dispatcher.submit(lambda: contents[2]).result()._scope_id, scope_id)
+
+    def test_submit(self):
+        future = self.dispatcher.submit(lambda: self.app.databases[0].contents.pluck('name'))
+        self.assertEqual(future.result(), [f'record-{i}' for i in range(20)])
+        with self.assertRaises(KeyError):
+            self.dispatcher.submit(lambda: {}['missing']).result()
+
+    def test_priority(self):
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def block():
+            started.set()
+            release.wait()
+
+        self.dispatcher.submit(block)
+        started.wait()
+        bulk = [self.dispatcher.submit(order.append, 'bulk', priority=Dispatcher.BULK) for _ in range(3)]
+        interactive = self.dispatcher.submit(order.append, 'interactive', priority=Dispatcher.INTERACTIVE)
+        self.assertEqual(self.dispatcher.depth, 4)
+        release.set()
+        interactive.result()
+        for future in bulk:
+            future.result()
+        self.assertEqual(order, ['interactive', 'bulk', 'bulk', 'bulk'])
+        stats = self.dispatcher.stats()
+        self.assertEqual(stats['bulk']['completed'], 3)
+        self.assertGreater(stats['bulk']['max_wait_seconds'], 0)
+        self.assertEqual(stats['interactive']['depth'], 0)
+
+    def test_close(self):
+        self.dispatcher.close()
+        self.assertIsNone(self.helper.dispatcher)
+        self.assertEqual(self.app.name, 'DEVONthink 3')
+        with self.assertRaises(RuntimeError):
+            self.dispatcher.submit(print)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from pydt3.farm import ReadFarm, ReadFarmError
+
+from simulated import SimulatedTestCase, make_farm_helper, make_partly_failing_farm_helper, make_failing_farm_helper
+
+
+class TestReadFarm(SimulatedTestCase):
+    n_records = None
+
+    def test_read(self):
+        uuids = [f'UUID-{i}' for i in reversed(range(30))] + ['missing']
+        with ReadFarm(workers=2, helper_factory=make_farm_helper, shard_size=7) as farm:
+            rows = farm.read(uuids, ['name', 'tags', 'plainText', 'database'])
+            self.assertEqual(farm.stats()['shards'], 5)
+        self.assertEqual(list(rows), uuids)
+        self.assertEqual(rows['UUID-3'], {'name': 'record-3', 'tags': ['1'], 'plainText': 'text 3', 'database': None})
+        self.assertIsNone(rows['missing'])
+
+    def test_record_failure(self):
+        uuids = [f'UUID-{i}' for i in range(10)]
+        with ReadFarm(workers=1, helper_factory=make_partly_failing_farm_helper, shard_size=5) as farm:
+            rows = farm.read(uuids, ['name', 'comment'])
+            self.assertEqual(farm.stats()['retries'], 0)
+        self.assertEqual(list(rows), uuids)
+        self.assertIsInstance(rows['UUID-3'], RuntimeError)
+        self.assertEqual(rows['UUID-4'], {'name': 'record-4', 'comment': ''})
+
+    def test_failure(self):
+        with ReadFarm(workers=1, helper_factory=make_failing_farm_helper, shard_size=10, retries=1) as farm:
+            with self.assertRaises(ReadFarmError) as cm:
+                farm.read([f'UUID-{i}' for i in range(15)], ['name'])
+            self.assertEqual(farm.stats()['retries'], 2)
+        self.assertEqual(len(cm.exception.failed_uuids), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
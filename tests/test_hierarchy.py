@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from pydt3.hierarchy import ClassHierarchyCache
+from pydt3.apps.devonthink.record import Record
+from pydt3.apps.devonthink.smartgroup import SmartGroup
+
+from simulated import SimulatedTestCase, make_helper
+
+
+class TestClassHierarchyCache(SimulatedTestCase):
+    n_records = None
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def make(self, version='3.9'):
+        helper, transport, sim = make_helper(n_records=0)
+        sim.properties['version'] = version
+        sim.class_hierarchy = {**sim.class_hierarchy, 'annotationGroup': 'smartGroup', 'feedGroup': 'annotationGroup'}
+        helper.class_hierarchy = ClassHierarchyCache(helper, self.directory)
+        helper.echo(None)
+        return helper, transport
+
+    def test_builtin(self):
+        helper, transport = self.make()
+        calls = transport.call_count
+        self.assertIs(helper.determine_class('DEVONthink 3', 'tagGroup'), Record)
+        self.assertEqual(transport.call_count, calls)
+
+    def test_persisted(self):
+        helper, transport = self.make()
+        self.assertIs(helper.determine_class('DEVONthink 3', 'feedGroup'), SmartGroup)
+        self.assertTrue(os.path.exists(helper.class_hierarchy.path('DEVONthink 3')))
+
+        helper, transport = self.make()
+        calls = transport.call_count
+        self.assertIs(helper.determine_class('DEVONthink 3', 'feedGroup'), SmartGroup)
+        # Only the version is asked for
+        self.assertEqual(transport.call_count, calls + 1)
+
+    def test_per_version(self):
+        helper, transport = self.make()
+        helper.determine_class('DEVONthink 3', 'feedGroup')
+        helper, transport = self.make(version='3.9.1')
+        calls = transport.call_count
+        self.assertIs(helper.determine_class('DEVONthink 3', 'feedGroup'), SmartGroup)
+        self.assertEqual(transport.call_count, calls + 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import unittest
+
+import pydt3
+from pydt3 import instrumentation
+from pydt3.transport import RecordingTransport
+
+from simulated import SimulatedTestCase
+
+
+class TestInstrumentation(SimulatedTestCase):
+    n_records = 5
+    latency = 0.002
+
+    def setUp(self):
+        super().setUp()
+        self.records = self.app.databases[0].contents
+
+    def test_counts_and_sizes(self):
+        with instrumentation.profile(file=io.StringIO()) as recorder:
+            names = [record.name for record in self.records]
+        calls = recorder.snapshot()['calls']
+        self.assertEqual(calls['callMethod name']['count'], len(names))
+        stats = calls['callMethod name']
+        self.assertGreater(stats['request_bytes'], 0)
+        self.assertGreater(stats['response_bytes'], 0)
+        self.assertGreaterEqual(stats['remote_seconds'], 0.002 * len(names))
+        self.assertLess(stats['encode_seconds'] + stats['decode_seconds'], stats['remote_seconds'])
+
+    def test_sizes_in_bytes(self):
+        self.sim.databases[0].contents[0].properties['name'] = '\u6587' * 100
+        recording = self.helper.transport = RecordingTransport(self.transport)
+        with instrumentation.profile(file=io.StringIO()) as recorder:
+            self.assertEqual(self.records[0].name, '\u6587' * 100)
+        result = recording.entries[-1]['result']
+        self.assertEqual(recorder.snapshot()['calls']['callMethod name']['response_bytes'], len(result.encode('utf-8')))
+        self.assertGreater(len(result.encode('utf-8')), len(result))
+
+    def test_global_stats(self):
+        before = pydt3.stats()['calls'].get('callMethod name', {}).get('count', 0)
+        self.records[0].name
+        self.assertEqual(pydt3.stats()['calls']['callMethod name']['count'], before + 1)
+
+    def test_report(self):
+        out = io.StringIO()
+        with pydt3.profile(file=out, top=5):
+            for record in self.records:
+                record.name
+                record.plain_text
+        report = out.getvalue()
+        self.assertIn('callMethod name', report)
+        self.assertIn('callMethod plainText', report)
+        self.assertIn('slowest calls:', report)
+
+    def test_errors_and_slowest(self):
+        with instrumentation.profile(file=io.StringIO()) as recorder:
+            with self.assertRaises(Exception):
+                self.helper.call_method(self.records[0], 'noSuchMethod', [])
+            self.records[0].name
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot['calls']['callMethod noSuchMethod']['errors'], 1)
+        self.assertEqual(snapshot['totals']['errors'], 1)
+        seconds = [entry['seconds'] for entry in snapshot['slowest']]
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+
+    def test_helper_timings(self):
+        self.transport.latency = 0.0
+        recording = RecordingTransport(self.transport)
+        self.helper.transport = recording
+        self.records[0].name
+        self.assertNotIn('timing', recording.entries[-1]['arg'])
+        self.assertNotIn('"t"', recording.entries[-1]['result'])
+        out = io.StringIO()
+        with instrumentation.profile(file=out) as recorder:
+            names = [record.name for record in self.records]
+        self.assertIn('"timing": 1', recording.entries[-1]['arg'])
+        helper = recorder.snapshot()['calls']['callMethod name']['helper']
+        self.assertEqual(helper['timed_calls'], len(names))
+        self.assertGreater(helper['app_seconds'], 0)
+        self.assertGreaterEqual(helper['bridge_seconds'], 0)
+        self.assertIn('helper phases (ms)', out.getvalue())
+        self.assertEqual(set(recorder.snapshot()['slowest'][0]['helper']), set(instrumentation.HELPER_PHASES))
+
+    def test_disabled(self):
+        instrumentation.enabled = False
+        try:
+            with instrumentation.profile(file=io.StringIO()) as recorder:
+                self.records[0].name
+        finally:
+            instrumentation.enabled = True
+        self.assertEqual(recorder.snapshot()['totals']['count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from pydt3.helper_bridging import HelperScript
+from pydt3.apps.devonthink.record import Record
+
+from simulated import SimulatedTestCase, make_helper
+
+
+class TestLazyImport(SimulatedTestCase):
+    n_records = None
+
+    def run_python(self, source: str) -> str:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.run([sys.executable, '-c', source], cwd=root, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def test_import_is_lazy(self):
+        output = self.run_python(
+            'import sys, pydt3, pydt3.helper_bridging;'
+            'print("pydt3.apps.devonthink" in sys.modules, "Foundation" in sys.modules)')
+        self.assertEqual(output, 'False False')
+
+    def test_class_map_loaded_on_first_use(self):
+        output = self.run_python(
+            'from pydt3.helper_bridging import HelperScript;'
+            'from pydt3.simulator import SimulatedTransport;'
+            'helper = HelperScript(SimulatedTransport());'
+            'print(type(helper.get_application("DEVONthink 3")).__name__)')
+        self.assertEqual(output, 'DEVONthink3')
+
+    def test_default_is_cached(self):
+        self.assertIs(HelperScript.default, HelperScript.default)
+
+    def register_module(self, app_name: str, source: str):
+        directory = tempfile.mkdtemp()
+        module = 'lazy_classes_' + os.path.basename(directory)
+        with open(os.path.join(directory, module + '.py'), 'w') as f:
+            f.write(source)
+        sys.path.insert(0, directory)
+        self.addCleanup(sys.path.remove, directory)
+        self.addCleanup(sys.modules.pop, module, None)
+        self.addCleanup(HelperScript._class_map.pop, app_name, None)
+        self.addCleanup(HelperScript._lazy_class_maps.pop, app_name, None)
+        HelperScript.register_lazy_class_map(app_name, module)
+        return module
+
+    def test_concurrent_first_use(self):
+        self.register_module('Slow', (
+            'import time\n'
+            'from pydt3.helper_bridging import HelperScript\n'
+            'from pydt3.apps.devonthink.record import Record\n'
+            'time.sleep(0.2)\n'
+            'HelperScript.register_class_map("Slow", {"thing": Record})\n'))
+        helpers = [make_helper(n_records=0)[0] for _ in range(4)]
+        classes = []
+        threads = [threading.Thread(target=lambda h=h: classes.append(h.determine_class('Slow', 'thing')))
+                   for h in helpers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(classes, [Record] * 4)
+
+    def test_failed_import_retried(self):
+        module = self.register_module('Broken', 'raise ImportError("broken")\n')
+        helper = make_helper(n_records=0)[0]
+        for _ in range(2):
+            with self.assertRaises(ImportError):
+                helper.determine_class('Broken', 'thing')
+        self.assertEqual(HelperScript._lazy_class_maps['Broken'], module)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import gc
+import unittest
+
+from pydt3 import DEVONthink3
+
+from simulated import SimulatedTestCase, make_helper
+
+
+class TestPoolLimit(SimulatedTestCase):
+    n_records = 50
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.records = list(self.app.databases[0].contents)
+        self.helper.set_pool_limit(10)
+
+    def test_bounded(self):
+        self.assertLessEqual(len(self.pool), 10 + 2)
+        stats = self.helper.pool_stats()
+        self.assertGreater(stats['evictions'], 0)
+        self.assertEqual(stats['limit'], 10)
+        self.assertEqual(self.helper.evictions, stats['evictions'])
+        self.assertEqual(stats['evicted_references'], len(self.helper._evicted))
+
+    def test_stats_after_eviction(self):
+        helper, transport, _ = make_helper(n_records=20)
+        records = list(DEVONthink3.from_script(helper).databases[0].contents)
+        stats = helper.set_pool_limit(5)
+        self.assertLessEqual(stats['size'], 5)
+        self.assertEqual(stats['evictions'], helper.evictions)
+        self.assertEqual(stats['evicted_references'], len(helper._evicted))
+        self.assertEqual(len(records), 20)
+
+    def test_rehydration(self):
+        self.assertEqual([record.name for record in self.records], [f'record-{i}' for i in range(50)])
+        self.assertGreater(self.helper.rehydrations, 0)
+        self.assertEqual(self.helper.rehydrations, self.pool.rehydrations)
+        self.assertLessEqual(len(self.pool), 10 + 2)
+        # Rehydrated under the same id.
+        obj_id = self.records[-1].obj_id
+        self.assertEqual(self.records[-1].name, 'record-49')
+        self.assertEqual(self.records[-1].obj_id, obj_id)
+
+    def test_compact_and_tagged(self):
+        helper, transport, _ = make_helper(n_records=20, codec_versions=(1,))
+        records = list(DEVONthink3.from_script(helper).databases[0].contents)
+        helper.set_pool_limit(5)
+        self.assertEqual([record.name for record in records], [f'record-{i}' for i in range(20)])
+        self.assertGreater(helper.rehydrations, 0)
+
+    def test_released_not_remembered(self):
+        evicted = self.records[0].obj_id
+        self.assertIn(evicted, self.helper._evicted)
+        del self.records
+        gc.collect()
+        self.assertNotIn(evicted, self.helper._evicted)
+
+    def test_scope_forgets_evicted(self):
+        with self.helper.scope():
+            names = [record.name for record in self.app.databases[0].contents[:30]]
+        self.assertEqual(len(names), 30)
+        self.assertTrue(all(self.helper._osaobj_rc.get(i, 0) > 0 for i in self.helper._evicted))
+
+    def test_unbounded(self):
+        self.helper.set_pool_limit(None)
+        size = len(self.pool)
+        records = self.app.databases[0].contents[:]
+        self.assertGreaterEqual(len(self.pool), size)
+        self.assertEqual(len(records), 50)
+        with self.assertRaises(ValueError):
+            self.helper.set_pool_limit(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
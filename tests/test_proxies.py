@@ -0,0 +1,94 @@
+import gc
+import unittest
+
+from simulated import SimulatedTestCase
+
+
+class TestIdentityMap(SimulatedTestCase):
+    n_records = 20
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.contents = self.app.databases[0].contents
+
+    def test_same_object_same_proxy(self):
+        record = self.contents[3]
+        size = len(self.pool)
+        found = self.app.search('name==record-3')[0]
+        self.assertIs(found, record)
+        self.assertEqual(len(self.pool), size)
+        self.assertGreater(self.helper.reused_proxies, 0)
+
+    def test_repeated_traversal(self):
+        first = list(self.contents)
+        size = len(self.pool)
+        second = list(self.contents)
+        self.assertTrue(all(a is b for a, b in zip(first, second)))
+        self.assertEqual(len(self.pool), size)
+        self.assertEqual(self.helper._osaobj_rc[first[0].obj_id], 1)
+
+    def test_refetch_after_release(self):
+        record = self.contents[0]
+        obj_id = record.obj_id
+        del record
+        gc.collect()
+        self.helper.flush_releases()
+        record = self.contents[0]
+        self.assertNotEqual(record.obj_id, obj_id)
+        self.assertEqual(record.name, 'record-0')
+
+    def test_scoped_proxy_not_reused_after_scope(self):
+        with self.helper.scope():
+            scoped = self.contents[0]
+            self.assertIs(self.contents[0], scoped)
+        record = self.contents[0]
+        self.assertIsNot(record, scoped)
+        self.assertEqual(record.name, 'record-0')
+
+    def test_outer_proxy_reused_in_scope(self):
+        record = self.contents[0]
+        with self.helper.scope():
+            self.assertIs(self.contents[0], record)
+        self.assertEqual(record.name, 'record-0')
+
+    def test_keys_computed_once(self):
+        record = self.contents[3]
+        computations = self.pool.key_computations
+        for _ in range(5):
+            self.assertIs(self.helper.echo(record), record)
+        self.assertEqual(self.pool.key_computations, computations)
+
+    def test_dying_proxy_not_reused(self):
+        record = self.contents[0]
+        forget_proxy = self.helper._forget_proxy
+        fetched, reused = [], []
+
+        def forget_and_fetch(proxy):
+            forget_proxy(proxy)
+            # As if another thread fetched the record while it is being collected.
+            fetched.append(self.contents[0])
+            reused.append(fetched[0] is proxy)
+
+        self.helper._forget_proxy = forget_and_fetch
+        try:
+            del record
+            gc.collect()
+        finally:
+            del self.helper._forget_proxy
+        self.assertEqual(reused, [False])
+        self.helper.flush_releases()
+        self.assertEqual(fetched[0].name, 'record-0')
+
+
+class TestSlots(SimulatedTestCase):
+    def test_no_instance_dict(self):
+        record = self.app.databases[0].contents[0]
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertFalse(hasattr(self.app.databases[0], '__dict__'))
+        with self.assertRaises(AttributeError):
+            record.not_a_property = 1
+        self.assertIs(self.helper._proxies[record.obj_id], record)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import gc
+import pickle
+import unittest
+
+from pydt3.apps.devonthink.record import RecordRef
+
+from simulated import SimulatedTestCase
+
+
+class TestRecordRef(SimulatedTestCase):
+    n_records = 20
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = self.app.databases[0]
+
+    def test_no_remote_objects(self):
+        self.helper.flush_releases()
+        size = len(self.pool)
+        refs = self.db.record_refs()
+        gc.collect()
+        self.helper.flush_releases()
+        self.assertEqual(len(refs), 20)
+        self.assertEqual(len(self.pool), size)
+        self.assertEqual(refs[3].database_uuid, self.db.uuid)
+        self.assertFalse(hasattr(refs[3], '__dict__'))
+
+    def test_live_properties(self):
+        ref = self.db.contents[3].ref()
+        self.assertEqual(ref.name, 'record-3')
+        ref.comment = 'changed'
+        self.assertEqual(ref.resolve().comment, 'changed')
+        self.assertEqual(ref, self.db.record_refs()[3])
+
+    def test_resolve_all(self):
+        refs = self.db.record_refs()
+        calls = self.transport.call_count
+        records = RecordRef.resolve_all(refs)
+        self.assertEqual(self.transport.call_count, calls + 2)
+        self.assertEqual([record.name for record in records], [f'record-{i}' for i in range(20)])
+
+    def test_deleted(self):
+        ref = self.db.contents[3].ref()
+        self.app.delete(ref.resolve())
+        with self.assertRaises(LookupError):
+            ref.resolve()
+        self.assertEqual(RecordRef.resolve_all([ref]), [None])
+
+    def test_resolved_in_database(self):
+        ref = self.db.contents[3].ref()
+        other = self.sim.add_database('other')
+        with self.assertRaises(LookupError):
+            RecordRef(other.properties['uuid'], ref.uuid, self.helper).resolve()
+        with self.assertRaises(LookupError):
+            RecordRef('no-such-database', ref.uuid, self.helper).resolve()
+        self.assertEqual(ref.resolve().name, 'record-3')
+
+    def test_pickle(self):
+        ref = self.db.contents[3].ref()
+        copy = pickle.loads(pickle.dumps(ref))
+        self.assertEqual(copy, ref)
+        self.assertIsNone(copy._helper_script)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import gc
+import unittest
+import logging
+
+import pydt3
+
+from simulated import SimulatedTestCase
+
+
+class TestReferenceCounts(SimulatedTestCase):
+    n_records = 20
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.contents = self.app.databases[0].contents
+
+    def test_dead_entries_dropped(self):
+        referenced = self.helper.referenced_objects
+        records = self.contents[:]
+        self.assertEqual(self.helper.referenced_objects, referenced + 20)
+        del records
+        gc.collect()
+        self.assertEqual(self.helper.referenced_objects, referenced)
+        self.assertTrue(all(count > 0 for count in self.helper._osaobj_rc._counts.values()))
+
+    def test_live_proxies(self):
+        records = self.contents[:]
+        self.assertEqual(self.helper.live_proxies()['Record'], 20)
+        with self.helper.scope():
+            scoped = list(self.app.search('tags:sim'))
+            self.assertEqual(self.helper.live_proxies()['Record'], 20)
+            del scoped
+        del records
+        gc.collect()
+        self.assertNotIn('Record', self.helper.live_proxies())
+
+    def test_sites(self):
+        self.helper.sample_proxy_sites(1)
+        records = self.contents[:]
+        site, = [site for site in self.helper.live_proxies_by_site() if site['class'] == 'Record']
+        self.assertTrue(site['site'].startswith(__file__))
+        self.assertEqual(site['sampled'], 20)
+        del records
+        gc.collect()
+        self.assertNotIn('Record', [site['class'] for site in self.helper.live_proxies_by_site()])
+
+    def test_check_leaks(self):
+        kept = []
+        with self.assertRaises(pydt3.refcount.LeakError) as cm:
+            with pydt3.check_leaks(self.helper):
+                kept.extend(self.contents[:5])
+                self.assertEqual(len([record.name for record in self.contents[:]]), 20)
+        self.assertEqual(cm.exception.growth, {'Record': 5})
+        with pydt3.check_leaks(self.helper, tolerance=5):
+            kept.extend(self.contents[5:10])
+
+    def test_periodic_check(self):
+        leaks = pydt3.refcount.LeakCheck(self.helper)
+        records = self.contents[:]
+        with self.assertLogs('pydt3.refcount', logging.WARNING):
+            self.assertEqual(leaks.check(fail=False), {'Record': 20})
+        del records
+        self.assertEqual(leaks.check(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
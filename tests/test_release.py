@@ -0,0 +1,94 @@
+import gc
+import threading
+import unittest
+
+from pydt3.apps.devonthink.record import Record
+
+from simulated import SimulatedTestCase
+
+
+class TestReleaseQueue(SimulatedTestCase):
+    n_records = 50
+
+    def test_piggyback(self):
+        contents = self.app.databases[0].contents
+        records = contents[:]
+        self.helper.flush_releases()
+        size = len(self.pool)
+        calls = self.transport.call_count
+        del records
+        self.assertEqual(self.transport.call_count, calls)
+        self.assertEqual(self.helper.release_queue.depth, 50)
+        self.assertEqual(self.app.name, 'DEVONthink 3')
+        self.assertEqual(self.transport.call_count, calls + 1)
+        self.assertEqual(len(self.pool), size - 50)
+
+    def test_threshold(self):
+        self.helper.release_queue.threshold = 20
+        contents = self.app.databases[0].contents
+        records = contents[:]
+        self.helper.flush_releases()
+        calls = self.transport.call_count
+        del records
+        self.assertEqual(self.transport.call_count, calls + 2)
+        self.assertEqual(self.helper.release_queue.depth, 10)
+        stats = self.helper.release_queue.stats()
+        self.assertEqual(stats['flushes'], 2)
+        self.assertGreater(stats['total_flush_seconds'], 0)
+
+    def test_new_proxy_cancels_release(self):
+        contents = self.app.databases[0].contents
+        record = contents[0]
+        obj_id = record.obj_id
+        self.helper.flush_releases()
+        del record
+        self.assertEqual(self.helper.release_queue.depth, 1)
+        # Same id handed out again before the release was sent
+        record = Record(self.helper, obj_id, 'record')
+        self.assertEqual(self.helper.release_queue.depth, 0)
+        self.assertEqual(record.name, 'record-0')
+
+    def test_collected_while_taking(self):
+        contents = self.app.databases[0].contents
+        queued = contents[0]
+        cycle = [contents[1]]
+        cycle.append(cycle)
+        self.helper.flush_releases()
+        rc = self.helper._osaobj_rc
+        collect = [True]
+
+        def get(obj_id, default=0):
+            # A collection finalizing a proxy in the middle of `_take`.
+            if collect:
+                collect.pop()
+                gc.collect()
+            return type(rc).get(rc, obj_id, default)
+
+        gc.disable()
+        try:
+            del queued, cycle
+            rc.get = get
+            thread = threading.Thread(target=self.helper.flush_releases, daemon=True)
+            thread.start()
+            thread.join(5)
+        finally:
+            gc.enable()
+            del rc.get
+        self.assertFalse(thread.is_alive())
+        self.helper.flush_releases()
+        self.assertEqual(self.helper.release_queue.depth, 0)
+
+    def test_referenced_again_before_queued(self):
+        record = self.app.databases[0].contents[0]
+        obj_id = record.obj_id
+        self.helper.flush_releases()
+        # A re-fetch between the last decrement and the queueing of the id.
+        self.helper._osaobj_rc.decrease(obj_id)
+        self.helper._osaobj_rc.increase(obj_id)
+        self.helper.defer_release(obj_id)
+        self.helper.flush_releases()
+        self.assertEqual(record.name, 'record-0')
+
+
+if __name__ == '__main__':
+    unittest.main()
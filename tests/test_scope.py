@@ -0,0 +1,52 @@
+import unittest
+
+from simulated import SimulatedTestCase
+
+
+class TestScope(SimulatedTestCase):
+    n_records = 50
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.contents = self.app.databases[0].contents
+        self.helper.flush_releases()
+
+    def test_release_on_exit(self):
+        size = len(self.pool)
+        with self.helper.scope():
+            names = [record.name for record in self.contents]
+            self.assertEqual(len(self.pool), size + 50)
+            self.assertEqual(self.helper.release_queue.depth, 0)
+            calls = self.transport.call_count
+        self.assertEqual(self.transport.call_count, calls + 1)
+        self.assertEqual(len(names), 50)
+        self.assertEqual(len(self.pool), size)
+        self.assertEqual(self.helper.release_queue.depth, 0)
+
+    def test_nested(self):
+        size = len(self.pool)
+        with self.helper.scope():
+            outer = self.contents[0]
+            with self.helper.scope():
+                inner = self.contents[1]
+            self.assertEqual(len(self.pool), size + 1)
+            self.assertEqual(outer.name, 'record-0')
+            with self.assertRaises(ValueError):
+                inner.name
+        self.assertEqual(len(self.pool), size)
+
+    def test_unused_scope(self):
+        calls = self.transport.call_count
+        with self.helper.scope():
+            pass
+        self.assertEqual(self.transport.call_count, calls)
+
+    def test_outer_references_survive(self):
+        record = self.contents[0]
+        with self.helper.scope():
+            self.assertEqual(record.name, 'record-0')
+        self.assertEqual(record.name, 'record-0')
+
+
+if __name__ == '__main__':
+    unittest.main()
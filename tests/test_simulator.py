@@ -0,0 +1,85 @@
+import datetime
+import unittest
+
+from pydt3 import DEVONthink3
+from pydt3.helper_bridging import OSAObjArray, DefaultOSAObjProxy
+from pydt3.apps.devonthink.database import Database
+from pydt3.apps.devonthink.record import Record
+
+from simulated import SimulatedTestCase
+
+
+class TestSimulatedTransport(SimulatedTestCase):
+    def test_echo(self):
+        now = datetime.datetime.now().replace(microsecond=0)
+        value = {'a': 1, 'b': [1, 2, 3], 'c': now}
+        self.assertEqual(self.helper.echo(value), value)
+
+    def test_application(self):
+        self.assertIsInstance(self.app, DEVONthink3)
+        self.assertEqual(self.app.name, 'DEVONthink 3')
+        self.assertEqual(self.app.id, 'com.devon-technologies.think3')
+        self.app.activate()
+        self.assertTrue(self.app.frontmost)
+
+    def test_databases(self):
+        dbs = self.app.databases
+        self.assertIsInstance(dbs, OSAObjArray)
+        self.assertEqual(len(dbs), 1)
+        db = dbs[0]
+        self.assertIsInstance(db, Database)
+        self.assertEqual(db.name, 'test-db')
+        self.assertEqual(self.app.ext.db_by_name('test-db').uuid, db.uuid)
+
+    def test_records(self):
+        db = self.app.databases[0]
+        records = list(db.contents)
+        self.assertEqual(len(records), 10)
+        self.assertTrue(all(isinstance(record, Record) for record in records))
+        self.assertEqual(records[3].name, 'record-3')
+        self.assertEqual(records[3].tags, ['sim', '0'])
+        self.assertIsInstance(records[3].modification_date, datetime.datetime)
+        self.assertIsInstance(records[3].database, Database)
+
+    def test_set_property(self):
+        record = self.app.databases[0].contents[0]
+        record.comment = 'changed'
+        self.assertEqual(record.comment, 'changed')
+
+    def test_commands(self):
+        record = self.app.create_record_with({'name': 'new', 'type': 'markdown', 'plain text': 'hello'})
+        self.assertEqual(record.plain_text, 'hello')
+        self.assertEqual(self.app.get_record_with_uuid(record.uuid).name, 'new')
+        self.assertEqual([r.name for r in self.app.search('name==new')], ['new'])
+        self.app.delete(record)
+        self.assertIsNone(self.app.get_record_with_uuid(record.uuid))
+
+    def test_fallback_proxy(self):
+        record = self.app.databases[0].contents[0]
+        name = DefaultOSAObjProxy.from_proxy(record).name
+        self.assertEqual(name(), 'record-0')
+
+    def test_class_resolution(self):
+        self.assertIs(self.helper.determine_class('DEVONthink 3', 'tagGroup'), Record)
+
+    def test_release(self):
+        pool = self.transport.helper.object_pool_manager
+        self.helper.flush_releases()
+        size = len(pool)
+        dbs = self.app.databases
+        db = dbs[0]
+        self.assertEqual(len(pool), size + 2)
+        del dbs, db
+        self.assertEqual(self.helper.release_queue.depth, 2)
+        self.helper.flush_releases()
+        self.assertEqual(len(pool), size)
+        self.assertEqual(self.helper.release_queue.depth, 0)
+
+    def test_error(self):
+        record = self.app.databases[0].contents[0]
+        with self.assertRaises(RuntimeError):
+            record._call_method('noSuchMethod')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import tempfile
+import threading
+import unittest
+
+from pydt3.hierarchy import ClassHierarchyCache
+
+from simulated import SimulatedTestCase
+
+
+class TestSnapshot(SimulatedTestCase):
+    n_records = 5
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.record = self.app.databases[0].contents[0]
+
+    def test_memoized(self):
+        calls = self.transport.call_count
+        with self.helper.snapshot():
+            self.assertEqual(self.record.name, 'record-0')
+            self.assertEqual(self.record.name, 'record-0')
+            self.assertIs(self.record.database, self.record.database)
+        self.assertEqual(self.transport.call_count, calls + 2)
+        self.assertEqual(self.helper.snapshot_hits, 2)
+        self.record.name
+        self.assertEqual(self.transport.call_count, calls + 3)
+
+    def test_invalidated_by_writes(self):
+        with self.helper.snapshot():
+            self.assertEqual(self.record.comment, '')
+            self.record.comment = 'changed'
+            self.assertEqual(self.record.comment, 'changed')
+
+    def test_kept_by_class_lookups(self):
+        self.helper.class_hierarchy = ClassHierarchyCache(self.helper, tempfile.mkdtemp())
+        self.sim.class_hierarchy = {**self.sim.class_hierarchy, 'feedGroup': 'smartGroup'}
+        with self.helper.snapshot():
+            self.record.name
+            self.helper.determine_class('DEVONthink 3', 'feedGroup')
+            self.record.name
+        self.assertEqual(self.helper.snapshot_hits, 1)
+
+    def test_commands_not_memoized(self):
+        with self.helper.snapshot():
+            self.sim.properties['frontmost'] = False
+            self.app.activate()
+            self.assertTrue(self.app.frontmost)
+
+    def test_other_threads_unaffected(self):
+        with self.helper.snapshot():
+            self.record.name
+            self.sim.databases[0].contents[0].properties['name'] = 'renamed'
+            self.assertEqual(self.record.name, 'record-0')
+            names = []
+            thread = threading.Thread(target=lambda: names.append(self.record.name))
+            thread.start()
+            thread.join()
+            self.assertEqual(names, ['renamed'])
+
+    def test_memo_per_thread(self):
+        opened, done = threading.Event(), threading.Event()
+
+        def hold():
+            with self.helper.snapshot():
+                self.record.name
+                opened.set()
+                done.wait()
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        opened.wait()
+        self.sim.databases[0].contents[0].properties['name'] = 'renamed'
+        names = []
+
+        def read():
+            with self.helper.snapshot():
+                names.append(self.record.name)
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        done.set()
+        holder.join()
+        self.assertEqual(names, ['renamed'])
+        self.assertEqual(self.helper._snapshot_memos, [])
+
+    def test_coalescing(self):
+        self.transport.latency = 0.05
+        calls = self.transport.call_count
+        names = []
+
+        def read():
+            with self.helper.snapshot():
+                names.append(self.record.name)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(names, ['record-0'] * 4)
+        self.assertEqual(self.transport.call_count, calls + 1)
+        self.assertEqual(self.helper.coalesced_reads, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from simulated import SimulatedTestCase
+
+
+class TestTextRanges(SimulatedTestCase):
+    n_records = 2
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.text = ''.join(f'line {i}\n' for i in range(1000))
+        self.sim.databases[0].contents[0].properties.update(plainText=self.text, source='<p>hello</p>')
+        self.record = self.app.databases[0].contents[0]
+
+    def test_read_text(self):
+        self.assertEqual(self.record.read_text(5, 10), self.text[5:15])
+        self.assertEqual(self.record.read_text(len(self.text) - 3), self.text[-3:])
+        self.assertEqual(self.record.read_text(len(self.text) + 10, 5), '')
+        self.assertEqual(self.record.read_text(source=True), '<p>hello</p>')
+
+    def test_iter_text(self):
+        calls = self.transport.call_count
+        chunks = list(self.record.iter_text(chunk_chars=1000))
+        self.assertEqual(self.transport.call_count, calls + len(chunks))
+        self.assertTrue(all(len(c) <= 1000 for c in chunks))
+        self.assertEqual(''.join(chunks), self.text)
+
+    def test_read_once_per_iteration(self):
+        helper = self.transport.helper
+        reads = helper.text_reads
+        chunks = list(self.record.iter_text(chunk_chars=100))
+        self.assertEqual(len(chunks), (len(self.text) + 99) // 100)
+        self.assertEqual(helper.text_reads, reads + 1)
+        self.assertEqual(helper._text_cache, (None, None))
+        # Ranges read on their own aren't kept.
+        self.assertEqual(self.record.read_text(0, 10), self.text[:10])
+        self.assertEqual(helper._text_cache, (None, None))
+
+    def test_modified_between_chunks(self):
+        simulated = self.sim.databases[0].contents[0]
+        chunks = self.record.iter_text(chunk_chars=1000)
+        self.assertEqual(next(chunks), self.text[:1000])
+        simulated.properties['plainText'] = self.text.upper()
+        # The iteration goes on with the text it started with, a new one sees the change.
+        self.assertEqual(''.join(chunks), self.text[1000:])
+        self.assertEqual(self.record.read_text(0, 4), 'LINE')
+
+    def test_surrogate_pairs(self):
+        text = 'a' * 999 + '\U0001F600' + 'b' * 10 + '\U0001F601'
+        self.sim.databases[0].contents[0].properties['plainText'] = text
+        chunks = list(self.record.iter_text(chunk_chars=1000))
+        self.assertEqual(chunks, ['a' * 999 + '\U0001F600', 'b' * 10 + '\U0001F601'])
+        # Offsets count UTF-16 code units.
+        self.assertEqual(self.record.read_text(999, 2), '\U0001F600')
+        self.assertEqual(self.record.read_text(1001), 'b' * 10 + '\U0001F601')
+
+    def test_empty(self):
+        self.assertEqual(list(self.app.databases[0].contents[1].iter_text()), ['text of record 1'])
+        self.sim.databases[0].contents[1].properties['plainText'] = ''
+        self.assertEqual(list(self.app.databases[0].contents[1].iter_text()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pydt3 import DEVONthink3
+from pydt3.helper_bridging import HelperScript
+from pydt3.transport import RecordingTransport, ReplayTransport, ReplayError
+
+from simulated import SimulatedTestCase, make_helper
+
+
+class TestRecordReplay(SimulatedTestCase):
+    n_records = None
+
+    def workload(self, helper):
+        app = DEVONthink3.from_script(helper)
+        db = app.databases[0]
+        records = db.contents[:]
+        names = [record.name for record in records]
+        records[0].comment = 'seen'
+        return names, records[0].comment, app.search('name==record-3')[0].name
+
+    def record(self, path=None):
+        _, transport, _ = make_helper(n_records=6)
+        recording = RecordingTransport(transport, path)
+        result = self.workload(HelperScript(recording))
+        recording.close()
+        return recording, result
+
+    def test_replay(self):
+        recording, expected = self.record()
+        replay = ReplayTransport(recording.entries, latency_scale=0)
+        self.assertEqual(self.workload(HelperScript(replay)), expected)
+        summary = replay.summary()
+        self.assertEqual(summary['replayed_calls'], summary['recorded_calls'])
+        self.assertEqual(summary['unused_calls'], 0)
+        self.assertEqual(summary['mismatches'], 0)
+
+    def test_file_round_trip_and_latency(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'session.jsonl')
+            recording, expected = self.record(path)
+            replay = ReplayTransport.from_path(path, latency=0.001)
+        self.assertEqual(len(replay.entries), len(recording.entries))
+        self.assertEqual(self.workload(HelperScript(replay)), expected)
+        self.assertAlmostEqual(replay.summary()['replayed_remote_seconds'], 0.001 * replay.call_count)
+
+    def test_errors_replayed(self):
+        _, transport, _ = make_helper()
+        recording = RecordingTransport(transport)
+        helper = HelperScript(recording)
+        app = DEVONthink3.from_script(helper)
+        with self.assertRaises(RuntimeError):
+            helper.call_method(app, 'noSuchMethod', [])
+        replayed = HelperScript(ReplayTransport(recording.entries, latency_scale=0))
+        app = DEVONthink3.from_script(replayed)
+        with self.assertRaises(RuntimeError) as cm:
+            replayed.call_method(app, 'noSuchMethod', [])
+        self.assertIn('NSAppleScriptErrorMessage', cm.exception.args[0])
+
+    def test_transport_errors_recorded(self):
+        _, transport, _ = make_helper()
+        recording = RecordingTransport(transport)
+
+        def fail(func_name, arg):
+            raise ConnectionError('helper gone')
+        transport.call = fail
+        with self.assertRaises(ConnectionError):
+            recording.call('echo', '{}')
+        self.assertEqual(recording.entries[-1]['error'], 'ConnectionError: helper gone')
+        with self.assertRaises(RuntimeError):
+            ReplayTransport(recording.entries, latency_scale=0).call('echo', '{}')
+
+    def test_unrecorded_request(self):
+        recording, _ = self.record()
+        helper = HelperScript(ReplayTransport(recording.entries, latency_scale=0))
+        app = DEVONthink3.from_script(helper)
+        with self.assertRaises(ReplayError):
+            app.search('name==record-4')
+        lenient = ReplayTransport(recording.entries, latency_scale=0, strict=False)
+        app = DEVONthink3.from_script(HelperScript(lenient))
+        app.search('name==record-4')
+        self.assertEqual(lenient.mismatches, 1)
+
+    def test_piggybacked_releases_ignored(self):
+        recording, _ = self.record()
+        replay = ReplayTransport(recording.entries, latency_scale=0)
+        entry = next(e for e in recording.entries if e['func'] == 'getApplication')
+        message = json.loads(entry['arg'])
+        message['release'] = [1, 2]
+        self.assertEqual(replay.call('getApplication', json.dumps(message)), entry['result'])
+
+
+if __name__ == '__main__':
+    unittest.main()